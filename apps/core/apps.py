@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Umumiy infratuzilma'
+
+    def ready(self):
+        from .pagecache import _connect_invalidation
+        _connect_invalidation()
+
+        from .search import connect_signals
+        connect_signals()
+
+        from .images import connect_signals as connect_image_signals
+        connect_image_signals()
@@ -0,0 +1,39 @@
+"""
+apps/core/async_views.py - ASYNC VIEW'LAR UCHUN YORDAMCHILAR
+
+Katalog va dars sahifalari ASGI ostida async view sifatida ishlaydi:
+mustaqil so'rovlar ``asyncio.gather`` bilan birga yuboriladi, shablon
+esa (sync) alohida oqimda chiziladi.
+
+    user = await auser(request)
+    course, is_enrolled = await asyncio.gather(
+        aget_object_or_404(Course, pk=course_id),
+        Enrollment.objects.filter(student=user, course_id=course_id).aexists(),
+    )
+    return await arender(request, 'course/course_detail.html', {...})
+
+Eslatma: Django ORM hali ham ichkarida sync drayver bilan ishlaydi –
+bitta so'rovning ORM chaqiruvlari bitta oqimda navbat bilan bajariladi.
+gather ularni event loop'ni bloklamasdan, kesh va boshqa kutishlar bilan
+ustma-ust olib boradi.
+"""
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+# Shablon ichidagi lazy so'rovlar ham shu (sync) oqimda bajariladi
+arender = sync_to_async(render)
+
+
+async def auser(request):
+    """
+    Foydalanuvchini async yuklab, ``request.user`` ga ham yozish – aks holda
+    shablondagi ``user`` (context processor) sessiyani ikkinchi marta o'qiydi.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
@@ -0,0 +1,26 @@
+"""
+apps/core/db/backends/instrumented.py - ULANISH METRIKALARI
+
+Har bir yangi ulanish (yoki pool'dan olingan ulanish) uchun ketgan vaqt
+va muvaffaqiyatsiz health check'lar core.metrics ga yoziladi. Doimiy
+ulanishlar (CONN_MAX_AGE) ishlasa, so'rovlar soni o'sadi, ulanishlar esa yo'q.
+"""
+
+import time
+
+from core.metrics import registry
+
+
+class ConnectionMetricsMixin:
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        registry.record_connection(self.alias, time.perf_counter() - started)
+
+    def is_usable(self):
+        # Faqat CONN_HEALTH_CHECKS (so'rov boshida qayta ishlatishdan oldin) chaqiradi
+        usable = super().is_usable()
+        if not usable:
+            registry.record_health_check_failure(self.alias)
+        return usable
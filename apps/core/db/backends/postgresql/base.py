@@ -0,0 +1,14 @@
+"""
+apps/core/db/backends/postgresql/base.py - POSTGRESQL (ulanish metrikalari bilan)
+
+ENGINE = 'core.db.backends.postgresql'. Pool (OPTIONS['pool'], psycopg 3)
+sozlamalari config/settings.py da DB_POOL* muhit o'zgaruvchilaridan olinadi.
+"""
+
+from django.db.backends.postgresql import base
+
+from ..instrumented import ConnectionMetricsMixin
+
+
+class DatabaseWrapper(ConnectionMetricsMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,123 @@
+"""
+apps/core/db/backends/sqlite3/base.py - PROD UCHUN SOZLANGAN SQLITE BACKEND
+
+ENGINE = 'core.db.backends.sqlite3'. Har bir yangi ulanishda:
+
+    journal_mode=WAL       – o'quvchilar yozuvchini (va aksincha) bloklamaydi
+    synchronous=NORMAL     – WAL rejimida xavfsiz, har commit'da fsync yo'q
+    cache_size, mmap_size  – sahifa keshi va xotiraga akslantirilgan o'qish
+    busy_timeout           – qulf bo'lsa darhol xato emas, kutish (OPTIONS['timeout'])
+
+Yozish tranzaksiyalari ``BEGIN IMMEDIATE`` bilan boshlanadi va jarayon
+ichida bitta qulf orqali navbatga qo'yiladi (bitta yozuvchi). Odatiy
+``BEGIN`` (DEFERRED) tranzaksiya avval o'qib, keyin yozmoqchi bo'lganda
+busy_timeout'ni kutmasdan "database is locked" beradi – IMMEDIATE'da
+yozish qulfi boshidanoq olinadi va kutish ishlaydi.
+
+OPTIONS['read_only'] = True – ``mode=ro`` + ``query_only`` ulanish
+(replika alias'i uchun, core/db/routers.py).
+"""
+
+import threading
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+from ..instrumented import ConnectionMetricsMixin
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,  # KiB (~20 MB)
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+# Python sqlite3 drayverida busy_timeout soniyalarda beriladi
+DEFAULT_TIMEOUT = 20
+
+# Fayl yo'li → yozuvchi qulfi (bitta jarayondagi barcha oqimlar uchun)
+_writer_locks = defaultdict(threading.Lock)
+_writer_locks_guard = threading.Lock()
+
+
+def _writer_lock(name):
+    with _writer_locks_guard:
+        return _writer_locks[str(name)]
+
+
+class DatabaseWrapper(ConnectionMetricsMixin, base.DatabaseWrapper):
+
+    writer_lock = None
+    _holds_writer_lock = False
+
+    def get_connection_params(self):
+        settings_dict = self.settings_dict
+        options = settings_dict['OPTIONS']
+        self.read_only = options.get('read_only', False)
+        self.pragmas = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        if self.read_only:
+            # Rejimni faqat yozuvchi o'zgartiradi; replika yozolmaydi
+            self.pragmas.pop('journal_mode')
+            self.pragmas['query_only'] = 'ON'
+
+        # Django sqlite3 drayverga bermaydigan kalitlar olib tashlanadi
+        # (settings_dict oqimlar o'rtasida umumiy – nusxa bilan ishlanadi)
+        driver_options = {key: value for key, value in options.items() if key not in ('read_only', 'pragmas')}
+        driver_options.setdefault('timeout', DEFAULT_TIMEOUT)
+        if not self.read_only:
+            driver_options.setdefault('transaction_mode', 'IMMEDIATE')
+        self.settings_dict = {**settings_dict, 'OPTIONS': driver_options}
+        try:
+            kwargs = super().get_connection_params()
+        finally:
+            self.settings_dict = settings_dict
+
+        if self.read_only and not self.is_in_memory_db():
+            kwargs['database'] = f"file:{quote(str(Path(kwargs['database']).resolve()))}?mode=ro"
+        self.writer_lock = None if self.read_only or self.is_in_memory_db() else _writer_lock(kwargs['database'])
+        self.lock_timeout = kwargs['timeout']
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    # ---------------- bitta yozuvchi ----------------
+    def _start_transaction_under_autocommit(self):
+        if self.writer_lock is not None and not self._holds_writer_lock:
+            if not self.writer_lock.acquire(timeout=self.lock_timeout):
+                raise OperationalError('database is locked (yozuvchi navbati)')
+            self._holds_writer_lock = True
+        try:
+            super()._start_transaction_under_autocommit()
+        except Exception:
+            self._release_writer_lock()
+            raise
+
+    def _release_writer_lock(self):
+        if self._holds_writer_lock:
+            self._holds_writer_lock = False
+            self.writer_lock.release()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_writer_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_writer_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_writer_lock()
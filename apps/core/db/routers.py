@@ -0,0 +1,32 @@
+"""
+apps/core/db/routers.py - O'QISH/YOZISHNI AJRATISH
+
+O'qishlar 'replica' alias'iga (shu SQLite fayl, faqat o'qish uchun ulanish),
+yozishlar 'default' ga (bitta navbatli yozuvchi) yuboriladi. WAL rejimida
+commit qilingan yozuv keyingi o'qishda darhol ko'rinadi; ochiq tranzaksiya
+ichidagi o'qishlar esa o'z (hali commit qilinmagan) yozuvlarini ko'rishi
+uchun 'default' da qoladi. (TestCase har bir testni tranzaksiyada
+o'tkazadi – testlarda barcha o'qishlar ham 'default' ga tushadi.)
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ikkala alias ham bitta bazaga qaraydi
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
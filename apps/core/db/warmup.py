@@ -0,0 +1,36 @@
+"""
+apps/core/db/warmup.py - ULANISHLARNI OLDINDAN OCHISH
+
+config/wsgi.py va config/asgi.py ilova yuklangach chaqiradi (DB_WARMUP):
+pool bo'lsa min_size ta ulanish tayyor bo'lguncha kutiladi, aks holda
+joriy oqimda har bir alias ulanishi ochilib tekshiriladi – birinchi
+so'rov ulanish ochishni kutmaydi.
+
+gunicorn --preload bilan warm-up master jarayonda bo'ladi va fork'dan
+keyin ulanish bo'lishib qoladi – bunday holatda uni post_fork hook'dan
+chaqiring.
+"""
+
+import logging
+
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+def warmup():
+    for alias in connections:
+        connection = connections[alias]
+        try:
+            pool = connection.settings_dict['OPTIONS'].get('pool')
+            if pool:
+                # 'pool': True – psycopg standart sozlamalari bilan
+                timeout = pool.get('timeout', 30) if isinstance(pool, dict) else 30
+                connection.pool.open(wait=True, timeout=timeout)
+            else:
+                connection.ensure_connection()
+                if connection.settings_dict['CONN_MAX_AGE'] == 0:
+                    # Doimiy ulanish yo'q – ochib qo'yishdan foyda yo'q, faqat tekshiruv
+                    connection.close()
+        except (DatabaseError, TimeoutError) as e:
+            logger.warning("'%s' bazasiga oldindan ulanib bo'lmadi: %s", alias, e)
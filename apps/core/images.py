@@ -0,0 +1,201 @@
+"""
+apps/core/images.py - RASMLARNING KICHRAYTIRILGAN NUSXALARI (WebP/AVIF, srcset)
+
+Rasm yuklangandan so'ng fonda (core.tasks) har bir kenglik va format
+uchun nusxa yaratiladi. Joylashuv asl fayl nomidan aniqlanadi, shuning
+uchun URL'larni DB'siz hisoblash mumkin:
+
+    MEDIA_ROOT/derivatives/<ab>/<token>/320.webp
+    MEDIA_ROOT/derivatives/<ab>/<token>/320.avif
+    MEDIA_ROOT/derivatives/<ab>/<token>/manifest.json   ← oxirida yoziladi
+
+Qaysi nusxalar tayyorligi manifest'dan o'qiladi va keshlanadi; tayyor
+bo'lmasa shablon asl rasmni beradi. Shablon teglari: core/templatetags/images.py.
+"""
+
+import hashlib
+import io
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_delete, post_save
+from PIL import Image, ImageOps, features
+
+from .pagecache import DEPENDENCIES, invalidate
+from .tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+ROOT = 'derivatives'
+MANIFEST = 'manifest.json'
+KEY_PREFIX = 'imgderiv:v1:'
+# Nusxa hali yo'q bo'lsa manifest tez-tez tekshirilmasligi uchun
+MISSING_TIMEOUT = 60
+
+# model → nusxasi yaratiladigan rasm maydonlari
+IMAGE_FIELDS = {
+    'course.Course': ['image'],
+    'course.Lesson': ['thumbnail'],
+    'portfolio.Portfolio': ['image'],
+    'users.UserProfile': ['avatar'],
+}
+
+CONTENT_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+def _token(name):
+    return hashlib.sha1(name.encode()).hexdigest()[:16]
+
+
+def derivative_dir(name):
+    token = _token(name)
+    return f'{ROOT}/{token[:2]}/{token}'
+
+
+def derivative_name(name, width, fmt):
+    return f'{derivative_dir(name)}/{width}.{fmt}'
+
+
+def _supported_formats():
+    return [fmt for fmt in settings.IMAGE_DERIVATIVE_FORMATS if features.check(fmt)]
+
+
+# ============================================================
+# YARATISH
+# ============================================================
+def generate_derivatives(name, force=False, namespaces=()):
+    """
+    Fon vazifasi: ``name`` rasmidan barcha kenglik/format nusxalarini yaratish.
+    ``namespaces`` – tayyor bo'lgach eskirtiriladigan sahifa keshlari.
+    """
+    manifest_name = f'{derivative_dir(name)}/{MANIFEST}'
+    if not force and default_storage.exists(manifest_name):
+        return
+    if not default_storage.exists(name):
+        return
+
+    try:
+        with default_storage.open(name, 'rb') as f:
+            original = Image.open(f)
+            original = ImageOps.exif_transpose(original)
+            original.load()
+    except (OSError, Image.DecompressionBombError):
+        logger.exception("Rasm o'qilmadi: %s", name)
+        return
+
+    mode = 'RGBA' if original.mode in ('RGBA', 'LA', 'P') else 'RGB'
+    original = original.convert(mode)
+
+    # Kattalashtirilmaydi: asl kenglikdan kattalari tashlab ketiladi
+    widths = sorted({w for w in settings.IMAGE_DERIVATIVE_WIDTHS if w < original.width} | {
+        min(original.width, max(settings.IMAGE_DERIVATIVE_WIDTHS))
+    })
+    manifest = {'width': original.width, 'height': original.height, 'formats': {}}
+
+    for width in widths:
+        height = round(original.height * width / original.width)
+        resized = original.resize((width, height), Image.LANCZOS) if width != original.width else original
+        for fmt in _supported_formats():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=settings.IMAGE_DERIVATIVE_QUALITY)
+            target = derivative_name(name, width, fmt)
+            if default_storage.exists(target):
+                default_storage.delete(target)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+            manifest['formats'].setdefault(fmt, []).append(width)
+
+    if default_storage.exists(manifest_name):
+        default_storage.delete(manifest_name)
+    default_storage.save(manifest_name, ContentFile(json.dumps(manifest).encode()))
+    cache.set(KEY_PREFIX + _token(name), manifest, None)
+    # Keshlangan sahifalar hali asl rasmga ishora qiladi
+    invalidate(*namespaces)
+
+
+def remove_derivatives(name):
+    directory = derivative_dir(name)
+    try:
+        _, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for filename in files:
+        default_storage.delete(f'{directory}/{filename}')
+    cache.delete(KEY_PREFIX + _token(name))
+
+
+# ============================================================
+# O'QISH (shablonlar uchun)
+# ============================================================
+def get_manifest(name):
+    """Tayyor nusxalar: {'width', 'height', 'formats': {'webp': [160, 320], ...}} yoki None"""
+    if not name:
+        return None
+    key = KEY_PREFIX + _token(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        manifest_name = f'{derivative_dir(name)}/{MANIFEST}'
+        try:
+            with default_storage.open(manifest_name, 'rb') as f:
+                manifest = json.loads(f.read())
+            cache.set(key, manifest, None)
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+            cache.set(key, manifest, MISSING_TIMEOUT)
+    return manifest or None
+
+
+def srcset(name, fmt):
+    """'…/160.webp 160w, …/320.webp 320w' yoki '' (nusxa yo'q bo'lsa)"""
+    manifest = get_manifest(name)
+    if not manifest:
+        return ''
+    return ', '.join(
+        f'{default_storage.url(derivative_name(name, width, fmt))} {width}w'
+        for width in manifest['formats'].get(fmt, [])
+    )
+
+
+def best_url(name, width):
+    """``width`` dan kichik bo'lmagan eng kichik nusxa (webp), bo'lmasa asl rasm"""
+    manifest = get_manifest(name)
+    if manifest:
+        for fmt in ('webp', *manifest['formats']):
+            widths = manifest['formats'].get(fmt)
+            if widths:
+                chosen = next((w for w in widths if w >= width), widths[-1])
+                return default_storage.url(derivative_name(name, chosen, fmt))
+    return default_storage.url(name)
+
+
+# ============================================================
+# SIGNALLAR
+# ============================================================
+def schedule_derivatives(name, model_label=None):
+    if name:
+        namespaces = tuple(ns for ns, models in DEPENDENCIES.items() if model_label in models)
+        enqueue(generate_derivatives, name, namespaces=namespaces)
+
+
+def _saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    label = sender._meta.label
+    for field in IMAGE_FIELDS[label]:
+        schedule_derivatives(getattr(instance, field).name, label)
+
+
+def _deleted(sender, instance, **kwargs):
+    for field in IMAGE_FIELDS[sender._meta.label]:
+        name = getattr(instance, field).name
+        if name:
+            enqueue(remove_derivatives, name)
+
+
+def connect_signals():
+    for model in IMAGE_FIELDS:
+        post_save.connect(_saved, sender=model, dispatch_uid=f'images:{model}:save')
+        post_delete.connect(_deleted, sender=model, dispatch_uid=f'images:{model}:delete')
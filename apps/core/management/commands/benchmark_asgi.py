@@ -0,0 +1,172 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Server nomi → (modul, ishga tushirish buyrug'i)
+SERVERS = {
+    'asgi': ('uvicorn', ['-m', 'uvicorn', 'config.asgi:application', '--no-access-log', '--log-level', 'warning']),
+    'wsgi': ('gunicorn', ['-m', 'gunicorn', 'config.wsgi:application', '--log-level', 'warning']),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Katalog/dars sahifalarini ASGI (uvicorn) va WSGI (gunicorn) ostida yuklama bilan "
+        "taqqoslash: sekundiga so'rovlar va p50/p95 kechikish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', default=['/', '/course/', '/portfolio/'])
+        parser.add_argument('--concurrency', type=int, default=50, help="Bir vaqtdagi ulanishlar soni")
+        parser.add_argument('--duration', type=float, default=10, help="Har bir server necha soniya")
+        parser.add_argument('--workers', type=int, default=1, help="Server jarayonlari soni")
+        parser.add_argument('--cookie', default='', help="Masalan 'sessionid=...' – sahifa keshini chetlab o'tish uchun")
+        parser.add_argument('--asgi-url', help="Ishlab turgan ASGI server (berilmasa uvicorn ishga tushiriladi)")
+        parser.add_argument('--wsgi-url', help="Ishlab turgan WSGI server (berilmasa gunicorn ishga tushiriladi)")
+        parser.add_argument('--only', choices=sorted(SERVERS), help="Faqat bitta serverni o'lchash")
+
+    def handle(self, *args, **options):
+        kinds = [options['only']] if options['only'] else ['wsgi', 'asgi']
+        self.stdout.write(
+            f"{', '.join(options['paths'])}: {options['concurrency']} ulanish, "
+            f"{options['duration']}s, {options['workers']} worker"
+        )
+
+        results = {}
+        for kind in kinds:
+            url = options[f'{kind}_url']
+            process = None
+            if not url:
+                url, process = self._start(kind, options['workers'])
+            try:
+                results[kind] = asyncio.run(_load(url, options))
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait(timeout=10)
+            self._report(kind, results[kind])
+
+        if len(results) == 2 and results['wsgi']['rps']:
+            ratio = results['asgi']['rps'] / results['wsgi']['rps']
+            self.stdout.write(self.style.SUCCESS(f"ASGI / WSGI: {ratio:.2f}x"))
+
+    # ---------------- server ----------------
+    def _start(self, kind, workers):
+        module, args = SERVERS[kind]
+        if importlib.util.find_spec(module) is None:
+            raise CommandError(f"{module} o'rnatilmagan: pip install {module} (yoki --{kind}-url bering)")
+
+        port = _free_port()
+        args = args + ['--workers', str(workers)]
+        args += ['--port', str(port)] if kind == 'asgi' else ['--bind', f'127.0.0.1:{port}']
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'))
+        process = subprocess.Popen([sys.executable] + args, cwd=settings.BASE_DIR, env=env)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"{module} ishga tushmadi (kod {process.returncode})")
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                return f'http://127.0.0.1:{port}', process
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"{module} 30 soniyada javob bermadi")
+
+    def _report(self, kind, result):
+        latencies = result['latencies']
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{kind}: javob yo'q ({result['errors']} xato)"))
+            return
+        p50 = statistics.median(latencies) * 1000
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else p50
+        self.stdout.write(
+            f"{kind}: {result['rps']:>8.1f} so'rov/s   p50 {p50:.1f}ms   p95 {p95:.1f}ms   "
+            f"{len(latencies)} javob, {result['errors']} xato"
+        )
+
+
+# ============================================================
+# YUKLAMA (keep-alive HTTP/1.1 mijozlar)
+# ============================================================
+async def _load(url, options):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    base = parts.path.rstrip('/')
+    latencies, errors = [], [0]
+    deadline = time.monotonic() + options['duration']
+
+    async def client(number):
+        reader = writer = None
+        sent = number
+        while time.monotonic() < deadline:
+            path = base + options['paths'][sent % len(options['paths'])]
+            sent += 1
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port)
+                started = time.perf_counter()
+                writer.write(_request(host, path, options['cookie']))
+                status, keep_alive = await _read_response(reader)
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors[0] += 1
+                if not keep_alive:
+                    writer.close()
+                    writer = None
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors[0] += 1
+                if writer is not None:
+                    writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.monotonic()
+    await asyncio.gather(*(client(i) for i in range(options['concurrency'])))
+    elapsed = time.monotonic() - started
+    return {'rps': len(latencies) / elapsed, 'latencies': latencies, 'errors': errors[0]}
+
+
+def _request(host, path, cookie):
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}', 'Accept-Encoding: gzip', 'Connection: keep-alive']
+    if cookie:
+        lines.append(f'Cookie: {cookie}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    status = int(status_line.split()[1])
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        if name:
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection') != 'close'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
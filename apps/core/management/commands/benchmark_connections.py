@@ -0,0 +1,84 @@
+import time
+from io import BytesIO
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.metrics import registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Ulanish narxi: CONN_MAX_AGE=0 va doimiy ulanishlar (yoki pool) bilan so'rov boshiga "
+        "ochilgan ulanishlar va ulanishga ketgan vaqt. So'rovlar haqiqiy WSGIHandler orqali "
+        "(request_finished → close_old_connections bilan) jarayon ichida yuboriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', default=['/health/', '/course/'])
+        parser.add_argument('--requests', type=int, default=500, help="Har bir rejim uchun so'rovlar soni")
+        parser.add_argument('--max-age', type=int, default=600, help="Doimiy rejimdagi CONN_MAX_AGE")
+
+    def handle(self, *args, **options):
+        handler = WSGIHandler()
+        original = {alias: connections[alias].settings_dict['CONN_MAX_AGE'] for alias in connections}
+        pooled = any(connections[alias].settings_dict['OPTIONS'].get('pool') for alias in connections)
+        # Pool'da CONN_MAX_AGE doim 0 – ulanishni pool saqlaydi
+        modes = [('pool', 0)] if pooled else [('CONN_MAX_AGE=0', 0), (f"CONN_MAX_AGE={options['max_age']}", options['max_age'])]
+
+        self.stdout.write(f"{', '.join(options['paths'])}: {options['requests']} so'rov, alias'lar: {', '.join(connections)}")
+        try:
+            for label, max_age in modes:
+                self._set_max_age(max_age)
+                self._report(label, self._run(handler, options['paths'], options['requests']))
+        finally:
+            for alias, max_age in original.items():
+                connections[alias].close()
+                connections[alias].settings_dict['CONN_MAX_AGE'] = max_age
+
+    def _set_max_age(self, max_age):
+        for alias in connections:
+            connections[alias].close()
+            connections[alias].settings_dict['CONN_MAX_AGE'] = max_age
+
+    def _run(self, handler, paths, count):
+        # Shablon/kesh isishi o'lchovga kirmaydi
+        for path in paths:
+            _request(handler, path)
+
+        before = registry.connection_snapshot()
+        started = time.perf_counter()
+        for i in range(count):
+            _request(handler, paths[i % len(paths)])
+        elapsed = time.perf_counter() - started
+        after = registry.connection_snapshot()
+
+        empty = {'opened': 0, 'seconds': 0.0}
+        opened = sum(s['opened'] - before.get(alias, empty)['opened'] for alias, s in after.items())
+        seconds = sum(s['seconds'] - before.get(alias, empty)['seconds'] for alias, s in after.items())
+        return {'count': count, 'opened': opened, 'connect_seconds': seconds, 'elapsed': elapsed}
+
+    def _report(self, label, result):
+        count = result['count']
+        self.stdout.write(
+            f"{label:<20} {result['opened'] / count:>5.2f} ulanish/so'rov   "
+            f"ulanish {result['connect_seconds'] / count * 1000:.3f}ms/so'rov   "
+            f"jami {result['elapsed'] / count * 1000:.2f}ms/so'rov"
+        )
+
+
+def _request(handler, url):
+    parts = urlsplit(url)
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query,
+               'REMOTE_ADDR': '127.0.0.1', 'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    response = handler(environ, lambda status, headers, exc_info=None: None)
+    try:
+        for _ in response:
+            pass
+    finally:
+        # close() → request_finished → close_old_connections (haqiqiy server kabi)
+        response.close()
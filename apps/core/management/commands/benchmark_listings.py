@@ -0,0 +1,112 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from course.models import Category, Course, Lesson
+from portfolio.models import Category as PortfolioCategory, Portfolio
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Ro'yxat so'rovlari: to'liq qatorlar va karta/qator proyeksiyalari "
+        "(bayt, xotira, vaqt) taqqoslash. Sintetik katalog tranzaksiyada yaratilib, oxirida bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', type=int, default=500)
+        parser.add_argument('--lessons', type=int, default=300, help="Bitta kursdagi darslar soni")
+        parser.add_argument('--portfolios', type=int, default=500)
+        parser.add_argument('--text-kb', type=int, default=20, help="Har bir description/content hajmi (KB)")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                course_id = self._populate(options)
+                self._compare(course_id, options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    # ---------------- sintetik ma'lumot ----------------
+    def _populate(self, options):
+        text = ('Lorem ipsum dolor sit amet. ' * 40)[:1024] * options['text_kb']
+        category = Category.objects.create(name='benchmark')
+        Course.objects.bulk_create([
+            Course(title=f'Kurs {i}', description=text, short_description='Qisqa tavsif',
+                   category=category, status='published')
+            for i in range(options['courses'])
+        ])
+        course = Course.objects.filter(category=category).first()
+        Lesson.objects.bulk_create([
+            Lesson(course=course, title=f'Dars {i}', order=i + 1, description=text, content=text)
+            for i in range(options['lessons'])
+        ], batch_size=200)
+
+        portfolio_category = PortfolioCategory.objects.create(title='benchmark', slug='benchmark')
+        Portfolio.objects.bulk_create([
+            Portfolio(title=f'Loyiha {i}', description=text, category=portfolio_category,
+                      technologies='Django, React', image='portfolio_images/x.jpg')
+            for i in range(options['portfolios'])
+        ])
+        return course.pk
+
+    # ---------------- o'lchash ----------------
+    def _measure(self, queryset, repeat):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            transferred = sum(
+                len(value.encode()) if isinstance(value, str) else 8
+                for row in cursor.fetchall() for value in row if value is not None
+            )
+
+        tracemalloc.start()
+        list(queryset.all())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        elapsed = (time.perf_counter() - started) / repeat
+        return transferred, peak, elapsed
+
+    def _compare(self, course_id, repeat):
+        cases = [
+            ('course (12)',
+             Course.objects.published().select_related('category')[:12],
+             Course.objects.published().cards()[:12]),
+            ('course (barchasi)',
+             Course.objects.published().select_related('category'),
+             Course.objects.published().cards()),
+            ('sidebar darslar',
+             Lesson.objects.filter(course_id=course_id).order_by('order'),
+             Lesson.objects.filter(course_id=course_id).order_by('order').rows()),
+            ('portfolio (barchasi)',
+             Portfolio.objects.active().select_related('category'),
+             Portfolio.objects.active().cards()),
+        ]
+
+        header = ("so'rov", 'bayt', 'xotira (peak)', 'vaqt')
+        self.stdout.write(f"{header[0]:<22}{header[1]:>24}{header[2]:>28}{header[3]:>24}")
+        for name, full, projected in cases:
+            full_bytes, full_mem, full_time = self._measure(full, repeat)
+            proj_bytes, proj_mem, proj_time = self._measure(projected, repeat)
+            self.stdout.write(
+                f"{name:<22}"
+                f"{_kb(full_bytes):>10} → {_kb(proj_bytes):<10}"
+                f"{_kb(full_mem):>12} → {_kb(proj_mem):<12}"
+                f"{full_time * 1000:>9.1f}ms → {proj_time * 1000:.1f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS("Tugadi (sintetik ma'lumotlar bekor qilindi)"))
+
+
+def _kb(value):
+    return f'{value / 1024:,.0f}KB'
@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_FIELDS, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = "Mavjud rasmlar uchun WebP/AVIF nusxalarini yaratish (yangi yuklanganlari fonda avtomatik yaratiladi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Tayyor nusxalarni ham qayta yaratish")
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field in fields:
+                names = (
+                    model._default_manager.exclude(**{field: ''})
+                    .exclude(**{f'{field}__isnull': True})
+                    .values_list(field, flat=True)
+                    .distinct()
+                )
+                for name in names.iterator():
+                    generate_derivatives(name, force=options['force'])
+                    total += 1
+        self.stdout.write(self.style.SUCCESS(f"{total} ta rasm qayta ishlandi"))
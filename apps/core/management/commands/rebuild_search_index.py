@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Qidiruv indeksini (kurslar, darslar, portfolio) noldan qayta qurish"
+
+    def handle(self, *args, **options):
+        counts = rebuild_index()
+        summary = ', '.join(f"{kind}: {count}" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Qidiruv indeksi qayta qurildi ({summary})"))
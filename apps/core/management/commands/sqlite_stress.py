@@ -0,0 +1,165 @@
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+# Rejim → (yozuvchi ENGINE, o'quvchi replika bormi)
+MODES = {
+    'stock': ('django.db.backends.sqlite3', False),
+    'tuned': ('core.db.backends.sqlite3', True),
+}
+
+SCHEMA = [
+    'CREATE TABLE course (id INTEGER PRIMARY KEY, title TEXT, students_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE student (id INTEGER PRIMARY KEY, username TEXT, last_login REAL)',
+    'CREATE TABLE enrollment (id INTEGER PRIMARY KEY, student_id INTEGER, course_id INTEGER, '
+    'UNIQUE (student_id, course_id))',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "SQLite parallel yuklama testi: yozilish (enroll), login va o'qishlar aralashmasi. "
+        "Standart sqlite3 backend va core.db.backends.sqlite3 (WAL + navbatli yozuvchi + replika) "
+        "taqqoslanadi; 'database is locked' xatolari sanaladi. Vaqtinchalik fayllarda ishlaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=5, help="Har bir rejim necha soniya")
+        parser.add_argument('--courses', type=int, default=50)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--write-ratio', type=float, default=0.3, help="Yozish amallari ulushi (0..1)")
+        parser.add_argument('--timeout', type=float, default=5, help="busy_timeout (soniya), ikkala rejimda bir xil")
+        parser.add_argument('--mode', choices=[*MODES, 'both'], default='both')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['threads']} oqim, {options['duration']}s, yozish ulushi {options['write_ratio']:.0%}, "
+            f"busy_timeout {options['timeout']}s"
+        )
+        modes = list(MODES) if options['mode'] == 'both' else [options['mode']]
+        with tempfile.TemporaryDirectory() as directory:
+            for mode in modes:
+                path = os.path.join(directory, f'{mode}.sqlite3')
+                aliases = self._configure(mode, path, options['timeout'])
+                try:
+                    self._populate(aliases[0], options)
+                    result = self._run(aliases, options)
+                finally:
+                    for alias in aliases:
+                        connections[alias].close()
+                        del connections[alias]
+                        del connections.settings[alias]
+                self._report(mode, result)
+
+    # ---------------- tayyorlash ----------------
+    def _configure(self, mode, path, timeout):
+        engine, replica = MODES[mode]
+        databases = {
+            f'stress_{mode}': {'ENGINE': engine, 'NAME': path, 'OPTIONS': {'timeout': timeout}},
+        }
+        if replica:
+            databases[f'stress_{mode}_replica'] = {
+                'ENGINE': engine, 'NAME': path, 'OPTIONS': {'timeout': timeout, 'read_only': True},
+            }
+        configured = connections.configure_settings({'default': {}, **databases})
+        for alias in databases:
+            connections.settings[alias] = configured[alias]
+        return list(databases)
+
+    def _populate(self, alias, options):
+        with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany('INSERT INTO course (title) VALUES (%s)',
+                               [(f'Kurs {i}',) for i in range(options['courses'])])
+            cursor.executemany('INSERT INTO student (username) VALUES (%s)',
+                               [(f'student{i}',) for i in range(options['students'])])
+
+    # ---------------- yuklama ----------------
+    def _run(self, aliases, options):
+        writer = aliases[0]
+        reader = aliases[-1]
+        deadline = time.monotonic() + options['duration']
+        lock = threading.Lock()
+        result = {'reads': 0, 'writes': 0, 'locked': 0, 'write_latencies': [], 'read_latencies': []}
+
+        def enroll(rng):
+            student_id = rng.randint(1, options['students'])
+            course_id = rng.randint(1, options['courses'])
+            # Odatiy naqsh: avval tekshirish (o'qish), keyin yozish – bitta tranzaksiyada
+            with transaction.atomic(using=writer), connections[writer].cursor() as cursor:
+                cursor.execute('SELECT 1 FROM enrollment WHERE student_id = %s AND course_id = %s',
+                               [student_id, course_id])
+                if cursor.fetchone() is None:
+                    cursor.execute('INSERT INTO enrollment (student_id, course_id) VALUES (%s, %s)',
+                                   [student_id, course_id])
+                    cursor.execute('UPDATE course SET students_count = students_count + 1 WHERE id = %s',
+                                   [course_id])
+
+        def login(rng):
+            with connections[writer].cursor() as cursor:
+                cursor.execute('UPDATE student SET last_login = %s WHERE id = %s',
+                               [time.time(), rng.randint(1, options['students'])])
+
+        def read(rng):
+            with connections[reader].cursor() as cursor:
+                cursor.execute(
+                    'SELECT c.id, c.title, c.students_count, COUNT(e.id) FROM course c '
+                    'LEFT JOIN enrollment e ON e.course_id = c.id GROUP BY c.id ORDER BY c.students_count DESC LIMIT 12'
+                )
+                cursor.fetchall()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local = {'reads': 0, 'writes': 0, 'locked': 0, 'write_latencies': [], 'read_latencies': []}
+            try:
+                while time.monotonic() < deadline:
+                    is_write = rng.random() < options['write_ratio']
+                    operation = (enroll if rng.random() < 0.7 else login) if is_write else read
+                    started = time.perf_counter()
+                    try:
+                        operation(rng)
+                    except OperationalError as e:
+                        if 'locked' not in str(e) and 'busy' not in str(e):
+                            raise
+                        local['locked'] += 1
+                        continue
+                    kind = 'write' if is_write else 'read'
+                    local[f'{kind}s'] += 1
+                    local[f'{kind}_latencies'].append(time.perf_counter() - started)
+            finally:
+                for alias in aliases:
+                    connections[alias].close()
+            with lock:
+                for key, value in local.items():
+                    result[key] += value
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result['elapsed'] = time.monotonic() - started
+        return result
+
+    def _report(self, mode, result):
+        def p95(values):
+            if len(values) < 2:
+                return sum(values) * 1000
+            return statistics.quantiles(values, n=20)[-1] * 1000
+
+        elapsed = result['elapsed']
+        line = (
+            f"{mode:<6} o'qish {result['reads'] / elapsed:>8.0f}/s (p95 {p95(result['read_latencies']):.1f}ms)   "
+            f"yozish {result['writes'] / elapsed:>7.0f}/s (p95 {p95(result['write_latencies']):.1f}ms)   "
+            f"'database is locked': {result['locked']}"
+        )
+        self.stdout.write(self.style.ERROR(line) if result['locked'] else self.style.SUCCESS(line))
@@ -0,0 +1,172 @@
+"""
+apps/core/metrics.py - SO'ROV METRIKALARI (Prometheus text format)
+
+Har bir URL nomi (resolver_match.url_name) bo'yicha so'rovlar soni,
+SQL so'rovlar soni, DB vaqti, shablon render vaqti va umumiy kechikish
+yig'iladi. DB alias bo'yicha: ochilgan ulanishlar, ulanishga (yoki
+pool'dan kutishga) ketgan vaqt, health check xatolari va pool holati.
+Ma'lumot jarayon (worker) xotirasida saqlanadi.
+"""
+
+import threading
+from collections import defaultdict
+
+from django.db import connections
+
+# Kechikish histogrammasi chegaralari (sekund)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _ViewStats:
+    __slots__ = ('requests', 'queries', 'db_seconds', 'template_seconds', 'seconds', 'buckets')
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class _ConnectionStats:
+    __slots__ = ('opened', 'seconds', 'health_check_failures')
+
+    def __init__(self):
+        self.opened = 0
+        self.seconds = 0.0
+        self.health_check_failures = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(_ViewStats)
+        self._connections = defaultdict(_ConnectionStats)
+
+    def record(self, view, queries, db_seconds, template_seconds, seconds):
+        with self._lock:
+            stats = self._views[view]
+            stats.requests += 1
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.template_seconds += template_seconds
+            stats.seconds += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+
+    def record_connection(self, alias, seconds):
+        with self._lock:
+            stats = self._connections[alias]
+            stats.opened += 1
+            stats.seconds += seconds
+
+    def record_health_check_failure(self, alias):
+        with self._lock:
+            self._connections[alias].health_check_failures += 1
+
+    def connection_snapshot(self):
+        with self._lock:
+            return {alias: {
+                'opened': s.opened,
+                'seconds': s.seconds,
+                'health_check_failures': s.health_check_failures,
+            } for alias, s in self._connections.items()}
+
+    def snapshot(self):
+        with self._lock:
+            return {view: {
+                'requests': s.requests,
+                'queries': s.queries,
+                'db_seconds': s.db_seconds,
+                'template_seconds': s.template_seconds,
+                'seconds': s.seconds,
+                'buckets': list(s.buckets),
+            } for view, s in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._connections.clear()
+
+    def render_prometheus(self):
+        views = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        family('django_view_requests_total', 'counter', 'Requests handled per view')
+        for view, s in sorted(views.items()):
+            lines.append(f'django_view_requests_total{{view="{view}"}} {s["requests"]}')
+
+        family('django_view_db_queries_total', 'counter', 'SQL queries executed per view')
+        for view, s in sorted(views.items()):
+            lines.append(f'django_view_db_queries_total{{view="{view}"}} {s["queries"]}')
+
+        family('django_view_db_seconds_total', 'counter', 'Time spent in the database per view')
+        for view, s in sorted(views.items()):
+            lines.append(f'django_view_db_seconds_total{{view="{view}"}} {s["db_seconds"]:.6f}')
+
+        family('django_view_template_seconds_total', 'counter', 'Time spent rendering templates per view')
+        for view, s in sorted(views.items()):
+            lines.append(f'django_view_template_seconds_total{{view="{view}"}} {s["template_seconds"]:.6f}')
+
+        family('django_view_duration_seconds', 'histogram', 'Total request latency per view')
+        for view, s in sorted(views.items()):
+            for bound, count in zip(LATENCY_BUCKETS, s['buckets']):
+                lines.append(f'django_view_duration_seconds_bucket{{view="{view}",le="{bound}"}} {count}')
+            lines.append(f'django_view_duration_seconds_bucket{{view="{view}",le="+Inf"}} {s["requests"]}')
+            lines.append(f'django_view_duration_seconds_sum{{view="{view}"}} {s["seconds"]:.6f}')
+            lines.append(f'django_view_duration_seconds_count{{view="{view}"}} {s["requests"]}')
+
+        databases = self.connection_snapshot()
+        family('django_db_connections_opened_total', 'counter', 'New database connections (or pool checkouts) per alias')
+        for alias, s in sorted(databases.items()):
+            lines.append(f'django_db_connections_opened_total{{alias="{alias}"}} {s["opened"]}')
+
+        family('django_db_connect_seconds_total', 'counter', 'Time spent opening connections or waiting for the pool')
+        for alias, s in sorted(databases.items()):
+            lines.append(f'django_db_connect_seconds_total{{alias="{alias}"}} {s["seconds"]:.6f}')
+
+        family('django_db_health_check_failures_total', 'counter', 'Persistent connections dropped by CONN_HEALTH_CHECKS')
+        for alias, s in sorted(databases.items()):
+            lines.append(f'django_db_health_check_failures_total{{alias="{alias}"}} {s["health_check_failures"]}')
+
+        pools = pool_stats()
+        for name, key, kind, help_text in POOL_METRICS:
+            family(name, kind, help_text)
+            for alias, stats in sorted(pools.items()):
+                value = stats.get(key, 0)
+                if key.endswith('_ms'):
+                    value = f'{value / 1000:.3f}'
+                lines.append(f'{name}{{alias="{alias}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Prometheus nomi → psycopg_pool get_stats() kaliti
+POOL_METRICS = (
+    ('django_db_pool_size', 'pool_size', 'gauge', 'Connections currently managed by the pool'),
+    ('django_db_pool_max_size', 'pool_max', 'gauge', 'Configured maximum pool size'),
+    ('django_db_pool_available', 'pool_available', 'gauge', 'Idle connections in the pool'),
+    ('django_db_pool_requests_waiting', 'requests_waiting', 'gauge', 'Requests currently waiting for a connection'),
+    ('django_db_pool_requests_queued_total', 'requests_queued', 'counter', 'Requests that had to wait for a connection'),
+    ('django_db_pool_wait_seconds_total', 'requests_wait_ms', 'counter', 'Total time requests waited for a connection'),
+    ('django_db_pool_errors_total', 'requests_errors', 'counter', 'Requests that failed to get a connection'),
+    ('django_db_pool_connections_lost_total', 'connections_lost', 'counter', 'Connections found broken by pool checks'),
+)
+
+
+def pool_stats():
+    """OPTIONS['pool'] yoqilgan alias'lar uchun psycopg_pool statistikasi"""
+    stats = {}
+    for alias in connections:
+        if connections.settings[alias]['OPTIONS'].get('pool'):
+            stats[alias] = connections[alias].pool.get_stats()
+    return stats
+
+
+registry = MetricsRegistry()
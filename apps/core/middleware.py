@@ -0,0 +1,138 @@
+"""
+apps/core/middleware.py - SO'ROVLARNI O'LCHASH
+
+QueryInstrumentationMiddleware har bir so'rov uchun SQL so'rovlar soni,
+DB vaqti, shablon render vaqti va umumiy vaqtni o'lchaydi:
+  * core.metrics.registry ga yozadi (/metrics/ sahifasi)
+  * SERVER_TIMING yoqilgan bo'lsa – ``Server-Timing`` sarlavhasi
+  * QUERY_BUDGETS dagi limitdan oshsa – ogohlantirish logi
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template as DjangoTemplate
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds', 'template_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper sifatida"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def _install_template_timer():
+    if getattr(DjangoTemplate.render, '_timed', False):
+        return
+    original = DjangoTemplate.render
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            stats.template_seconds += time.perf_counter() - start
+
+    render._timed = True
+    DjangoTemplate.render = render
+
+
+def _instrument_query(execute, sql, params, many, context):
+    """Har bir DB ulanishiga bir marta o'rnatiladi; joriy so'rov statistikasi contextvar'dan olinadi"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _instrument_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_instrument_query)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Sync va async rejimda ishlaydi. Async view'larda ORM so'rovlari boshqa
+    oqimda (sync_to_async) bajariladi va u yerda o'z DB ulanishi bo'ladi,
+    shuning uchun hisoblagich so'rov boshida ulanishga emas, har bir yangi
+    ulanishga (connection_created) o'rnatiladi va contextvar orqali
+    joriy so'rovni topadi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        _install_template_timer()
+        connection_created.connect(_install_query_wrapper, dispatch_uid='core.instrument_query')
+        # Allaqachon ochilgan ulanishlar (masalan, runserver tekshiruvlari) uchun
+        for conn in connections.all(initialized_only=True):
+            _install_query_wrapper(None, conn)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, time.perf_counter() - start)
+
+    def _finish(self, request, response, stats, total):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else 'unresolved'
+        registry.record(view, stats.queries, stats.db_seconds, stats.template_seconds, total)
+
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view)
+        if budget is not None and stats.queries > budget:
+            logger.warning("%s: %d ta SQL so'rov (limit %d) – %s", view, stats.queries, budget, request.path)
+
+        if getattr(settings, 'SERVER_TIMING', False):
+            response.headers['Server-Timing'] = (
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                f'tpl;dur={stats.template_seconds * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        return response
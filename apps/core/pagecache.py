@@ -0,0 +1,172 @@
+"""
+apps/core/pagecache.py - ANONIM FOYDALANUVCHILAR UCHUN SAHIFA VA FRAGMENT KESHI
+
+Katalog sahifalari (bosh sahifa, kurslar, portfolio) anonim mehmonlarga
+bir xil HTML qaytaradi, shuning uchun ular to'liq keshlanadi. Har bir
+sahifa bir yoki bir nechta "namespace" ga bog'lanadi; tegishli model
+o'zgarganda namespace avlodi (generation) oshiriladi va eski yozuvlar
+o'z-o'zidan eskiradi – TTL faqat zaxira.
+
+    @cache_anonymous_page('catalog')
+    def course(request): ...
+
+Shablon fragmentlari uchun ``cache_versions`` context processor'i:
+
+    {% load cache %}
+    {% cache 600 course_cards cache_versions.catalog %} ... {% endcache %}
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+GENERATION_KEY = 'pagecache:gen:{}'
+PAGE_KEY = 'pagecache:page:{}'
+
+# Qaysi model o'zgarsa qaysi namespace eskiradi.
+# Enrollment yo'q: katalog faqat kursdagi students_count'ni ko'rsatadi, u esa
+# hisoblagich haqiqatan o'zgarganda alohida eskirtiriladi (course/models.py) –
+# progress yangilanishlari keshni tozalamaydi
+DEPENDENCIES = {
+    'catalog': ['course.Course', 'course.Category', 'course.Lesson'],
+    'portfolio': ['portfolio.Portfolio', 'portfolio.Category', 'portfolio.Technology'],
+}
+
+
+def get_generation(namespace):
+    generation = cache.get(GENERATION_KEY.format(namespace))
+    if generation is None:
+        generation = 1
+        cache.add(GENERATION_KEY.format(namespace), generation, None)
+    return generation
+
+
+def invalidate(*namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(GENERATION_KEY.format(namespace))
+        except ValueError:
+            cache.add(GENERATION_KEY.format(namespace), 1, None)
+
+
+def invalidate_on_commit(*namespaces):
+    transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def _page_key_from(generations, request):
+    raw = f"{','.join(generations)}|{request.get_full_path()}"
+    return PAGE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+def _page_key(request, namespaces):
+    return _page_key_from([f'{ns}:{get_generation(ns)}' for ns in namespaces], request)
+
+
+async def _apage_key(request, namespaces):
+    keys = {GENERATION_KEY.format(ns): ns for ns in namespaces}
+    found = await cache.aget_many(keys)
+    generations = []
+    for key, ns in keys.items():
+        generation = found.get(key)
+        if generation is None:
+            generation = 1
+            await cache.aadd(key, generation, None)
+        generations.append(f'{ns}:{generation}')
+    return _page_key_from(generations, request)
+
+
+def _is_cacheable_request(request, user=None):
+    user = request.user if user is None else user
+    return (
+        request.method in ('GET', 'HEAD')
+        and not user.is_authenticated
+        and 'messages' not in request.COOKIES
+    )
+
+
+def _cached_response(cached):
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response.headers['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def _should_store(response):
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def cache_anonymous_page(*namespaces, timeout=None):
+    """View natijasini anonim foydalanuvchilar uchun keshlash (sync va async view'lar)"""
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+                    return await view(request, *args, **kwargs)
+                if not _is_cacheable_request(request, await request.auser()):
+                    return await view(request, *args, **kwargs)
+
+                key = await _apage_key(request, namespaces)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return _cached_response(cached)
+
+                response = await view(request, *args, **kwargs)
+                if _should_store(response):
+                    ttl = timeout if timeout is not None else settings.PAGE_CACHE_TIMEOUT
+                    await cache.aset(key, (response.content, response.headers['Content-Type']), ttl)
+                    response.headers['X-Page-Cache'] = 'MISS'
+                return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'PAGE_CACHE_ENABLED', True) or not _is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, namespaces)
+            cached = cache.get(key)
+            if cached is not None:
+                return _cached_response(cached)
+
+            response = view(request, *args, **kwargs)
+            if _should_store(response):
+                ttl = timeout if timeout is not None else settings.PAGE_CACHE_TIMEOUT
+                cache.set(key, (response.content, response.headers['Content-Type']), ttl)
+                response.headers['X-Page-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cache_versions(request):
+    """Context processor: fragment keshlari uchun namespace avlodlari"""
+    return {
+        'cache_versions': SimpleLazyObject(lambda: {ns: get_generation(ns) for ns in DEPENDENCIES}),
+    }
+
+
+# ============================================================
+# SIGNALLAR – o'zgarishda aniq namespace'ni eskirtirish
+# ============================================================
+def _connect_invalidation():
+    for namespace, models in DEPENDENCIES.items():
+        for model in models:
+            def handler(sender, raw=False, _namespace=namespace, **kwargs):
+                if not raw:
+                    invalidate_on_commit(_namespace)
+
+            uid = f'pagecache:{namespace}:{model}'
+            post_save.connect(handler, sender=model, weak=False, dispatch_uid=uid + ':save')
+            post_delete.connect(handler, sender=model, weak=False, dispatch_uid=uid + ':delete')
@@ -0,0 +1,182 @@
+"""
+apps/core/pagination.py - KEYSET (CURSOR) PAGINATSIYA
+
+OFFSET o'rniga oxirgi ko'rsatilgan qatorning tartiblash qiymatlaridan
+keyingi qatorlar olinadi, shuning uchun 100-sahifa ham 1-sahifa kabi
+tez ishlaydi (indeks bo'yicha qidiruv). Cursor – shaffof bo'lmagan
+base64 satr.
+
+    paginator = KeysetPaginator(qs, ordering=('-is_featured', '-created_at', 'id'), per_page=12)
+    page = paginator.get_page(request.GET.get('cursor'))
+    page.object_list, page.next_cursor, page.previous_cursor
+    page = await paginator.aget_page(cursor)     # async view'lar uchun
+
+Tartiblash oxirgi maydoni noyob bo'lishi shart (odatda ``id``).
+"""
+
+import asyncio
+import base64
+import datetime
+import decimal
+import hashlib
+import json
+from functools import reduce
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .async_views import alist
+
+
+class InvalidCursor(Exception):
+    """Cursor buzilgan yoki boshqa tartib uchun yaratilgan"""
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Cursor uchun qo'llab-quvvatlanmaydigan tur: {type(value)!r}")
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page=12, count_timeout=None):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        # None – umumiy son hisoblanmaydi; aks holda keshlangan taxminiy son
+        self.count_timeout = count_timeout
+
+        model = queryset.model
+        self._fields = [
+            (name.lstrip('-'), name.startswith('-'), model._meta.get_field(name.lstrip('-')))
+            for name in self.ordering
+        ]
+
+    # ---------------- cursor ----------------
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field.attname) for _, _, field in self._fields]
+        payload = json.dumps({'d': direction, 'v': values}, default=_json_default, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('n', 'p') or len(raw_values) != len(self._fields):
+                raise InvalidCursor
+            values = [field.to_python(value) for (_, _, field), value in zip(self._fields, raw_values)]
+        except InvalidCursor:
+            raise
+        except Exception as exc:
+            raise InvalidCursor from exc
+        return direction, values
+
+    # ---------------- so'rov ----------------
+    def _seek_filter(self, values, forward):
+        """(a, b, c) > (x, y, z) ni har bir maydon yo'nalishini hisobga olib ifodalash"""
+        conditions = []
+        for i, (name, descending, _) in enumerate(self._fields):
+            # Oldinga + kamayish tartibi (yoki orqaga + o'sish) → kichikroq qiymatlar
+            lookup = 'lt' if descending == forward else 'gt'
+            equal = {self._fields[j][0]: values[j] for j in range(i)}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[i]}))
+        return reduce(lambda a, b: a | b, conditions)
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def _page_queryset(self, cursor):
+        direction, values = 'n', None
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                direction, values = 'n', None
+
+        forward = direction == 'n'
+        qs = self.queryset.order_by(*(self.ordering if forward else self._reversed_ordering()))
+        if values is not None:
+            qs = qs.filter(self._seek_filter(values, forward))
+        return qs[:self.per_page + 1], forward, values is not None
+
+    def _make_page(self, rows, forward, has_cursor, count):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, has_cursor
+        else:
+            has_next, has_previous = True, has_more
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], 'n')
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], 'p')
+
+        return KeysetPage(rows, next_cursor, previous_cursor, count)
+
+    def get_page(self, cursor=None):
+        qs, forward, has_cursor = self._page_queryset(cursor)
+        return self._make_page(list(qs), forward, has_cursor, self.approximate_count())
+
+    async def aget_page(self, cursor=None):
+        """get_page ning async varianti (qatorlar va umumiy son birgalikda olinadi)"""
+        qs, forward, has_cursor = self._page_queryset(cursor)
+        rows, count = await asyncio.gather(alist(qs), self.aapproximate_count())
+        return self._make_page(rows, forward, has_cursor, count)
+
+    def _count_key(self):
+        sql, params = self.queryset.query.sql_with_params()
+        return 'keyset:count:' + hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+
+    def approximate_count(self):
+        if self.count_timeout is None:
+            return None
+        key = self._count_key()
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(key, count, self.count_timeout)
+        return count
+
+    async def aapproximate_count(self):
+        if self.count_timeout is None:
+            return None
+        key = self._count_key()
+        count = await cache.aget(key)
+        if count is None:
+            count = await self.queryset.acount()
+            await cache.aset(key, count, self.count_timeout)
+        return count
@@ -0,0 +1,316 @@
+"""
+apps/core/search.py - KURSLAR, DARSLAR VA PORTFOLIO BO'YICHA TO'LIQ MATNLI QIDIRUV
+
+Indeks alohida jadvalda turadi va model signallari orqali
+yangilanib boradi (faqat ko'rinadigan obyektlar: nashr qilingan kurslar
+va ularning darslari, aktiv portfoliolar). Yangilash commit'dan keyin
+fon vazifasida bajariladi – qidiruv xatosi oddiy save() ni buzmaydi.
+
+    SQLite     → FTS5 virtual jadval (bm25 reyting, prefiks indeksi)
+    PostgreSQL → tsvector ustun + GIN indeks (ts_rank)
+
+Jadval ``migrate`` (post_migrate) paytida yaratiladi – birinchi
+murojaatda emas, aks holda u bekor qilingan tranzaksiya bilan birga
+yo'qolishi mumkin. To'liq qayta qurish: ``python manage.py rebuild_search_index``.
+"""
+
+import logging
+import re
+
+from django.apps import apps
+from django.db import DatabaseError, connection, connections, router
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'search_index'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MARK_START, MARK_END = '\x02', '\x03'
+MAX_QUERY_TOKENS = 8
+KIND_LABELS = {'course': 'Kurs', 'lesson': 'Dars', 'portfolio': 'Loyiha'}
+
+
+class SearchResult:
+    __slots__ = ('kind', 'object_id', 'title', 'url', 'snippet', 'rank')
+
+    def __init__(self, kind, object_id, title, url, snippet, rank):
+        self.kind = kind
+        self.object_id = object_id
+        self.title = title
+        self.url = url
+        self.rank = rank
+        # Matn foydalanuvchi kiritgan – avval escape, keyin belgilash
+        self.snippet = mark_safe(
+            escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+        )
+
+    @property
+    def kind_label(self):
+        return KIND_LABELS.get(self.kind, self.kind)
+
+
+# ============================================================
+# BACKENDLAR
+# ============================================================
+class SQLiteBackend:
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            "kind UNINDEXED, object_id UNINDEXED, url UNINDEXED, title, body, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def upsert(self, cursor, kind, object_id, url, title, body):
+        self.delete(cursor, kind, object_id)
+        cursor.execute(
+            f"INSERT INTO {TABLE} (kind, object_id, url, title, body) VALUES (%s, %s, %s, %s, %s)",
+            [kind, object_id, url, title, body],
+        )
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+
+    def search(self, cursor, tokens, limit):
+        match = ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+        cursor.execute(
+            f"SELECT kind, object_id, title, url, "
+            f"snippet({TABLE}, 4, %s, %s, '…', 16), bm25({TABLE}, 0, 0, 0, 10.0, 1.0) AS rank "
+            f"FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY rank LIMIT %s",
+            [MARK_START, MARK_END, match, limit],
+        )
+        return cursor.fetchall()
+
+
+class PostgresBackend:
+    document = "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')"
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            "kind varchar(20) NOT NULL, object_id bigint NOT NULL, url varchar(255) NOT NULL, "
+            "title text NOT NULL, body text NOT NULL, document tsvector NOT NULL, "
+            "PRIMARY KEY (kind, object_id))"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document_idx ON {TABLE} USING gin (document)")
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def upsert(self, cursor, kind, object_id, url, title, body):
+        cursor.execute(
+            f"INSERT INTO {TABLE} (kind, object_id, url, title, body, document) "
+            f"VALUES (%s, %s, %s, %s, %s, {self.document}) "
+            "ON CONFLICT (kind, object_id) DO UPDATE SET "
+            "url = EXCLUDED.url, title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document",
+            [kind, object_id, url, title, body, title, body],
+        )
+
+    def delete(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, object_id])
+
+    def search(self, cursor, tokens, limit):
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        cursor.execute(
+            "SELECT kind, object_id, title, url, "
+            "ts_headline('simple', body, q, %s), ts_rank(document, q) AS rank "
+            f"FROM {TABLE}, to_tsquery('simple', %s) q "
+            "WHERE document @@ q ORDER BY rank DESC LIMIT %s",
+            [f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=30, MinWords=10', query, limit],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgresBackend,
+}
+
+
+def get_backend():
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise NotImplementedError(f"Qidiruv {connection.vendor} uchun qo'llab-quvvatlanmaydi")
+
+
+def create_index_table(using='default', **kwargs):
+    """post_migrate: indeks jadvalini yaratish (IF NOT EXISTS)"""
+    db = connections[using]
+    if db.vendor not in BACKENDS or not router.allow_migrate(using, 'core'):
+        return
+    with db.cursor() as cursor:
+        BACKENDS[db.vendor]().create(cursor)
+
+
+# ============================================================
+# HUJJATLAR
+# ============================================================
+def _course_document(course):
+    if course.status != 'published':
+        return None
+    body = '\n'.join(filter(None, [course.short_description, course.description]))
+    return reverse('course_detail', args=[course.pk]), course.title, body
+
+
+def _lesson_document(lesson):
+    if lesson.course.status != 'published':
+        return None
+    body = '\n'.join(filter(None, [lesson.description, lesson.content]))
+    url = reverse('lesson_view', args=[lesson.course_id, lesson.pk])
+    return url, f'{lesson.course.title} → {lesson.title}', body
+
+
+def _portfolio_document(portfolio):
+    if not portfolio.is_active:
+        return None
+    body = '\n'.join(filter(None, [portfolio.description, portfolio.technologies]))
+    return reverse('portfolio'), portfolio.title, body
+
+
+DOCUMENTS = {
+    'course': _course_document,
+    'lesson': _lesson_document,
+    'portfolio': _portfolio_document,
+}
+
+
+def index_object(kind, obj):
+    backend = get_backend()
+    document = DOCUMENTS[kind](obj)
+    with connection.cursor() as cursor:
+        if document is None:
+            backend.delete(cursor, kind, obj.pk)
+        else:
+            backend.upsert(cursor, kind, obj.pk, *document)
+
+
+def remove_object(kind, object_id):
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.delete(cursor, kind, object_id)
+
+
+def reindex_course_lessons(course_id):
+    """Kurs holati o'zgarsa darslarining ko'rinishi ham o'zgaradi"""
+    from course.models import Lesson
+
+    try:
+        for lesson in Lesson.objects.filter(course_id=course_id).select_related('course'):
+            index_object('lesson', lesson)
+    except DatabaseError:
+        logger.exception("Kurs #%s darslarini qidiruv indeksiga yozib bo'lmadi", course_id)
+
+
+def rebuild_index():
+    from course.models import Course, Lesson
+    from portfolio.models import Portfolio
+
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.drop(cursor)
+        backend.create(cursor)
+
+    counts = {}
+    for kind, queryset in [
+        ('course', Course.objects.filter(status='published')),
+        ('lesson', Lesson.objects.filter(course__status='published').select_related('course')),
+        ('portfolio', Portfolio.objects.filter(is_active=True)),
+    ]:
+        counts[kind] = 0
+        for obj in queryset.iterator():
+            index_object(kind, obj)
+            counts[kind] += 1
+    return counts
+
+
+def search(query, limit=20):
+    tokens = TOKEN_RE.findall(query.lower())[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return []
+    backend = get_backend()
+    try:
+        with connection.cursor() as cursor:
+            rows = backend.search(cursor, tokens, limit)
+    except DatabaseError:
+        # Masalan, migrate hali ishlatilmagan – sahifa 500 bermasin
+        logger.exception("Qidiruv so'rovi bajarilmadi: %r", query)
+        return []
+    return [SearchResult(kind, int(object_id), title, url, snippet, rank)
+            for kind, object_id, title, url, snippet, rank in rows]
+
+
+# ============================================================
+# SIGNALLAR
+# ============================================================
+# Tur → (model, indeksga kiradigan maydonlar)
+INDEXED = {
+    'course': ('course.Course', {'title', 'status', 'short_description', 'description'}),
+    'lesson': ('course.Lesson', {'title', 'description', 'content', 'course'}),
+    'portfolio': ('portfolio.Portfolio', {'title', 'description', 'technologies', 'is_active'}),
+}
+
+
+def _queryset(kind):
+    queryset = apps.get_model(INDEXED[kind][0])._default_manager.all()
+    return queryset.select_related('course') if kind == 'lesson' else queryset
+
+
+def update_object(kind, object_id):
+    """Fon vazifasi: obyektni bazadan qayta o'qib, indeksni yangilash yoki o'chirish"""
+    try:
+        obj = _queryset(kind).filter(pk=object_id).first()
+        if obj is None:
+            remove_object(kind, object_id)
+        else:
+            index_object(kind, obj)
+    except DatabaseError:
+        logger.exception("%s #%s ni qidiruv indeksiga yozib bo'lmadi", kind, object_id)
+
+
+def _touches_index(kind, update_fields):
+    # save(update_fields=[...]) indeksdagi maydonlarga tegmasa (hisoblagichlar,
+    # video holati va h.k.) – indeksni yangilash shart emas
+    return update_fields is None or not INDEXED[kind][1].isdisjoint(update_fields)
+
+
+def _course_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._search_previous = None
+    if not raw and not instance._state.adding and _touches_index('course', update_fields):
+        instance._search_previous = (
+            sender.objects.filter(pk=instance.pk).values_list('status', 'title').first()
+        )
+
+
+def _saved(kind):
+    def handler(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or not _touches_index(kind, update_fields):
+            return
+        enqueue(update_object, kind, instance.pk)
+        # Darslar hujjati kurs holati va nomiga bog'liq – faqat ular o'zgarsa
+        previous = getattr(instance, '_search_previous', None) if kind == 'course' else None
+        if previous is not None and previous != (instance.status, instance.title):
+            enqueue(reindex_course_lessons, instance.pk)
+    return handler
+
+
+def _deleted(kind):
+    def handler(sender, instance, **kwargs):
+        enqueue(update_object, kind, instance.pk)
+    return handler
+
+
+def connect_signals():
+    pre_save.connect(_course_pre_save, sender='course.Course', dispatch_uid='search:course:pre_save')
+    for kind, (model, _fields) in INDEXED.items():
+        post_save.connect(_saved(kind), sender=model, weak=False, dispatch_uid=f'search:{kind}')
+        post_delete.connect(_deleted(kind), sender=model, weak=False, dispatch_uid=f'search:{kind}:delete')
+    # Jadval modelga bog'liq app'ning migrate'idan keyin yaratiladi (core'da model yo'q)
+    post_migrate.connect(create_index_table, sender=apps.get_app_config('course'), dispatch_uid='search:create')
@@ -0,0 +1,232 @@
+"""
+apps/core/staticfiles.py - STATIK FAYLLAR: HASH'LI NOMLAR + OLDINDAN SIQILGAN NUSXALAR
+
+collectstatic bosqichida:
+    css/styles.css → css/styles.3f2a9c1b7e4d.css        (ManifestStaticFilesStorage)
+                   → css/styles.3f2a9c1b7e4d.css.gz     (gzip -9)
+                   → css/styles.3f2a9c1b7e4d.css.br     (brotli, paket o'rnatilgan bo'lsa)
+
+So'rov vaqtida hech narsa siqilmaydi: PrecompressedStaticMiddleware
+(pastda) Accept-Encoding bo'yicha tayyor nusxani beradi, hash'li nomlarga
+esa bir yillik "immutable" kesh sarlavhalari qo'yiladi. Middleware WSGI
+va ASGI (async) rejimlarida ishlaydi; STATIC_ROOT indeksi jarayon
+boshlanganda bir marta tuziladi – collectstatic'dan keyin server qayta
+ishga tushiriladi.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # ixtiyoriy bog'liqlik – bo'lmasa faqat gzip
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.xml', '.html', '.ico', '.ttf', '.eot')
+# Bundan kichik fayllarni siqishdan foyda yo'q
+MIN_SIZE = 256
+# Siqilgan nusxa kamida shuncha foiz kichik bo'lmasa saqlanmaydi
+MIN_SAVING = 0.05
+
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def _compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hash'li nomlar + har bir matn faylining .gz/.br nusxasi"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        names = set(self.hashed_files.values()) | set(self.hashed_files)
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                for compressed_name in self._compress(name):
+                    yield name, compressed_name, True
+
+    def _compress(self, name):
+        path = self.path(name)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        if len(data) < MIN_SIZE:
+            return
+
+        for suffix, compress in _compressors():
+            compressed = compress(data)
+            target = path + suffix
+            if len(compressed) > len(data) * (1 - MIN_SAVING):
+                if os.path.exists(target):
+                    os.remove(target)
+                continue
+            with open(target, 'wb') as f:
+                f.write(compressed)
+            yield name + suffix
+
+
+# ============================================================
+# CRITICAL CSS
+# ============================================================
+CRITICAL_RE = re.compile(r'/\*\s*critical:start\b.*?\*/(.*?)/\*\s*critical:end\s*\*/', re.S)
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+
+
+def extract_critical_css(css):
+    """
+    Stil faylidagi ``/* critical:start */ … /* critical:end */`` bo'laklari
+    (izohlarsiz, ixchamlangan). Alohida qo'lda yozilgan nusxa yo'q – manba bitta.
+    """
+    critical = '\n'.join(CRITICAL_RE.findall(css))
+    critical = CSS_COMMENT_RE.sub('', critical)
+    return '\n'.join(line.strip() for line in critical.splitlines() if line.strip())
+
+
+# ============================================================
+# BERISH (WSGI/ASGI middleware)
+# ============================================================
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Hash'siz nomlar (masalan, tashqi skriptlar ishlatadigan) – har safar qayta tekshiriladi
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+# Bundan kichik fayllar xotirada saqlanadi (har so'rovda diskka murojaat yo'q)
+MEMORY_LIMIT = 512 * 1024
+
+
+class StaticAsset:
+    __slots__ = ('content_type', 'immutable', 'variants')
+
+    def __init__(self, content_type, immutable):
+        self.content_type = content_type
+        self.immutable = immutable
+        # kodlash ('' – siqilmagan) → (yo'l, hajm, mtime)
+        self.variants = {}
+
+
+def _build_index(root):
+    """STATIC_ROOT dagi fayllar: nom → StaticAsset"""
+    index = {}
+    if not root or not os.path.isdir(root):
+        return index
+    try:
+        with open(os.path.join(root, ManifestStaticFilesStorage.manifest_name)) as f:
+            hashed = set(json.load(f).get('paths', {}).values())
+    except (FileNotFoundError, ValueError):
+        hashed = set()
+
+    suffixes = {suffix: encoding for encoding, suffix in ENCODINGS.items()}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            base, suffix = os.path.splitext(name)
+            encoding = suffixes.get(suffix, '')
+            if encoding and not os.path.exists(os.path.join(root, base)):
+                # O'zi .gz/.br bo'lgan asl fayl (masalan, arxiv)
+                base, encoding = name, ''
+            elif not encoding:
+                base = name
+            stat = os.stat(path)
+            asset = index.get(base)
+            if asset is None:
+                content_type = mimetypes.guess_type(base)[0] or 'application/octet-stream'
+                if content_type.startswith('text/') or content_type in ('application/javascript', 'image/svg+xml'):
+                    content_type += '; charset=utf-8'
+                asset = index[base] = StaticAsset(content_type, base in hashed)
+            asset.variants[encoding] = (path, stat.st_size, int(stat.st_mtime))
+    return index
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        encoding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticMiddleware:
+    """STATIC_URL ostidagi so'rovlarni STATIC_ROOT dan (oldindan siqilgan holda) berish"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # STATIC_URL tashqi CDN bo'lsa middleware hech narsa qilmaydi
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else None
+        self.index = _build_index(settings.STATIC_ROOT) if self.prefix else {}
+        self._contents = {}
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.serve(request)
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        # Fayllar kichik va xotirada keshlanadi – alohida oqim (thread) shart emas
+        response = self.serve(request)
+        return response if response is not None else await self.get_response(request)
+
+    def serve(self, request):
+        if not self.index or not request.path_info.startswith(self.prefix):
+            return None
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        asset = self.index.get(request.path_info[len(self.prefix):])
+        if asset is None:
+            return None
+
+        accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = next((e for e in ENCODINGS if e in asset.variants and e in accepted), '')
+        path, size, mtime = asset.variants[encoding]
+        etag = f'"{size:x}-{mtime:x}{"-" + encoding if encoding else ""}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=mtime)
+        if response is None:
+            if size <= MEMORY_LIMIT:
+                content = self._contents.get(path)
+                if content is None:
+                    with open(path, 'rb') as f:
+                        content = self._contents[path] = f.read()
+                response = HttpResponse(content, content_type=asset.content_type)
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+            response['Content-Length'] = str(size)
+            response['Last-Modified'] = http_date(mtime)
+            if encoding:
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL
+        if len(asset.variants) > 1:
+            response['Vary'] = 'Accept-Encoding'
+        return response
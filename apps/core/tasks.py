@@ -0,0 +1,61 @@
+"""
+apps/core/tasks.py - FON VAZIFALARI (in-process navbat)
+
+Og'ir ishlar (video transkodlash, metadata o'qish va h.k.) so'rovni
+bloklamasligi uchun shu yerdan navbatga qo'yiladi.
+
+Backendlar (settings.TASKS_BACKEND):
+    'thread'    - jarayon ichidagi ThreadPoolExecutor (standart)
+    'immediate' - darhol, shu oqimning o'zida (testlar va debug uchun)
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'TASKS_MAX_WORKERS', 2),
+                    thread_name_prefix='tasks',
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Fon vazifasi xato bilan tugadi: %s", func.__qualname__)
+    finally:
+        # Pool oqimlari uzoq yashaydi – ulanishlarni ochiq qoldirmaymiz
+        connections.close_all()
+
+
+def _submit(func, args, kwargs):
+    backend = getattr(settings, 'TASKS_BACKEND', 'thread')
+    if backend == 'immediate':
+        func(*args, **kwargs)
+    else:
+        _get_executor().submit(_run, func, args, kwargs)
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Vazifani navbatga qo'yish. Tranzaksiya ichida chaqirilsa, vazifa faqat
+    commit'dan keyin ishga tushadi (bekor qilingan ma'lumot ustida ishlamaydi).
+    """
+    transaction.on_commit(lambda: _submit(func, args, kwargs))
@@ -0,0 +1,62 @@
+import logging
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.safestring import mark_safe
+
+from core.staticfiles import extract_critical_css
+
+logger = logging.getLogger(__name__)
+
+register = template.Library()
+
+
+def _read(path):
+    """
+    collectstatic natijasi (hash'li nom) bo'lsa shu, aks holda manba fayl
+    (finders) – masalan, DEBUG'da yoki collectstatic'siz testlarda.
+    """
+    if not settings.DEBUG:
+        try:
+            with staticfiles_storage.open(staticfiles_storage.stored_name(path)) as f:
+                return f.read().decode('utf-8')
+        except (ValueError, AttributeError, OSError):
+            # Manifestda yozuv yo'q (ValueError) yoki storage manifest'siz (AttributeError)
+            pass
+    found = finders.find(path)
+    if not found:
+        # Sahifa 500 bermasin – to'liq stil fayli baribir yuklanadi
+        logger.warning("Inline qilinadigan statik fayl topilmadi: %s", path)
+        return ''
+    with open(found, encoding='utf-8') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def _read_cached(path):
+    return _read(path)
+
+
+def _content(path):
+    return _read(path) if settings.DEBUG else _read_cached(path)
+
+
+@register.simple_tag
+def inline_static(path):
+    """{% inline_static 'css/print.css' %} → <style>...</style> (faylning o'zi)"""
+    return mark_safe(f'<style>{_content(path)}</style>')
+
+
+@register.simple_tag
+def critical_css(path):
+    """
+    {% critical_css 'css/styles.css' %} → <style>...</style>
+
+    Birinchi ekran uchun zarur CSS (styles.css dagi critical:start/end
+    bo'lagi) HTML ichida keladi – to'liq fayl yuklanishini kutib sahifa
+    chizilishi to'xtamaydi.
+    """
+    return mark_safe(f'<style>{extract_critical_css(_content(path))}</style>')
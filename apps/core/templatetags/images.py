@@ -0,0 +1,65 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from core import images
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 600px) 100vw, 400px'
+
+
+def _name(image):
+    """FieldFile yoki fayl nomi (str) → fayl nomi"""
+    return getattr(image, 'name', image) or ''
+
+
+@register.filter
+def srcset(image, fmt='webp'):
+    """{{ course.image|srcset:'webp' }}"""
+    return images.srcset(_name(image), fmt)
+
+
+@register.filter
+def thumb_url(image, width=160):
+    """{{ portfolio.image|thumb_url:160 }} – kichik nusxa, bo'lmasa asl rasm"""
+    name = _name(image)
+    return images.best_url(name, int(width)) if name else ''
+
+
+@register.simple_tag
+def picture(image, alt='', sizes=DEFAULT_SIZES, css_class='', loading='lazy'):
+    """
+    {% picture course.image alt=course.title sizes="(max-width: 600px) 100vw, 400px" %}
+
+    AVIF/WebP nusxalari tayyor bo'lsa <picture> + srcset, aks holda oddiy <img>.
+    """
+    name = _name(image)
+    if not name:
+        return ''
+
+    manifest = images.get_manifest(name)
+    sources = []
+    if manifest:
+        # Tartib settings.IMAGE_DERIVATIVE_FORMATS bo'yicha (avif → webp)
+        for fmt in manifest['formats']:
+            candidates = images.srcset(name, fmt)
+            if candidates:
+                sources.append((images.CONTENT_TYPES[fmt], candidates, sizes))
+
+    img = format_html(
+        '<img src="{}" alt="{}"{}{}{}>',
+        default_storage.url(name),
+        alt,
+        # O'lcham oldindan ma'lum – sahifa "sakramaydi" (CLS)
+        format_html(' width="{}" height="{}"', manifest['width'], manifest['height']) if manifest else '',
+        format_html(' class="{}"', css_class) if css_class else '',
+        format_html(' loading="{}"', loading) if loading else '',
+    )
+    if not sources:
+        return img
+    return format_html(
+        '<picture>{}{}</picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', sources),
+        img,
+    )
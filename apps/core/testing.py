@@ -0,0 +1,38 @@
+"""
+apps/core/testing.py - TESTLAR UCHUN YORDAMCHILAR
+
+    class CourseViewsTest(QueryBudgetMixin, TestCase):
+        def test_course_detail_budget(self):
+            self.client.force_login(self.user)
+            self.assertQueryBudget('course_detail', course_id=self.course.id)
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class AppsDiscoverRunner(DiscoverRunner):
+    """``manage.py test`` (label'siz) – testlar apps/ ichidan qidiriladi (u paket emas)"""
+
+    def build_suite(self, test_labels=None, **kwargs):
+        return super().build_suite(test_labels or [str(settings.BASE_DIR / 'apps')], **kwargs)
+
+
+class QueryBudgetMixin:
+    """Har bir view uchun SQL so'rovlar limitini tekshirish (settings.QUERY_BUDGETS)"""
+
+    def assertQueryBudget(self, url_name, budget=None, method='get', data=None, using=DEFAULT_DB_ALIAS, **url_kwargs):
+        if budget is None:
+            budget = settings.QUERY_BUDGETS[url_name]
+        url = reverse(url_name, kwargs=url_kwargs or None)
+
+        with CaptureQueriesContext(connections[using]) as ctx:
+            response = getattr(self.client, method)(url, data)
+
+        if len(ctx) > budget:
+            queries = '\n'.join(f"{i}. {q['sql']}" for i, q in enumerate(ctx.captured_queries, start=1))
+            self.fail(f"{url_name}: {len(ctx)} ta SQL so'rov, limit {budget}\n{queries}")
+        return response
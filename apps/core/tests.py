@@ -0,0 +1,527 @@
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import OperationalError, connections, transaction
+from django.db.models import Model, QuerySet
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse, reverse_lazy
+from PIL import Image
+
+from course.models import Category, Course, Enrollment, Lesson, LessonProgress
+from course.progress import aget_resume_position, get_resume_position
+from portfolio.models import Category as PortfolioCategory, Portfolio
+from users.site_stats import aget_site_stats, get_site_stats
+from . import images
+from .db.backends.sqlite3.base import DatabaseWrapper
+from .db.routers import ReadReplicaRouter
+from .db.warmup import warmup
+from .pagecache import get_generation
+from .pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from .search import search
+from .staticfiles import PrecompressedStaticMiddleware, extract_critical_css
+from .templatetags import assets
+
+
+@override_settings(TASKS_BACKEND='immediate')
+class SearchIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Dasturlash')
+
+    def create_course(self, title, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Course.objects.create(title=title, description='Tavsif', category=self.category,
+                                         status='published', **kwargs)
+
+    def test_rolled_back_save_does_not_break_index(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            Course.objects.create(title='Bekor', description='x', category=self.category, status='published')
+            raise ValueError
+        self.create_course('Pythonchilar kursi')
+        self.assertEqual([r.title for r in search('pythonchilar')], ['Pythonchilar kursi'])
+
+    def test_lessons_reindexed_only_on_status_or_title_change(self):
+        course = self.create_course('Django')
+        with mock.patch('core.search.enqueue') as enqueue:
+            course.save(update_fields=['total_hours', 'lessons_count'])
+            enqueue.assert_not_called()
+
+            course.description = 'Yangi tavsif'
+            course.save()
+            self.assertEqual([call.args[0].__name__ for call in enqueue.call_args_list], ['update_object'])
+
+            enqueue.reset_mock()
+            course.status = 'archived'
+            course.save()
+            self.assertEqual([call.args[0].__name__ for call in enqueue.call_args_list],
+                             ['update_object', 'reindex_course_lessons'])
+
+    def test_unpublished_course_is_removed(self):
+        course = self.create_course('Flask asoslari')
+        course.status = 'draft'
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+        self.assertEqual(search('flask'), [])
+
+
+class CriticalCssTest(TestCase):
+    def setUp(self):
+        assets._read_cached.cache_clear()
+        self.addCleanup(assets._read_cached.cache_clear)
+
+    def test_page_renders_without_collectstatic(self):
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.content.decode(), r'(?s)<style>:root.*\.navbar.*</style>')
+
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage'},
+    })
+    def test_manifest_storage_without_manifest_falls_back_to_source(self):
+        self.assertIn('.navbar', assets.critical_css('css/styles.css'))
+
+
+class ExtractCriticalCssTest(SimpleTestCase):
+    def test_only_marked_block_without_comments(self):
+        css = '.a { color: red; }\n/* critical:start */\n.b {\n  color: blue; /* izoh */\n}\n/* critical:end */\n.c {}'
+        self.assertEqual(extract_critical_css(css), '.b {\ncolor: blue;\n}')
+
+    def test_missing_markers(self):
+        self.assertEqual(extract_critical_css('.a { color: red; }'), '')
+
+
+class MetricsAccessTest(TestCase):
+    url = reverse_lazy('metrics')
+
+    def test_anonymous_localhost_is_forbidden_by_default(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+
+    def test_staff(self):
+        self.client.force_login(User.objects.create_user('admin', password='parol', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='maxfiy')
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer maxfiy'}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer boshqa'}).status_code, 403)
+
+    def test_empty_token_is_not_accepted(self):
+        self.assertEqual(self.client.get(self.url, headers={'Authorization': 'Bearer '}).status_code, 403)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_opt_in_ip_allow_list(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+
+class KeysetPaginationTest(TestCase):
+    ordering = ('-students_count', '-created_at', 'id')
+
+    @classmethod
+    def setUpTestData(cls):
+        # Bir xil students_count'lar – tartib keyingi maydonlar bilan aniqlanadi
+        Course.objects.bulk_create(
+            Course(title=f'Kurs {i}', description='x', students_count=i % 4) for i in range(30)
+        )
+        cls.expected = list(Course.objects.order_by(*cls.ordering).values_list('pk', flat=True))
+
+    def paginator(self):
+        return KeysetPaginator(Course.objects.all(), ordering=self.ordering, per_page=12)
+
+    def ids(self, page):
+        return [course.pk for course in page]
+
+    def test_forward_then_back(self):
+        paginator = self.paginator()
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.expected)
+        self.assertFalse(first.has_previous)
+        self.assertFalse(third.has_next)
+
+        back_to_second = paginator.get_page(third.previous_cursor)
+        self.assertEqual(self.ids(back_to_second), self.ids(second))
+        back_to_first = paginator.get_page(back_to_second.previous_cursor)
+        self.assertEqual(self.ids(back_to_first), self.ids(first))
+        self.assertFalse(back_to_first.has_previous)
+        self.assertEqual(back_to_first.next_cursor, first.next_cursor)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        paginator = self.paginator()
+        first = self.ids(paginator.get_page())
+
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        for cursor in (
+            'buzilgan!!',
+            paginator.get_page().next_cursor[:-3],
+            encode({'d': 'x', 'v': [1, '2025-01-01T00:00:00+00:00', 1]}),
+            encode({'d': 'n', 'v': [1, 2]}),
+            encode({'d': 'n', 'v': ['son emas', 'sana emas', 1]}),
+            encode(['n']),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.ids(paginator.get_page(cursor)), first)
+
+    def test_decode_rejects_wrong_shape(self):
+        with self.assertRaises(InvalidCursor):
+            self.paginator().decode_cursor(base64.urlsafe_b64encode(b'{"d":"n","v":[1]}').decode())
+
+
+# ============================================================
+# O'QISH REPLIKASI VA SQLITE BACKEND
+# ============================================================
+class ReadReplicaRouterTest(TestCase):
+    def test_reads_inside_atomic_stay_on_default(self):
+        router = ReadReplicaRouter()
+        # TestCase testni tranzaksiyada o'tkazadi
+        self.assertEqual(router.db_for_read(Course), 'default')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Course), 'default')
+        self.assertEqual(router.db_for_write(Course), 'default')
+
+    def test_reads_outside_atomic_go_to_replica(self):
+        router = ReadReplicaRouter()
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            self.assertEqual(router.db_for_read(Course), 'replica')
+        self.assertTrue(router.allow_migrate('default', 'course'))
+        self.assertFalse(router.allow_migrate('replica', 'course'))
+
+
+class SqliteBackendTest(SimpleTestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.path = os.path.join(root, 'db.sqlite3')
+
+        writer = self.connect()
+        writer.cursor().execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)')
+        writer.close()
+
+    def connect(self, **options):
+        settings_dict = {
+            **connections['default'].settings_dict,
+            'NAME': self.path,
+            'OPTIONS': options,
+            'CONN_MAX_AGE': 0,
+        }
+        connection = DatabaseWrapper(settings_dict, alias='sqlite_test')
+        self.addCleanup(connection.close)
+        return connection
+
+    def begin(self, connection):
+        connection.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+
+    def test_pragmas(self):
+        cursor = self.connect().cursor()
+        self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+
+    def test_replica_refuses_writes(self):
+        writer = self.connect()
+        writer.cursor().execute("INSERT INTO item (name) VALUES ('a')")
+
+        replica = self.connect(read_only=True)
+        cursor = replica.cursor()
+        self.assertEqual(cursor.execute('SELECT name FROM item').fetchall(), [('a',)])
+        self.assertIsNone(replica.writer_lock)
+        with self.assertRaises(OperationalError):
+            cursor.execute("INSERT INTO item (name) VALUES ('b')")
+
+    def test_writer_lock_released_on_commit_rollback_and_close(self):
+        connection = self.connect()
+        connection.ensure_connection()
+        for finish in ('commit', 'rollback', 'close'):
+            with self.subTest(finish=finish):
+                self.begin(connection)
+                self.assertTrue(connection.writer_lock.locked())
+                connection.cursor().execute("INSERT INTO item (name) VALUES ('x')")
+                getattr(connection, finish)()
+                self.assertFalse(connection.writer_lock.locked())
+                connection.set_autocommit(True)
+
+        reader = self.connect(read_only=True)
+        self.assertEqual(reader.cursor().execute('SELECT COUNT(*) FROM item').fetchone()[0], 1)
+
+    def test_second_writer_waits_for_the_lock(self):
+        first, second = self.connect(), self.connect(timeout=0.1)
+        first.ensure_connection()
+        second.ensure_connection()
+        self.assertIs(first.writer_lock, second.writer_lock)
+
+        self.begin(first)
+        with self.assertRaises(OperationalError):
+            self.begin(second)
+        first.rollback()
+        self.begin(second)
+        second.commit()
+        self.assertFalse(second.writer_lock.locked())
+
+
+# ============================================================
+# RASM NUSXALARI (WebP/AVIF, srcset)
+# ============================================================
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=[160, 320, 640], IMAGE_DERIVATIVE_FORMATS=['avif', 'webp'],
+                   MEDIA_URL='/media/')
+class ImageDerivativesTest(SimpleTestCase):
+    NAME = 'course_images/rasm.png'
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (400, 300), 'red').save(buffer, format='PNG')
+        default_storage.save(self.NAME, ContentFile(buffer.getvalue()))
+
+    def render(self, source, **context):
+        return Template('{% load images %}' + source).render(Context(context))
+
+    def test_generate_derivatives(self):
+        images.generate_derivatives(self.NAME, namespaces=['catalog'])
+
+        manifest = images.get_manifest(self.NAME)
+        # Asl kenglikdan (400) kattasi yaratilmaydi – o'rniga asl kenglik
+        self.assertEqual(manifest, {'width': 400, 'height': 300, 'formats': {'avif': [160, 320, 400], 'webp': [160, 320, 400]}})
+        with default_storage.open(images.derivative_name(self.NAME, 160, 'webp')) as f:
+            self.assertEqual(Image.open(f).size, (160, 120))
+        self.assertEqual(get_generation('catalog'), 1)
+
+    def test_picture_and_srcset(self):
+        images.generate_derivatives(self.NAME)
+        webp = images.derivative_name(self.NAME, 160, 'webp')
+
+        html = self.render('{% picture image alt="Kurs" sizes="400px" %}', image=self.NAME)
+        self.assertTrue(html.startswith('<picture><source type="image/avif" srcset="/media/derivatives/'))
+        self.assertIn(f'<source type="image/webp" srcset="/media/{webp} 160w, ', html)
+        self.assertIn(f'<img src="/media/{self.NAME}" alt="Kurs" width="400" height="300" loading="lazy">', html)
+
+        self.assertEqual(self.render("{{ image|srcset:'webp' }}", image=self.NAME).split(', ')[0], f'/media/{webp} 160w')
+        self.assertEqual(self.render('{{ image|thumb_url:200 }}', image=self.NAME),
+                         '/media/' + images.derivative_name(self.NAME, 320, 'webp'))
+
+    def test_fallback_without_manifest(self):
+        html = self.render('{% picture image alt="Kurs" css_class="rasm" %}', image=self.NAME)
+        self.assertEqual(html, f'<img src="/media/{self.NAME}" alt="Kurs" class="rasm" loading="lazy">')
+        self.assertEqual(self.render("{{ image|srcset:'webp' }}", image=self.NAME), '')
+        self.assertEqual(self.render('{{ image|thumb_url:160 }}', image=self.NAME), f'/media/{self.NAME}')
+        self.assertEqual(self.render('{% picture image %}', image=''), '')
+
+    def test_remove_derivatives(self):
+        images.generate_derivatives(self.NAME)
+        images.remove_derivatives(self.NAME)
+        self.assertIsNone(images.get_manifest(self.NAME))
+        self.assertFalse(default_storage.exists(images.derivative_name(self.NAME, 160, 'webp')))
+
+
+# ============================================================
+# OLDINDAN SIQILGAN STATIK FAYLLAR
+# ============================================================
+class PrecompressedStaticMiddlewareTest(SimpleTestCase):
+    HASHED = 'css/styles.3f2a9c1b7e4d.css'
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        files = {
+            self.HASHED: b'body{color:red}',
+            self.HASHED + '.gz': b'gzip-nusxa',
+            self.HASHED + '.br': b'br-nusxa',
+            'robots.txt': b'User-agent: *',
+            'staticfiles.json': json.dumps({'paths': {'css/styles.css': self.HASHED}}).encode(),
+        }
+        for name, content in files.items():
+            os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+            with open(os.path.join(root, name), 'wb') as f:
+                f.write(content)
+
+        with override_settings(STATIC_ROOT=root, STATIC_URL='/static/'):
+            self.middleware = PrecompressedStaticMiddleware(lambda request: HttpResponse('view'))
+        self.factory = RequestFactory()
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get('/static/' + path, headers=headers))
+
+    def test_encoding_by_accept_encoding(self):
+        for accept, encoding, body in (
+            ('gzip, deflate, br', 'br', b'br-nusxa'),
+            ('gzip', 'gzip', b'gzip-nusxa'),
+            ('gzip, br;q=0', 'gzip', b'gzip-nusxa'),
+            ('', None, b'body{color:red}'),
+        ):
+            with self.subTest(accept=accept):
+                response = self.get(self.HASHED, accept_encoding=accept)
+                self.assertEqual(response.content, body)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertEqual(response['Content-Type'], 'text/css; charset=utf-8')
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_not_modified_on_matching_etag(self):
+        etag = self.get(self.HASHED, accept_encoding='gzip')['ETag']
+        response = self.get(self.HASHED, accept_encoding='gzip', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # Boshqa kodlashning ETag'i boshqa
+        response = self.get(self.HASHED, accept_encoding='br', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cache_control(self):
+        self.assertEqual(self.get(self.HASHED)['Cache-Control'], 'public, max-age=31536000, immutable')
+        response = self.get('robots.txt')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0, must-revalidate')
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_unknown_paths_fall_through(self):
+        self.assertEqual(self.get('css/yoq.css').content, b'view')
+        self.assertEqual(self.middleware(self.factory.get('/kurslar/')).content, b'view')
+        self.assertEqual(self.middleware(self.factory.post('/static/' + self.HASHED)).content, b'view')
+
+
+# ============================================================
+# ASYNC VIEW'LAR
+# ============================================================
+def _summary(value):
+    """Kontekstni solishtirish uchun: model → (model, pk), sahifa → qatorlar va kursorlar"""
+    if isinstance(value, Model):
+        return type(value).__name__, value.pk
+    if isinstance(value, KeysetPage):
+        return _summary(value.object_list), value.count, value.next_cursor, value.previous_cursor
+    if isinstance(value, (list, QuerySet)):
+        return [_summary(item) for item in value]
+    return value
+
+
+class AsyncViewsTest(TestCase):
+    """Async view'lar WSGI (sync handler) va ASGI ostida bir xil kontekst beradi"""
+
+    CONTEXT = {
+        'index': ('courses', 'portfolios', 'total_students', 'total_courses', 'total_portfolios'),
+        'course': ('courses', 'page_obj', 'total_count', 'categories', 'sort'),
+        'course_detail': ('course', 'all_lessons', 'is_enrolled'),
+        'lesson_view': ('course', 'lesson', 'is_enrolled', 'other_lessons', 'is_free_lesson', 'resume_position'),
+        'portfolio': ('page_obj', 'portfolios', 'categories', 'selected_category', 'technologies',
+                      'selected_tech', 'total_count'),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('talaba', password='parol')
+        category = Category.objects.create(name='Dasturlash')
+        cls.courses = [
+            Course.objects.create(title=f'Kurs {i}', description='Tavsif', category=category,
+                                  status='published', students_count=i)
+            for i in range(3)
+        ]
+        cls.lesson = Lesson.objects.create(course=cls.courses[0], title='Dars', description='x', order=1)
+        Enrollment.objects.create(student=cls.student, course=cls.courses[0])
+        LessonProgress.objects.create(student=cls.student, lesson=cls.lesson, course=cls.courses[0],
+                                      position_seconds=42, max_position_seconds=42)
+        cls.portfolio_category = PortfolioCategory.objects.create(title='Web', slug='web')
+        Portfolio.objects.create(title='Loyiha', description='Tavsif', category=cls.portfolio_category,
+                                 technologies='Django, React')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Kirgan foydalanuvchi – sahifa keshi chetlab o'tiladi, har safar view ishlaydi
+        self.client.force_login(self.student)
+        self.async_client.force_login(self.student)
+
+    def test_same_context_under_wsgi_and_asgi(self):
+        course, lesson = self.courses[0], self.lesson
+        pages = [
+            ('index', {}, {}),
+            ('course', {}, {}),
+            ('course', {}, {'sort': 'popular'}),
+            ('course_detail', {'course_id': course.pk}, {}),
+            ('lesson_view', {'course_id': course.pk, 'lesson_id': lesson.pk}, {}),
+            ('portfolio', {}, {}),
+            ('portfolio', {}, {'category': self.portfolio_category.pk, 'tech': 'django'}),
+        ]
+        for name, kwargs, data in pages:
+            with self.subTest(name=name, data=data):
+                url = reverse(name, kwargs=kwargs or None)
+                sync_response = self.client.get(url, data)
+                async_response = async_to_sync(self.async_client.get)(url, data)
+                self.assertEqual(async_response.status_code, 200)
+                self.assertEqual(
+                    {key: _summary(async_response.context[key]) for key in self.CONTEXT[name]},
+                    {key: _summary(sync_response.context[key]) for key in self.CONTEXT[name]},
+                )
+
+    def test_async_helpers_match_sync(self):
+        paginator = KeysetPaginator(Course.objects.all(), ordering=('-students_count', 'id'), per_page=2, count_timeout=60)
+        page = paginator.get_page()
+        self.assertEqual(_summary(async_to_sync(paginator.aget_page)()), _summary(page))
+        self.assertEqual(_summary(async_to_sync(paginator.aget_page)(page.next_cursor)),
+                         _summary(paginator.get_page(page.next_cursor)))
+
+        self.assertEqual(async_to_sync(aget_site_stats)(), get_site_stats())
+        cache.clear()
+        self.assertEqual(get_site_stats(), async_to_sync(aget_site_stats)())
+
+        self.assertEqual(async_to_sync(aget_resume_position)(self.student.id, self.lesson.id),
+                         get_resume_position(self.student.id, self.lesson.id))
+
+
+# ============================================================
+# ULANISHLARNI OLDINDAN OCHISH
+# ============================================================
+class WarmupTest(SimpleTestCase):
+    def connection(self, conn_max_age=0, **options):
+        return mock.Mock(settings_dict={'OPTIONS': options, 'CONN_MAX_AGE': conn_max_age})
+
+    def warmup(self, **aliases):
+        with mock.patch('core.db.warmup.connections', aliases):
+            warmup()
+
+    def test_without_pool(self):
+        check_only, persistent = self.connection(), self.connection(conn_max_age=600)
+        self.warmup(default=check_only, replica=persistent)
+
+        # CONN_MAX_AGE=0 – faqat tekshiruv, ulanish ochiq qolmaydi
+        check_only.ensure_connection.assert_called_once_with()
+        check_only.close.assert_called_once_with()
+        persistent.ensure_connection.assert_called_once_with()
+        persistent.close.assert_not_called()
+
+    def test_with_pool(self):
+        pooled = self.connection(pool={'min_size': 4, 'timeout': 5})
+        default_timeout = self.connection(pool=True)
+        self.warmup(default=pooled, other=default_timeout)
+
+        pooled.pool.open.assert_called_once_with(wait=True, timeout=5)
+        pooled.ensure_connection.assert_not_called()
+        default_timeout.pool.open.assert_called_once_with(wait=True, timeout=30)
+
+    def test_failure_is_logged_and_other_aliases_continue(self):
+        broken = self.connection(pool={'timeout': 1})
+        broken.pool.open.side_effect = TimeoutError('pool to\'lmadi')
+        unreachable = self.connection()
+        unreachable.ensure_connection.side_effect = OperationalError('ulanib bo\'lmadi')
+        healthy = self.connection(conn_max_age=60)
+
+        with self.assertLogs('core.db.warmup', 'WARNING') as logs:
+            self.warmup(default=broken, replica=unreachable, other=healthy)
+        self.assertEqual(len(logs.records), 2)
+        healthy.ensure_connection.assert_called_once_with()
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import health, metrics, search
+
+urlpatterns = [
+    path('health/', health, name='health'),
+    path('metrics/', metrics, name='metrics'),
+    path('search/', search, name='search'),
+]
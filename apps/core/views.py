@@ -0,0 +1,63 @@
+import hmac
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_safe
+
+from .metrics import registry
+from .search import search as run_search
+
+
+def _metrics_allowed(request):
+    if request.user.is_staff:
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if token and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+        return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+
+
+@require_safe
+def metrics(request):
+    """Prometheus uchun metrikalar (staff, bearer token yoki ruxsat etilgan IP)"""
+    if not _metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_safe
+def health(request):
+    """Load balancer / monitoring uchun: har bir DB alias'ga ``SELECT 1``"""
+    databases, healthy = {}, True
+    for alias in connections:
+        started = time.perf_counter()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError as e:
+            healthy = False
+            databases[alias] = {'ok': False, 'error': type(e).__name__}
+        else:
+            databases[alias] = {'ok': True, 'ms': round((time.perf_counter() - started) * 1000, 2)}
+    return JsonResponse({'ok': healthy, 'databases': databases}, status=200 if healthy else 503)
+
+
+@require_safe
+def search(request):
+    """Kurslar, darslar va portfolio bo'yicha qidiruv (?q=...&format=json)"""
+    query = request.GET.get('q', '').strip()[:200]
+    results = run_search(query) if query else []
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'query': query,
+            'results': [
+                {'kind': r.kind, 'id': r.object_id, 'title': r.title, 'url': r.url, 'snippet': str(r.snippet)}
+                for r in results
+            ],
+        })
+    return render(request, 'search.html', {'query': query, 'results': results})
@@ -3,11 +3,14 @@ apps/course/admin.py - ZAMONAVIY & TO'LIQ ADMIN PANEL
 """
 
 from django.contrib import admin
+from django.db.models import Count
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import (
-    Category, Course, Lesson, Enrollment,
+    Category, Course, Lesson, Enrollment, LessonProgress,
 )
+from .transcoding import schedule_transcode
 
 
 # ============================================================
@@ -19,10 +22,13 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name']
     readonly_fields = ['created_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_courses_count=Count('courses'))
+
     def courses_count(self, obj):
-        count = obj.courses.count()
-        return format_html(f'<b>{count}</b> ta kurs')
+        return format_html('<b>{}</b> ta kurs', obj._courses_count)
     courses_count.short_description = 'Kurslar soni'
+    courses_count.admin_order_field = '_courses_count'
 
 
 # ============================================================
@@ -36,13 +42,13 @@ class CourseAdmin(admin.ModelAdmin):
         'price',
         'total_hours_badge',
         'lessons_count',
-        'students_count',
+        'students_badge',
         'status_badge',
         'created_at'
     ]
     list_filter = ['status', 'category', 'level', 'created_at']
     search_fields = ['title', 'short_description']
-    readonly_fields = ['total_hours', 'lessons_count', 'created_at', 'updated_at']
+    readonly_fields = ['total_hours', 'lessons_count', 'students_count', 'active_students_count', 'created_at', 'updated_at']
 
     fieldsets = (
         ('Asosiy', {
@@ -55,9 +61,9 @@ class CourseAdmin(admin.ModelAdmin):
             'fields': ('price', 'image')
         }),
         ('Statistika (Avtomatik)', {
-            'fields': ('total_hours', 'lessons_count'),
+            'fields': ('total_hours', 'lessons_count', 'students_count', 'active_students_count'),
             'classes': ('collapse',),
-            'description': 'Bu maydonlar darslardan avtomatik hisoblanadi'
+            'description': 'Bu maydonlar darslar va yozilishlardan avtomatik hisoblanadi'
         }),
         ('Vaqt', {
             'fields': ('created_at', 'updated_at'),
@@ -75,10 +81,16 @@ class CourseAdmin(admin.ModelAdmin):
         )
     total_hours_badge.short_description = 'Umumiy davomiylik'
 
-    def students_count(self, obj):
-        count = obj.enrollments.count()
-        return format_html(f'<b>{count}</b> talaba')
-    students_count.short_description = 'Talabalar'
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request)
+            .select_related('category')
+        )
+
+    def students_badge(self, obj):
+        return format_html('<b>{}</b> talaba ({} faol)', obj.students_count, obj.active_students_count)
+    students_badge.short_description = 'Talabalar'
+    students_badge.admin_order_field = 'students_count'
 
     def status_badge(self, obj):
         colors = {
@@ -105,7 +117,35 @@ class LessonAdmin(admin.ModelAdmin):
 
     search_fields = ('title', 'course__title')
     list_filter = ('course', 'course__category')
-    readonly_fields = ('created_at', 'updated_at', 'duration_formatted')
+    readonly_fields = ('created_at', 'updated_at', 'duration_formatted', 'hls_status', 'resumable_upload')
+    actions = ['retry_transcode']
+
+    class Media:
+        js = ('js/resumable-upload.js',)
+
+    @admin.action(description="HLS'ni qayta yaratish")
+    def retry_transcode(self, request, queryset):
+        """Xatolik bilan tugagan (yoki osilib qolgan) videolarni qayta o'girish"""
+        count = 0
+        for lesson in queryset:
+            if not lesson.video_file:
+                continue
+            schedule_transcode(lesson, force=True)
+            count += 1
+        self.message_user(request, f"{count} ta dars videosi qayta navbatga qo'yildi")
+
+    def resumable_upload(self, obj):
+        """Katta videolar uchun: qismlab, uzilsa davom ettiriladigan yuklash"""
+        if not obj or not obj.pk:
+            return "Avval darsni saqlang"
+        return format_html(
+            '<div class="resumable-upload" data-endpoint="{}" data-lesson="{}">'
+            '<input type="file" accept="video/*"> '
+            '<progress max="100" value="0" style="width:240px;vertical-align:middle;"></progress> '
+            '<span class="resumable-upload-status"></span></div>',
+            reverse('lesson_upload_create'), obj.pk,
+        )
+    resumable_upload.short_description = "Video yuklash (katta fayllar)"
 
     def lesson_preview(self, obj):
         return f"Dars {obj.order}: {obj.title}"
@@ -140,10 +180,13 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_filter = ['status', 'course', 'enrolled_at']
     search_fields = ['student__username', 'student__email', 'course__title']
     readonly_fields = ['enrolled_at', 'completed_at', 'progress']
+    list_select_related = ['student', 'course']
 
     def course_link(self, obj):
-        return format_html(f'<a href="/admin/course/course/{obj.course.id}/change/">{obj.course.title}</a>')
+        url = reverse('admin:course_course_change', args=[obj.course_id])
+        return format_html('<a href="{}">{}</a>', url, obj.course.title)
     course_link.short_description = 'Kurs'
+    course_link.admin_order_field = 'course__title'
 
     def progress_bar(self, obj):
         color = "#10B981" if obj.progress >= 80 else "#F59E0B" if obj.progress >= 40 else "#EF4444"
@@ -163,6 +206,19 @@ class EnrollmentAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Holati'
 
+
+# ============================================================
+# DARS PROGRESSI ADMIN
+# ============================================================
+@admin.register(LessonProgress)
+class LessonProgressAdmin(admin.ModelAdmin):
+    list_display = ['student', 'lesson', 'course', 'position_seconds', 'max_position_seconds', 'completed', 'updated_at']
+    list_filter = ['completed', 'course']
+    search_fields = ['student__username', 'lesson__title']
+    list_select_related = ['student', 'lesson', 'course']
+    raw_id_fields = ['student', 'lesson', 'course']
+    readonly_fields = ['updated_at']
+
 # ============================================================
 # ADMIN SAYT SOZLAMLARI
 # ============================================================
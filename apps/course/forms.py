@@ -98,7 +98,7 @@ class LessonForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': '1800',
                 'min': '0',
-                'help_text': 'Davomiylikni sekundlarda kiriting (masalan: 30 daqiqa = 1800)'
+                'help_text': 'Video yuklansa avtomatik aniqlanadi (qo\'lda: 30 daqiqa = 1800)'
             }),
         }
 
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from course.uploads import cleanup_expired
+
+
+class Command(BaseCommand):
+    help = "Muddati o'tgan tugallanmagan video yuklashlarni (LESSON_UPLOAD_DIR) o'chirish (cron uchun)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, help="Sekund (standart: settings.LESSON_UPLOAD_EXPIRY)")
+
+    def handle(self, *args, **options):
+        removed = cleanup_expired(options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f"{removed} ta yuklash o'chirildi"))
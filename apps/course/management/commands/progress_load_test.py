@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from course.models import Course, Enrollment, LessonProgress
+from course.progress import coalesce_events, record_progress
+from course.progress_buffer import ProgressBuffer
+from course.stats import reconcile_student_counts
+
+USERNAME_PREFIX = 'loadtest_'
+
+
+class Command(BaseCommand):
+    help = (
+        "Progress heartbeat yuklama testi: to'g'ridan-to'g'ri yozish va write-behind "
+        "bufer orqali sekundiga nechta hodisa qabul qilinishini o'lchash"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help="Kurs ID (standart – darsi bor birinchi nashr qilingan kurs)")
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10, help="Har bir rejim necha soniya")
+        parser.add_argument('--mode', choices=['direct', 'buffer', 'both'], default='both')
+        parser.add_argument('--flush-interval', type=float, default=1.0)
+        parser.add_argument('--flush-size', type=int, default=500)
+        parser.add_argument('--keep', action='store_true', help="Sintetik talabalarni o'chirmaslik")
+
+    def handle(self, *args, **options):
+        course = self._get_course(options['course'])
+        lesson_ids = list(course.lessons.values_list('id', flat=True))
+        student_ids = self._create_students(course, options['students'])
+        self.stdout.write(
+            f"Kurs #{course.pk}: {len(lesson_ids)} dars, {len(student_ids)} talaba, "
+            f"{options['threads']} oqim, {options['duration']}s"
+        )
+
+        try:
+            modes = ['direct', 'buffer'] if options['mode'] == 'both' else [options['mode']]
+            for mode in modes:
+                LessonProgress.objects.filter(student_id__in=student_ids).delete()
+                result = self._run(mode, student_ids, lesson_ids, options)
+                self._report(mode, result)
+        finally:
+            if not options['keep']:
+                User.objects.filter(pk__in=student_ids).delete()
+                reconcile_student_counts([course.pk])
+
+    # ---------------- tayyorlash ----------------
+    def _get_course(self, course_id):
+        courses = Course.objects.filter(status='published', lessons__isnull=False).distinct()
+        course = courses.filter(pk=course_id).first() if course_id else courses.order_by('pk').first()
+        if course is None:
+            raise CommandError("Darsi bor nashr qilingan kurs topilmadi")
+        return course
+
+    def _create_students(self, course, count):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        User.objects.bulk_create([User(username=f'{USERNAME_PREFIX}{i}', password='!') for i in range(count)])
+        student_ids = list(User.objects.filter(username__startswith=USERNAME_PREFIX).values_list('id', flat=True))
+        Enrollment.objects.bulk_create([Enrollment(student_id=pk, course=course) for pk in student_ids])
+        # bulk_create signal yubormaydi – hisoblagichlarni moslash
+        reconcile_student_counts([course.pk])
+        return student_ids
+
+    # ---------------- yuklama ----------------
+    def _run(self, mode, student_ids, lesson_ids, options):
+        buffer = ProgressBuffer(interval=options['flush_interval'], max_size=options['flush_size'])
+        counters = {'events': 0, 'errors': 0}
+        counters_lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def worker(seed):
+            rnd = random.Random(seed)
+            positions = {}
+            events = errors = 0
+            try:
+                while time.monotonic() < deadline:
+                    student_id, lesson_id = rnd.choice(student_ids), rnd.choice(lesson_ids)
+                    key = (student_id, lesson_id)
+                    positions[key] = positions.get(key, 0) + 5
+                    batch = coalesce_events([{'lesson': lesson_id, 'position': positions[key], 'ended': False}])
+                    try:
+                        if mode == 'buffer':
+                            buffer.add(student_id, batch)
+                        else:
+                            record_progress(student_id, batch)
+                        events += 1
+                    except Exception:
+                        errors += 1
+            finally:
+                connections.close_all()
+                with counters_lock:
+                    counters['events'] += events
+                    counters['errors'] += errors
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Qolgan buferni yozish ham umumiy vaqtga kiradi
+        buffer.flush()
+        elapsed = time.monotonic() - started
+
+        return {
+            'events': counters['events'],
+            'errors': counters['errors'],
+            'elapsed': elapsed,
+            'flushes': buffer.stats['flushes'],
+            'rows': LessonProgress.objects.filter(student_id__in=student_ids).count(),
+        }
+
+    def _report(self, mode, result):
+        rate = result['events'] / result['elapsed'] if result['elapsed'] else 0
+        line = (
+            f"{mode:>7}: {result['events']} hodisa / {result['elapsed']:.2f}s = {rate:,.0f} hodisa/s; "
+            f"xatolar: {result['errors']}; DB qatorlar: {result['rows']}"
+        )
+        if mode == 'buffer':
+            line += f"; flush: {result['flushes']}"
+        style = self.style.WARNING if result['errors'] else self.style.SUCCESS
+        self.stdout.write(style(line))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from course.stats import recompute_course_stats
+
+
+class Command(BaseCommand):
+    help = "Kurslarning total_hours va lessons_count maydonlarini darslardan qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int, help="Kurs ID lari (bo'sh – barcha kurslar)")
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids'] or None
+        updated = recompute_course_stats(course_ids)
+        self.stdout.write(self.style.SUCCESS(f"{updated} ta kurs statistikasi yangilandi"))
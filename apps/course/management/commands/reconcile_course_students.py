@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from course.stats import reconcile_student_counts
+
+
+class Command(BaseCommand):
+    help = "Kurslarning students_count va active_students_count hisoblagichlarini Enrollment bilan solishtirib tuzatish (cron uchun)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int, help="Kurs ID lari (bo'sh – barcha kurslar)")
+
+    def handle(self, *args, **options):
+        repaired = reconcile_student_counts(options['course_ids'] or None)
+        if repaired:
+            self.stdout.write(self.style.WARNING(f"{repaired} ta kurs hisoblagichi tuzatildi"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Barcha hisoblagichlar to'g'ri"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from course.transcoding import requeue_stale
+
+
+class Command(BaseCommand):
+    help = (
+        "'pending'/'processing' holatida osilib qolgan dars videolarini HLS ga o'girishni qayta "
+        "navbatga qo'yish (server qayta ishga tushgandan keyin yoki cron uchun)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, help="Sekund (standart: settings.HLS_STALE_AFTER)")
+
+    def handle(self, *args, **options):
+        count = requeue_stale(options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f"{count} ta dars qayta navbatga qo'yildi"))
@@ -0,0 +1,33 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .stats import adefer_course_stats, defer_course_stats
+
+
+class CourseStatsMiddleware:
+    """
+    Bitta so'rov davomida o'zgargan kurslarning statistikasini so'rov
+    oxirida bir marta yangilash (masalan, admin'da 200 ta darsning
+    tartibini o'zgartirganda 400+ so'rov o'rniga bitta UPDATE).
+
+    ASGI rejimida ham ishlaydi: belgilangan kurslar contextvar'da
+    saqlanadi, sync view'lar (sync_to_async oqimida) ham shu to'plamga yozadi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with defer_course_stats():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with adefer_course_stats():
+            return await self.get_response(request)
@@ -1,9 +1,35 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, F
+from django.db.models.functions import Greatest, Substr
 from django.dispatch import receiver
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
+
+from core.pagecache import invalidate_on_commit
+from core.tasks import enqueue
+from .signed_media import signed_directory_url, signed_url
+from .stats import mark_course_dirty
+from .validators import validate_video_file
+
+
+# Har bir kursning dastlabki shuncha darsi bepul
+FREE_LESSONS = 3
+
+
+def format_duration(seconds):
+    hrs = seconds // 3600
+    mins = (seconds % 3600) // 60
+    if hrs > 0:
+        return f"{hrs} soat {mins} daqiqa"
+    elif mins > 0:
+        return f"{mins} daqiqa"
+    else:
+        return f"{seconds} sekund"
+
+
+# Ro'yxat kartalarida katta TextField o'rniga shuncha belgi olinadi
+EXCERPT_LENGTH = 300
 
 
 # ============================================================
@@ -25,6 +51,27 @@ class Category(models.Model):
 # ============================================================
 # KURS
 # ============================================================
+class CourseQuerySet(models.QuerySet):
+    # Kurs kartasi (katalog, bosh sahifa) uchun kerakli ustunlar; keyset
+    # paginatsiya tartiblash maydonlari (created_at, students_count, id) ham shu yerda
+    CARD_FIELDS = (
+        'id', 'title', 'short_description', 'image', 'level', 'price', 'status',
+        'total_hours', 'lessons_count', 'students_count', 'created_at',
+        'category__id', 'category__name',
+    )
+
+    def published(self):
+        return self.filter(status='published')
+
+    def cards(self):
+        """Karta proyeksiyasi: description o'rniga qisqa ``excerpt``"""
+        return (
+            self.select_related('category')
+            .only(*self.CARD_FIELDS)
+            .annotate(excerpt=Substr('description', 1, EXCERPT_LENGTH))
+        )
+
+
 class Course(models.Model):
     LEVEL_CHOICES = [
         ('beginner', "Boshlang'ich"),
@@ -50,15 +97,24 @@ class Course(models.Model):
     # Avtomatik hisoblanadigan maydonlar
     total_hours = models.FloatField(default=0, editable=False, verbose_name="Umumiy soat")
     lessons_count = models.IntegerField(default=0, editable=False, verbose_name="Darslar soni")
+    # Enrollment signallari F() bilan yangilaydi; drift: reconcile_course_students
+    students_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Talabalar soni")
+    active_students_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Faol talabalar soni")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Kurs"
         verbose_name_plural = "Kurslar"
-        indexes = [models.Index(fields=['category', 'status'])]
+        indexes = [
+            models.Index(fields=['category', 'status']),
+            models.Index(fields=['status', '-created_at', 'id'], name='course_listing_idx'),
+            models.Index(fields=['status', '-students_count', '-created_at', 'id'], name='course_popular_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -74,34 +130,53 @@ class Course(models.Model):
     @property
     def total_duration_formatted(self):
         """Umumiy vaqtni formatlangan holda qaytarish"""
-        total_seconds = int(self.total_hours * 3600)
-        hrs = total_seconds // 3600
-        mins = (total_seconds % 3600) // 60
-        if hrs > 0:
-            return f"{hrs} soat {mins} daqiqa"
-        elif mins > 0:
-            return f"{mins} daqiqa"
-        else:
-            return f"{total_seconds} sekund"
+        return format_duration(int(self.total_hours * 3600))
 
 
 # ============================================================
 # DARS
 # ============================================================
+class LessonQuerySet(models.QuerySet):
+    ROW_FIELDS = ('id', 'order', 'title', 'duration_seconds', 'video_file')
+
+    def rows(self):
+        """Qator proyeksiyasi (sidebar, kurs dasturi): content/description o'qilmaydi"""
+        return self.values_list(*self.ROW_FIELDS)
+
+
 class Lesson(models.Model):
+    HLS_STATUS_CHOICES = [
+        ('pending', "Navbatda"),
+        ('processing', "Jarayonda"),
+        ('ready', "Tayyor"),
+        ('failed', "Xatolik"),
+    ]
+
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='lessons', verbose_name="Kurs")
     title = models.CharField(max_length=200, verbose_name="Dars nomi")
     description = models.TextField(verbose_name="Dars tavsifi")
     order = models.PositiveIntegerField(default=0, verbose_name="Tartibi")
     content = models.TextField(blank=True, verbose_name="Dars mazmuni")
 
-    video_file = models.FileField(upload_to='course_videos/%Y/%m/', blank=True, null=True, verbose_name="Video fayl")
+    video_file = models.FileField(
+        upload_to='course_videos/%Y/%m/', blank=True, null=True, verbose_name="Video fayl",
+        validators=[validate_video_file],
+    )
     duration_seconds = models.PositiveIntegerField(default=0, verbose_name="Davomiyligi (sekund)")
     thumbnail = models.ImageField(upload_to='course_thumbnails/%Y/%m/', blank=True, null=True, verbose_name="Thumbnail")
 
+    # HLS (avtomatik, course/transcoding.py)
+    hls_status = models.CharField(max_length=20, choices=HLS_STATUS_CHOICES, blank=True, editable=False, verbose_name="HLS holati")
+    hls_playlist = models.CharField(max_length=255, blank=True, editable=False, verbose_name="HLS playlist")
+    hls_source = models.CharField(max_length=255, blank=True, editable=False)
+    # Holat oxirgi marta o'zgargan vaqt – osilib qolgan vazifalarni aniqlash uchun
+    hls_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LessonQuerySet.as_manager()
+
     class Meta:
         ordering = ['order']
         unique_together = ('course', 'order')
@@ -114,24 +189,70 @@ class Lesson(models.Model):
 
     @property
     def duration_formatted(self):
-        hrs = self.duration_seconds // 3600
-        mins = (self.duration_seconds % 3600) // 60
-        if hrs > 0:
-            return f"{hrs} soat {mins} daqiqa"
-        elif mins > 0:
-            return f"{mins} daqiqa"
-        else:
-            return f"{self.duration_seconds} sekund"
+        return format_duration(self.duration_seconds)
 
     @property
     def is_free(self):
-        return self.order <= 3
+        return self.order <= FREE_LESSONS
+
+    # Quyidagi URL'lar imzolangan va muddatli (course/signed_media.py) –
+    # faqat ruxsat tekshirilgandan keyin (lesson_view) shablonga beriladi
+    @property
+    def video_url(self):
+        if self.video_file:
+            return signed_url(self.video_file.name)
+        return None
+
+    @property
+    def hls_url(self):
+        """Tayyor bo'lsa master playlist URL'i (butun katalog imzolanadi), aks holda None"""
+        if self.hls_status == 'ready' and self.hls_playlist:
+            return signed_directory_url(self.hls_playlist)
+        return None
 
 
 # Dars qo'shilganda/o'chirilganda → Kurs statistikasini yangilash
+# (course/stats.py: commit yoki so'rov oxirida har bir kurs bir marta)
 @receiver([post_save, post_delete], sender=Lesson)
 def update_course_on_lesson_change(sender, instance, **kwargs):
-    instance.course.update_stats()
+    mark_course_dirty(instance.course_id)
+
+
+# Darslar ro'yxati keshi (course/outline.py) → yangi avlod
+@receiver([post_save, post_delete], sender=Lesson)
+def invalidate_outline_on_lesson_change(sender, instance, **kwargs):
+    from .outline import invalidate_course_outline
+    invalidate_course_outline(instance.course_id)
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_video(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._previous_video = None
+    else:
+        instance._previous_video = (
+            Lesson.objects.filter(pk=instance.pk).values_list('video_file', flat=True).first()
+        )
+
+
+# Video yuklanganda/almashtirilganda → metadata va HLS ni fonda tayyorlash
+@receiver(post_save, sender=Lesson)
+def process_lesson_video(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .transcoding import schedule_transcode
+    from .video_probe import schedule_probe
+
+    # Faqat video bor va u o'zgargan bo'lsa (HLS holatiga bog'liq emas)
+    if instance.video_file and instance.video_file.name != getattr(instance, '_previous_video', None):
+        schedule_probe(instance)
+    schedule_transcode(instance)
+
+
+@receiver(post_delete, sender=Lesson)
+def remove_lesson_hls(sender, instance, **kwargs):
+    from .transcoding import remove_stale_renditions
+    enqueue(remove_stale_renditions, instance.pk)
 
 
 # ============================================================
@@ -158,4 +279,75 @@ class Enrollment(models.Model):
         verbose_name_plural = "Kursga yozilishlar"
 
     def __str__(self):
-        return f"{self.student} → {self.course}"
\ No newline at end of file
+        return f"{self.student} → {self.course}"
+
+
+# ============================================================
+# DARS BO'YICHA PROGRESS
+# ============================================================
+class LessonProgress(models.Model):
+    """Talabaning har bir darsdagi holati (course/progress.py orqali yoziladi)"""
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lesson_progress')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='progress')
+    # Denormalizatsiya: kurs progressini JOIN'siz sanash uchun
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='lesson_progress')
+    position_seconds = models.PositiveIntegerField(default=0, verbose_name="Oxirgi joy (sekund)")
+    max_position_seconds = models.PositiveIntegerField(default=0, verbose_name="Eng uzoq ko'rilgan joy")
+    completed = models.BooleanField(default=False, verbose_name="Tugatilgan")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Dars progressi"
+        verbose_name_plural = "Dars progresslari"
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'lesson'], name='unique_lesson_progress'),
+        ]
+        indexes = [models.Index(fields=['student', 'course', 'completed'])]
+
+    def __str__(self):
+        return f"{self.student} → {self.lesson} ({self.position_seconds}s)"
+
+# Talaba qo'shilganda/holati o'zgarganda/o'chirilganda → Kurs hisoblagichlari
+# (agregatsiyasiz, atomik F() UPDATE; poyga holatida ham yo'qolmaydi).
+# update() signal yubormaydi – katalog keshi shu yerda eskirtiriladi.
+# Hisoblagich 0 dan pastga tushmaydi: reconcile qilinmagan (0 dan boshlangan)
+# kursda yozuv o'chirilsa PositiveIntegerField CHECK cheklovi buzilmasin
+def _shift_student_counts(course_id, students=0, active=0):
+    changes = {}
+    if students:
+        changes['students_count'] = Greatest(F('students_count') + students, 0)
+    if active:
+        changes['active_students_count'] = Greatest(F('active_students_count') + active, 0)
+    if changes:
+        Course.objects.filter(pk=course_id).update(**changes)
+        invalidate_on_commit('catalog')
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_enrollment_status(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        instance._previous_status = None
+    else:
+        instance._previous_status = (
+            Enrollment.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Enrollment)
+def update_course_students_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    is_active = instance.status == 'active'
+    if created:
+        _shift_student_counts(instance.course_id, students=1, active=int(is_active))
+        return
+
+    previous = getattr(instance, '_previous_status', None)
+    if previous is not None and (previous == 'active') != is_active:
+        _shift_student_counts(instance.course_id, active=1 if is_active else -1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def update_course_students_on_delete(sender, instance, **kwargs):
+    _shift_student_counts(instance.course_id, students=-1, active=-int(instance.status == 'active'))
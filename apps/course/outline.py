@@ -0,0 +1,73 @@
+"""
+apps/course/outline.py - KURS DARSLARI RO'YXATI KESHI (sidebar / kurs dasturi)
+
+course_detail va lesson_view sahifalari darslar ro'yxatini har safar
+to'liq Lesson qatorlari (katta content/description bilan) sifatida
+o'qimaydi. Kurs bo'yicha ixcham ro'yxat keshlanadi:
+
+    (id, order, title, duration_seconds, is_free, has_video)
+
+Versiya = Course.updated_at + darslar avlodi. Avlod dars saqlanganda/
+o'chirilganda (signal), ommaviy import va metadata yangilanganda
+(invalidate_course_outline) almashadi.
+"""
+
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import FREE_LESSONS, Lesson, format_duration
+
+KEY_PREFIX = 'course_outline:v1:'
+TIMEOUT = 60 * 60
+
+
+class OutlineEntry(namedtuple('OutlineEntry', 'id order title duration_seconds is_free has_video')):
+    __slots__ = ()
+
+    @property
+    def duration_formatted(self):
+        return format_duration(self.duration_seconds)
+
+
+def _keys(course_id):
+    return f'{KEY_PREFIX}{course_id}', f'{KEY_PREFIX}{course_id}:gen'
+
+
+def _load(course_id):
+    rows = (
+        Lesson.objects.filter(course_id=course_id)
+        .order_by('order')
+        .rows()
+    )
+    return tuple(
+        (pk, order, title, duration, order <= FREE_LESSONS, bool(video))
+        for pk, order, title, duration, video in rows
+    )
+
+
+def get_course_outline(course):
+    """Kurs darslari – tartiblangan OutlineEntry ro'yxati"""
+    data_key, gen_key = _keys(course.pk)
+    cached = cache.get_many([data_key, gen_key])
+    generation = cached.get(gen_key)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(gen_key, generation, None)
+
+    version = (course.updated_at.timestamp(), generation)
+    entry = cached.get(data_key)
+    if entry is not None and entry[0] == version:
+        rows = entry[1]
+    else:
+        rows = _load(course.pk)
+        cache.set(data_key, (version, rows), TIMEOUT)
+    return [OutlineEntry(*row) for row in rows]
+
+
+def invalidate_course_outline(course_id):
+    """Yangi avlod – barcha lesson sahifalari keyingi so'rovda yangi ro'yxatni oladi"""
+    _, gen_key = _keys(course_id)
+    transaction.on_commit(lambda: cache.set(gen_key, time.time_ns(), None))
@@ -0,0 +1,165 @@
+"""
+apps/course/progress.py - DARS PROGRESSINI PAKET (BATCH) BILAN YOZISH
+
+Brauzer har bir ``timeupdate`` da emas, balki bir necha soniyada bir marta
+yig'ilgan hodisalarni yuboradi:
+
+    POST /course/progress/
+    {"events": [{"lesson": 12, "position": 184, "ended": false}, ...]}
+
+Server tomonda hodisalar dars bo'yicha birlashtiriladi va bitta
+``bulk_create(update_conflicts=True)`` (INSERT ... ON CONFLICT DO UPDATE)
+bilan yoziladi. Enrollment.progress faqat yangi dars tugatilganda,
+o'sha kurs uchun qayta hisoblanadi.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Enrollment, Lesson, LessonProgress
+
+# Videoning shu qismi ko'rilgach dars tugatilgan hisoblanadi
+COMPLETE_RATIO = 0.9
+MAX_EVENTS = 100
+
+
+def parse_events(payload):
+    """{"events": [...]} ni tekshirib, [{'lesson', 'position', 'ended'}] ro'yxatiga aylantirish"""
+    events = payload.get('events') if isinstance(payload, dict) else None
+    if not isinstance(events, list) or not events:
+        raise ValidationError("events ro'yxati kutilgan edi")
+    if len(events) > MAX_EVENTS:
+        raise ValidationError(f"Bir so'rovda ko'pi bilan {MAX_EVENTS} ta hodisa")
+
+    cleaned = []
+    for event in events:
+        try:
+            lesson_id = int(event['lesson'])
+            position = max(int(float(event.get('position') or 0)), 0)
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError("Hodisa formati noto'g'ri: {'lesson': id, 'position': sekund}")
+        cleaned.append({'lesson': lesson_id, 'position': position, 'ended': bool(event.get('ended'))})
+    return cleaned
+
+
+def coalesce_events(events):
+    """Bir dars uchun bir nechta hodisa → oxirgi joy, eng uzoq joy, tugatildimi"""
+    merged = {}
+    for event in events:
+        current = merged.setdefault(event['lesson'], {'position': 0, 'max_position': 0, 'ended': False})
+        current['position'] = event['position']
+        current['max_position'] = max(current['max_position'], event['position'])
+        current['ended'] = current['ended'] or event['ended']
+    return merged
+
+
+def _accessible_lessons(student_id, lesson_ids):
+    """Nashr qilingan kurs darslari: bepul yoki talaba yozilgan kurs"""
+    lessons = list(
+        Lesson.objects.filter(pk__in=lesson_ids, course__status='published')
+        .only('id', 'course_id', 'order', 'duration_seconds')
+    )
+    enrolled = set(
+        Enrollment.objects.filter(student_id=student_id, course_id__in={l.course_id for l in lessons})
+        .values_list('course_id', flat=True)
+    )
+    return {lesson.pk: lesson for lesson in lessons if lesson.course_id in enrolled or lesson.is_free}
+
+
+def record_progress(student_id, events):
+    """
+    Birlashtirilgan hodisalarni yozish. ``events`` – coalesce_events() natijasi
+    ({lesson_id: {'position', 'max_position', 'ended'}}).
+
+    Qaytaradi: (saqlangan darslar soni, {course_id: yangi progress})
+    """
+    lessons = _accessible_lessons(student_id, list(events))
+    if not lessons:
+        return 0, {}
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            row.lesson_id: row
+            for row in LessonProgress.objects.filter(student_id=student_id, lesson_id__in=list(lessons))
+        }
+
+        rows, newly_completed = [], set()
+        for lesson_id, lesson in lessons.items():
+            event = events[lesson_id]
+            previous = existing.get(lesson_id)
+            max_position = max(event['max_position'], previous.max_position_seconds if previous else 0)
+            completed = bool(previous and previous.completed) or event['ended'] or (
+                lesson.duration_seconds > 0 and max_position >= lesson.duration_seconds * COMPLETE_RATIO
+            )
+            completed_at = previous.completed_at if previous and previous.completed else None
+            if completed and completed_at is None:
+                completed_at = now
+                newly_completed.add(lesson.course_id)
+
+            rows.append(LessonProgress(
+                student_id=student_id, lesson_id=lesson_id, course_id=lesson.course_id,
+                position_seconds=event['position'], max_position_seconds=max_position,
+                completed=completed, completed_at=completed_at, updated_at=now,
+            ))
+
+        LessonProgress.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student', 'lesson'],
+            update_fields=['position_seconds', 'max_position_seconds', 'completed', 'completed_at', 'updated_at'],
+        )
+
+        progress = update_enrollment_progress(student_id, newly_completed) if newly_completed else {}
+
+    return len(rows), progress
+
+
+def update_enrollment_progress(student_id, course_ids):
+    """Tugatilgan darslar / kursdagi darslar soni → Enrollment.progress va completed_at"""
+    completed_counts = dict(
+        LessonProgress.objects.filter(student_id=student_id, course_id__in=course_ids, completed=True)
+        .values('course_id').annotate(n=Count('id')).values_list('course_id', 'n')
+    )
+
+    result = {}
+    enrollments = Enrollment.objects.filter(student_id=student_id, course_id__in=course_ids).select_related('course')
+    for enrollment in enrollments:
+        total = enrollment.course.lessons_count
+        done = completed_counts.get(enrollment.course_id, 0)
+        progress = round(min(done / total * 100, 100), 1) if total else 0
+
+        changed = ['progress'] if progress != enrollment.progress else []
+        if progress >= 100 and enrollment.completed_at is None:
+            enrollment.completed_at = timezone.now()
+            changed.append('completed_at')
+            if enrollment.status == 'active':
+                enrollment.status = 'completed'
+                changed.append('status')
+        elif progress < 100 and enrollment.completed_at is not None:
+            enrollment.completed_at = None
+            changed.append('completed_at')
+
+        if changed:
+            enrollment.progress = progress
+            # save() – talabalar hisoblagichi (status) signallari ishlashi uchun
+            enrollment.save(update_fields=changed)
+        result[enrollment.course_id] = progress
+    return result
+
+
+def _resume_position(student_id, lesson_id):
+    return (
+        LessonProgress.objects.filter(student_id=student_id, lesson_id=lesson_id)
+        .values_list('position_seconds', flat=True)
+    )
+
+
+def get_resume_position(student_id, lesson_id):
+    return _resume_position(student_id, lesson_id).first()
+
+
+async def aget_resume_position(student_id, lesson_id):
+    return await _resume_position(student_id, lesson_id).afirst()
@@ -0,0 +1,170 @@
+"""
+apps/course/progress_buffer.py - PROGRESS HODISALARI UCHUN WRITE-BEHIND BUFER
+
+Ko'p talaba bir vaqtda video ko'rganda har bir heartbeat alohida yozuv
+bo'lsa, SQLite (bitta yozuvchi) navbatga tushib qoladi. Shuning uchun
+hodisalar jarayon xotirasida (student, lesson) bo'yicha birlashtiriladi va
+fon oqimi ularni vaqti-vaqti bilan bitta tranzaksiyada yozadi:
+
+    - har PROGRESS_FLUSH_INTERVAL soniyada, yoki
+    - buferda PROGRESS_FLUSH_SIZE ta (student, lesson) yig'ilganda, yoki
+    - jarayon tugayotganda (atexit).
+
+Bir talabaning xatosi butun paketni bekor qilmaydi (savepoint).
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+from .progress import record_progress
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    def __init__(self, interval=None, max_size=None):
+        self.interval = interval or settings.PROGRESS_FLUSH_INTERVAL
+        self.max_size = max_size or settings.PROGRESS_FLUSH_SIZE
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.stats = {'events': 0, 'flushes': 0, 'rows': 0, 'errors': 0}
+
+    # ---------------- yozish ----------------
+    def add(self, student_id, events):
+        """coalesce_events() natijasini buferga qo'shish (so'rov oqimini bloklamaydi)"""
+        with self._lock:
+            for lesson_id, event in events.items():
+                key = (student_id, lesson_id)
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = dict(event)
+                else:
+                    current['position'] = event['position']
+                    current['max_position'] = max(current['max_position'], event['max_position'])
+                    current['ended'] = current['ended'] or event['ended']
+            self.stats['events'] += len(events)
+            size = len(self._pending)
+
+        self._ensure_thread()
+        if size >= self.max_size:
+            self._wakeup.set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    # ---------------- flush ----------------
+    def flush(self):
+        """Buferdagi hamma narsani yozish. Qaytaradi: yozilgan qatorlar soni"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            by_student = {}
+            for (student_id, lesson_id), event in pending.items():
+                by_student.setdefault(student_id, {})[lesson_id] = event
+
+            rows = 0
+            try:
+                with transaction.atomic():
+                    for student_id, events in by_student.items():
+                        try:
+                            # Talabaning barcha so'rovlari (o'qishlar ham) o'z savepoint'ida –
+                            # xatosi paketning qolganini buzmaydi
+                            with transaction.atomic():
+                                saved, _ = record_progress(student_id, events)
+                            rows += saved
+                        except Exception:
+                            self.stats['errors'] += 1
+                            logger.exception("Talaba #%s progressi yozilmadi", student_id)
+            except Exception:
+                # Commit o'tmadi (masalan, "database is locked") – keyingi flush'da qayta urinish
+                self._requeue(pending)
+                raise
+
+            self.stats['flushes'] += 1
+            self.stats['rows'] += rows
+            return rows
+
+    def _requeue(self, pending):
+        """Yozilmagan hodisalarni qaytarish; shu orada kelgan yangi joy ustun"""
+        with self._lock:
+            for key, event in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = event
+                else:
+                    current['max_position'] = max(current['max_position'], event['max_position'])
+                    current['ended'] = current['ended'] or event['ended']
+
+    # ---------------- fon oqimi ----------------
+    def _ensure_thread(self):
+        # fork'dan keyin (gunicorn --preload) ota jarayon oqimi bolaga o'tmaydi
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name='progress-buffer', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Progress buferini yozishda xatolik")
+            finally:
+                connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Jarayon bo'yicha yagona bufer (sozlamalar birinchi murojaatda o'qiladi)"""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressBuffer()
+                atexit.register(_flush_on_exit)
+    return _buffer
+
+
+def _flush_on_exit():
+    started = time.monotonic()
+    try:
+        rows = _buffer.flush()
+    except Exception:
+        logger.exception("Jarayon tugashida progress buferi yozilmadi")
+        return
+    if rows:
+        logger.info("Progress buferi yozildi: %s qator, %.2fs", rows, time.monotonic() - started)
+
+
+def submit_progress(student_id, events):
+    """
+    View'lar uchun kirish nuqtasi. Write-behind yoqilgan bo'lsa buferga
+    qo'yadi va (None, None) qaytaradi, aks holda darhol yozadi.
+    """
+    if settings.PROGRESS_WRITE_BEHIND:
+        get_buffer().add(student_id, events)
+        return None, None
+    return record_progress(student_id, events)
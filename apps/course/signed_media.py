@@ -0,0 +1,146 @@
+"""
+apps/course/signed_media.py - PULLIK DARS VIDEOLARI UCHUN IMZOLANGAN, MUDDATLI URL'LAR
+
+Ruxsat (bepul dars / kursga yozilgan talaba) lesson_view da bir marta
+tekshiriladi va imzolangan URL beriladi:
+
+    /signed-media/<expires>/<depth>/<imzo>/course_hls/12/ab12cd/master.m3u8
+
+Imzo = HMAC(kalit, "<expires>:<yo'lning birinchi depth qismi>"). Shu sabab
+bitta imzo butun katalogni qamraydi: HLS playlist ichidagi nisbiy
+segment/variant URL'lari ham imzoni "meros" qilib oladi. Tekshirish
+holatsiz (stateless) – har bir bo'lak/segment uchun DB yoki kesh so'rovi yo'q.
+
+Fayl berish (settings.MEDIA_ACCEL):
+    'nginx'    – X-Accel-Redirect (internal location MEDIA_ACCEL_PREFIX)
+    'sendfile' – X-Sendfile (Apache mod_xsendfile, lighttpd)
+    ''         – Django ichida Range bilan oqim (course/streaming.py)
+
+Himoyalangan kataloglarga (PROTECTED_PREFIXES) to'g'ridan-to'g'ri
+MEDIA_URL orqali kirish yopiladi (DEBUG'da config/urls.py, prod'da proksi).
+"""
+
+import base64
+import hashlib
+import hmac
+import mimetypes
+import posixpath
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from django.utils.encoding import iri_to_uri
+from django.views.decorators.http import require_safe
+from django.views.static import serve
+
+from .streaming import serve_file
+
+PROTECTED_PREFIXES = ('course_videos/', 'course_hls/')
+
+# mimetypes .ts ni boshqa format deb biladi
+CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.m4s': 'video/iso.segment',
+}
+
+
+def _key():
+    return hashlib.sha256(f'signed-media:{settings.MEDIA_SIGNING_KEY}'.encode()).digest()
+
+
+def _signature(expires, prefix):
+    digest = hmac.new(_key(), f'{expires}:{prefix}'.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b'=').decode()
+
+
+def _expires_at(ttl):
+    """
+    Muddat TTL/4 oraliqlarga yaxlitlanadi: bir necha daqiqa ichida qayta
+    ochilgan sahifa aynan shu URL'ni oladi va brauzer keshi ishlaydi.
+    """
+    bucket = max(ttl // 4, 1)
+    return (int(time.time()) + ttl) // bucket * bucket + bucket
+
+
+def is_protected(name):
+    return name.startswith(PROTECTED_PREFIXES)
+
+
+def signed_url(name, ttl=None, prefix_depth=None):
+    """
+    ``name`` (storage'dagi nom) uchun imzolangan URL.
+    ``prefix_depth`` – yo'lning nechta qismi imzolanadi (None – butun yo'l).
+    """
+    parts = name.split('/')
+    depth = len(parts) if prefix_depth is None else prefix_depth
+    expires = _expires_at(settings.SIGNED_MEDIA_TTL if ttl is None else ttl)
+    signature = _signature(expires, '/'.join(parts[:depth]))
+    return reverse('signed_media', args=[expires, depth, signature, name])
+
+
+def signed_directory_url(name, ttl=None):
+    """HLS uchun: ``name`` joylashgan katalog imzolanadi (ichidagi nisbiy URL'lar ham ochiladi)"""
+    return signed_url(name, ttl, prefix_depth=name.count('/'))
+
+
+def verify(expires, depth, signature, name):
+    """Imzo, muddat va yo'lni tekshirish (DB'siz)"""
+    if expires < time.time():
+        return False
+    parts = name.split('/')
+    if not 0 < depth <= len(parts) or '..' in parts or '' in parts or not is_protected(name):
+        return False
+    return constant_time_compare(signature, _signature(expires, '/'.join(parts[:depth])))
+
+
+# ============================================================
+# BERISH
+# ============================================================
+def _accel_response(name, full_path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_ACCEL == 'nginx':
+        response['X-Accel-Redirect'] = iri_to_uri(settings.MEDIA_ACCEL_PREFIX + name)
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def serve_protected(request, name, max_age=3600):
+    """Himoyalangan faylni proksi (offload) yoki Django oqimi orqali berish"""
+    try:
+        full_path = default_storage.path(name)
+    except NotImplementedError:
+        # Masofaviy storage (S3 va h.k.) – o'zining (odatda imzolangan) URL'i
+        return redirect(default_storage.url(name))
+
+    content_type = CONTENT_TYPES.get(posixpath.splitext(name)[1]) or mimetypes.guess_type(name)[0]
+    if settings.MEDIA_ACCEL:
+        response = _accel_response(name, full_path, content_type or 'application/octet-stream')
+        response['Cache-Control'] = f'private, max-age={max_age}'
+        return response
+    try:
+        return serve_file(request, full_path, content_type, cache_control=f'private, max-age={max_age}')
+    except FileNotFoundError:
+        raise Http404("Fayl topilmadi")
+
+
+@require_safe
+def signed_media(request, expires, depth, signature, path):
+    if not verify(expires, depth, signature, path):
+        raise Http404("Havola yaroqsiz yoki muddati o'tgan")
+    # Brauzer fayllarni URL muddatidan ortiq keshlamasin
+    return serve_protected(request, path, max_age=max(min(int(expires - time.time()), 3600), 0))
+
+
+def serve_public_media(request, path, document_root=None, show_indexes=False):
+    """DEBUG uchun MEDIA_URL: himoyalangan kataloglar faqat imzolangan URL orqali"""
+    # serve() yo'lni o'zi normallashtiradi – tekshiruv ham normallashgan yo'l bo'yicha
+    # (aks holda /media/./course_videos/... yoki foo/../course_videos/... ochilib qoladi)
+    if is_protected(posixpath.normpath(path).lstrip('/')):
+        raise Http404("Fayl topilmadi")
+    return serve(request, path, document_root=document_root, show_indexes=show_indexes)
@@ -0,0 +1,151 @@
+"""
+apps/course/stats.py - KURS STATISTIKASINI YIG'IB YANGILASH
+
+Har bir dars saqlanganda kursni darhol qayta hisoblash o'rniga kurs
+"iflos" deb belgilanadi va tranzaksiya commit bo'lganda (yoki
+defer_course_stats() bloki tugaganda) har bir kurs bir marta, bitta
+UPDATE so'rovi bilan yangilanadi.
+
+    with defer_course_stats():
+        for lesson in lessons:
+            lesson.save()      # kurs statistikasi hali hisoblanmaydi
+    # ← shu yerda bitta UPDATE
+"""
+
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Round
+
+from core.pagecache import invalidate_on_commit
+
+# contextvar: async so'rovda sync_to_async oqimlari ham shu to'plamni ko'radi
+_deferred = ContextVar('deferred_course_stats', default=None)
+
+
+def recompute_course_stats(course_ids=None):
+    """
+    Berilgan kurslar (None bo'lsa – barchasi) uchun total_hours va
+    lessons_count'ni bitta UPDATE bilan qayta hisoblash.
+    """
+    from .models import Course, Lesson
+
+    lessons = Lesson.objects.filter(course=OuterRef('pk')).order_by().values('course')
+    total_seconds = Subquery(lessons.annotate(s=Sum('duration_seconds')).values('s'), output_field=IntegerField())
+    lesson_count = Subquery(lessons.annotate(c=Count('id')).values('c'), output_field=IntegerField())
+
+    courses = Course.objects.all()
+    if course_ids is not None:
+        course_ids = list(course_ids)
+        if not course_ids:
+            return 0
+        courses = courses.filter(pk__in=course_ids)
+
+    return courses.update(
+        total_hours=Round(Cast(Coalesce(total_seconds, 0), FloatField()) / Value(3600.0), precision=2),
+        lessons_count=Coalesce(lesson_count, 0),
+    )
+
+
+def reconcile_student_counts(course_ids=None):
+    """
+    students_count / active_students_count ni Enrollment jadvalidan
+    tekshirish; faqat farq qilgan kurslar yangilanadi. Qaytaradi: tuzatilgan kurslar soni.
+    """
+    from .models import Course, Enrollment
+
+    enrollments = Enrollment.objects.filter(course=OuterRef('pk')).order_by().values('course')
+    students = Coalesce(Subquery(enrollments.annotate(c=Count('id')).values('c'), output_field=IntegerField()), 0)
+    active = Coalesce(
+        Subquery(enrollments.filter(status='active').annotate(c=Count('id')).values('c'), output_field=IntegerField()),
+        0,
+    )
+
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=list(course_ids))
+
+    drifted = list(
+        courses.annotate(_students=students, _active=active)
+        .exclude(students_count=F('_students'), active_students_count=F('_active'))
+        .values_list('pk', flat=True)
+    )
+    if drifted:
+        Course.objects.filter(pk__in=drifted).update(students_count=students, active_students_count=active)
+        invalidate_on_commit('catalog')
+    return len(drifted)
+
+
+# Ulanish → commit kutayotgan kurslar. Har bir belgilash o'z on_commit
+# callback'ini qo'shadi; birinchi ishlagani hammasini hisoblaydi, qolganlari
+# bo'sh to'plamni ko'radi. Bekor qilingan (rollback) tranzaksiyadagi kurslar
+# keyingi commit'da hisoblanadi – ortiqcha, lekin zararsiz qayta hisoblash;
+# belgilash hech qachon yo'qolmaydi.
+_pending = weakref.WeakKeyDictionary()
+
+
+def _flush(connection):
+    course_ids = _pending.pop(connection, None)
+    if course_ids:
+        recompute_course_stats(course_ids)
+
+
+def _schedule(course_ids):
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        recompute_course_stats(set(course_ids) | _pending.pop(connection, set()))
+        return
+
+    _pending.setdefault(connection, set()).update(course_ids)
+    transaction.on_commit(partial(_flush, connection))
+
+
+def mark_course_dirty(course_id):
+    """Kurs statistikasini imkon qadar kechroq, bir marta yangilash"""
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred.add(course_id)
+    else:
+        _schedule([course_id])
+
+
+@contextmanager
+def defer_course_stats():
+    """
+    Blok ichida belgilangan barcha kurslarni blok oxirida bir marta
+    yangilash. Ichma-ich ishlatilsa tashqi blok hisoblaydi.
+    """
+    if _deferred.get() is not None:
+        yield
+        return
+
+    token = _deferred.set(set())
+    try:
+        yield
+    finally:
+        course_ids = _deferred.get()
+        _deferred.reset(token)
+        if course_ids:
+            _schedule(course_ids)
+
+
+@asynccontextmanager
+async def adefer_course_stats():
+    """defer_course_stats ning async varianti (ASGI rejimidagi middleware uchun)"""
+    if _deferred.get() is not None:
+        yield
+        return
+
+    token = _deferred.set(set())
+    try:
+        yield
+    finally:
+        course_ids = _deferred.get()
+        _deferred.reset(token)
+        if course_ids:
+            await sync_to_async(_schedule)(course_ids)
@@ -0,0 +1,151 @@
+"""
+apps/course/streaming.py - VIDEO FAYLLARNI QISMLAB (HTTP Range) BERISH
+
+Brauzer videoni oldinga/orqaga surganda faqat kerakli bayt oralig'ini
+so'raydi (206 Partial Content). Fayl hech qachon to'liq xotiraga
+o'qilmaydi: gunicorn kabi serverlar ``wsgi.file_wrapper`` orqali
+``os.sendfile`` ishlatadi, qolganlarida fayl kichik bo'laklarda o'qiladi.
+"""
+
+import mimetypes
+import os
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 512 * 1024  # 512 KB
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """So'ralgan oraliq fayl chegarasidan tashqarida"""
+
+
+class BoundedFile:
+    """
+    Faylning [start, start + length) qismini o'qiydigan o'rovchi.
+
+    ``fileno()`` saqlangani uchun WSGI server ``sendfile`` ishlata oladi
+    (offset faylning joriy pozitsiyasidan, uzunlik Content-Length dan olinadi),
+    oddiy iteratsiyada esa chegaradan ortiq bayt yuborilmaydi.
+    """
+
+    def __init__(self, file, start, length):
+        self._file = file
+        self._remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def parse_range_header(header, size):
+    """
+    ``Range: bytes=...`` sarlavhasidan (start, end) qaytaradi (end - inklyuziv).
+
+    Sarlavha yo'q yoki biz qo'llab-quvvatlamaydigan shaklda bo'lsa (masalan,
+    bir nechta oraliq) ``None`` qaytadi va to'liq javob beriladi.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # bytes=-500 → oxirgi 500 bayt
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable
+        start = max(size - suffix, 0)
+        end = size - 1
+    else:
+        start = int(first)
+        if start >= size:
+            raise RangeNotSatisfiable
+        end = int(last) if last else size - 1
+        if end < start:
+            return None
+        end = min(end, size - 1)
+
+    return start, end
+
+
+def make_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def if_range_matches(request, etag, last_modified):
+    """If-Range sharti bajarilsa (fayl o'zgarmagan bo'lsa) True"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        # Faqat kuchli (strong) ETag taqqoslanadi
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def serve_file(request, path, content_type=None, cache_control='private, max-age=3600'):
+    """
+    Diskdagi faylni Range, If-Range va ETag/Last-Modified qo'llab-quvvatlagan
+    holda qaytarish.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = make_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        conditional.headers['Accept-Ranges'] = 'bytes'
+        return conditional
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    byte_range = None
+    if if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range_header(request.META.get('HTTP_RANGE'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            response.headers['Accept-Ranges'] = 'bytes'
+            return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+        response.block_size = CHUNK_SIZE
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(BoundedFile(file, start, length), content_type=content_type, status=206)
+        response.block_size = CHUNK_SIZE
+        response.headers['Content-Length'] = str(length)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,176 @@
+"""
+apps/course/syllabus.py - KURS DASTURINI (DARSLAR RO'YXATINI) OMMAVIY YANGILASH
+
+Butun kurs dasturi bitta so'rovda keladi (JSON yoki CSV) va bitta
+tranzaksiyada qo'llaniladi: yangilari bulk_create, mavjudlari
+bulk_update, ro'yxatda yo'qlari o'chiriladi. Darslar tartibi
+ro'yxatdagi joylashuvdan olinadi (1, 2, 3, ...).
+
+Lesson(course, order) unique bo'lgani uchun tartib ikki bosqichda
+o'zgartiriladi: avval barcha darslar bitta UPDATE bilan band bo'lmagan
+oraliqqa suriladi, keyin yakuniy raqamlar yoziladi. Shu sababli
+to'qnashuv bo'lmaydi va so'rovlar soni darslar soniga bog'liq emas.
+"""
+
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.pagecache import invalidate_on_commit
+from core.search import reindex_course_lessons
+from core.tasks import enqueue
+from .models import Lesson
+from .outline import invalidate_course_outline
+from .stats import defer_course_stats, mark_course_dirty
+
+LESSON_FIELDS = ('title', 'description', 'content', 'duration_seconds')
+BATCH_SIZE = 500
+
+
+def parse_syllabus(data, content_type=''):
+    """JSON (ro'yxat yoki {"lessons": [...]}) yoki CSV'dan darslar ro'yxati"""
+    if 'csv' in content_type:
+        try:
+            text = data.decode('utf-8-sig') if isinstance(data, bytes) else data
+            return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+        except UnicodeDecodeError as exc:
+            raise ValidationError("CSV fayl UTF-8 kodlashda bo'lishi kerak") from exc
+        except csv.Error as exc:
+            raise ValidationError(f"CSV noto'g'ri formatda: {exc}") from exc
+
+    try:
+        payload = json.loads(data)
+    except ValueError as exc:
+        raise ValidationError("JSON noto'g'ri formatda") from exc
+    if isinstance(payload, dict):
+        payload = payload.get('lessons')
+    if not isinstance(payload, list):
+        raise ValidationError("Darslar ro'yxati kutilgan edi")
+    return payload
+
+
+def _clean_item(item, position):
+    if not isinstance(item, dict):
+        raise ValidationError(f"{position}-qator: obyekt kutilgan edi")
+
+    lesson_id = item.get('id') or None
+    if lesson_id is not None:
+        try:
+            lesson_id = int(lesson_id)
+        except (TypeError, ValueError):
+            raise ValidationError(f"{position}-qator: id noto'g'ri")
+
+    cleaned = {'id': lesson_id}
+    for field in LESSON_FIELDS:
+        if field in item and item[field] is not None:
+            cleaned[field] = item[field]
+
+    if 'duration_seconds' in cleaned:
+        try:
+            cleaned['duration_seconds'] = int(cleaned['duration_seconds'] or 0)
+        except (TypeError, ValueError):
+            raise ValidationError(f"{position}-qator: duration_seconds butun son bo'lishi kerak")
+        if cleaned['duration_seconds'] < 0:
+            raise ValidationError(f"{position}-qator: duration_seconds manfiy bo'lmasligi kerak")
+
+    if lesson_id is None and not cleaned.get('title'):
+        raise ValidationError(f"{position}-qator: yangi dars uchun title majburiy")
+    return cleaned
+
+
+def apply_syllabus(course, items, delete_missing=True):
+    """
+    Kurs dasturini ``items`` ga moslab yangilash.
+
+    Qaytaradi: {'created': n, 'updated': n, 'deleted': n}
+    """
+    items = [_clean_item(item, position) for position, item in enumerate(items, start=1)]
+
+    ids = [item['id'] for item in items if item['id'] is not None]
+    id_set = set(ids)
+    if len(ids) != len(id_set):
+        raise ValidationError("Bir xil dars ID si bir necha marta kelgan")
+
+    with transaction.atomic(), defer_course_stats():
+        existing = {lesson.pk: lesson for lesson in Lesson.objects.filter(course=course)}
+
+        unknown = id_set - set(existing)
+        if unknown:
+            raise ValidationError(f"Bu kursga tegishli bo'lmagan darslar: {sorted(unknown)}")
+
+        max_order = max((lesson.order for lesson in existing.values()), default=0)
+
+        missing = set(existing) - id_set
+        deleted = 0
+        if missing and delete_missing:
+            # Har bir dars uchun post_delete signallari ishlaydi (qidiruv indeksi,
+            # HLS va thumbnail fayllarini tozalash vazifalari – har biri alohida).
+            # Statistika defer_course_stats bilan bir marta hisoblanadi; katta
+            # content/description maydonlari o'qilmaydi
+            Lesson.objects.filter(pk__in=missing).only('pk', 'course_id', 'thumbnail').delete()
+            deleted = len(missing)
+            for pk in missing:
+                del existing[pk]
+
+        # 1-bosqich: band tartib raqamlaridan yuqoriga surish (bitta UPDATE)
+        offset = max(max_order, len(items) + len(existing)) + 1
+        Lesson.objects.filter(course=course).update(order=F('order') + offset)
+
+        # 2-bosqich: yakuniy tartib
+        now = timezone.now()
+        to_update, to_create = [], []
+        for position, item in enumerate(items, start=1):
+            if item['id'] is None:
+                fields = {field: item[field] for field in LESSON_FIELDS if field in item}
+                fields.setdefault('description', '')
+                to_create.append(Lesson(course=course, order=position, **fields))
+            else:
+                lesson = existing[item['id']]
+                for field in LESSON_FIELDS:
+                    if field in item:
+                        setattr(lesson, field, item[field])
+                lesson.order = position
+                lesson.updated_at = now
+                to_update.append(lesson)
+
+        # delete_missing=False bo'lsa qolgan darslar ro'yxat oxiriga o'tadi
+        kept = sorted(
+            (lesson for pk, lesson in existing.items() if pk not in id_set),
+            key=lambda lesson: lesson.order,
+        )
+        for position, lesson in enumerate(kept, start=len(items) + 1):
+            lesson.order = position
+            lesson.updated_at = now
+            to_update.append(lesson)
+
+        Lesson.objects.bulk_update(
+            to_update, fields=['order', 'updated_at', *LESSON_FIELDS], batch_size=BATCH_SIZE,
+        )
+        Lesson.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+
+        # bulk_* signal yubormaydi – statistika va kesh qo'lda belgilanadi
+        mark_course_dirty(course.pk)
+        invalidate_course_outline(course.pk)
+        invalidate_on_commit('catalog')
+        enqueue(reindex_course_lessons, course.pk)
+
+    return {'created': len(to_create), 'updated': len(to_update), 'deleted': deleted}
+
+
+def export_syllabus(course):
+    return [
+        {
+            'id': lesson.pk,
+            'order': lesson.order,
+            'title': lesson.title,
+            'description': lesson.description,
+            'content': lesson.content,
+            'duration_seconds': lesson.duration_seconds,
+        }
+        for lesson in Lesson.objects.filter(course=course).order_by('order')
+    ]
@@ -1,3 +1,997 @@
-from django.test import TestCase
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, OperationalError, transaction
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from core.pagecache import get_generation
+from core.testing import QueryBudgetMixin
+from .models import Category, Course, Enrollment, Lesson, LessonProgress, format_duration
+from .outline import get_course_outline
+from .progress import MAX_EVENTS, record_progress
+from .progress_buffer import ProgressBuffer
+from .signed_media import _signature, serve_public_media, signed_directory_url, signed_url, verify
+from .stats import reconcile_student_counts
+from .streaming import RangeNotSatisfiable, parse_range_header, serve_file
+from .syllabus import apply_syllabus, parse_syllabus
+from .transcoding import transcode_lesson
+from .video_probe import ProbeResult, StubProber, probe_lesson_video
+from .uploads import UploadSession, _running_sha256
+
+
+# ============================================================
+# ADMIN RO'YXATLARI
+# ============================================================
+class AdminChangelistQueriesTest(QueryBudgetMixin, TestCase):
+    """So'rovlar soni qatorlar soniga bog'liq emas (N+1 yo'q)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        for i in range(5):
+            category = Category.objects.create(name=f'Kategoriya {i}')
+            course = Course.objects.create(title=f'Kurs {i}', description='Tavsif', category=category, status='published')
+            student = User.objects.create_user(f'talaba{i}', password='parol')
+            Enrollment.objects.create(student=student, course=course)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_category_changelist(self):
+        # sessiya, foydalanuvchi, 2×COUNT, ro'yxat (kurslar soni annotatsiya bilan)
+        self.assertQueryBudget('admin:course_category_changelist', budget=5)
+
+    def test_course_changelist(self):
+        # + list_filter'dagi kategoriyalar
+        self.assertQueryBudget('admin:course_course_changelist', budget=6)
+
+    def test_enrollment_changelist(self):
+        # talaba va kurs list_select_related bilan; + list_filter'dagi kurslar
+        self.assertQueryBudget('admin:course_enrollment_changelist', budget=6)
+
+
+# ============================================================
+# OMMAVIY SAHIFALAR
+# ============================================================
+class CourseViewsQueriesTest(QueryBudgetMixin, TestCase):
+    """Sovuq va issiq keshda so'rovlar soni (darslar soniga bog'liq emas)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('talaba', password='parol')
+        category = Category.objects.create(name='Dasturlash')
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', category=category, status='published')
+        cls.lessons = [
+            Lesson.objects.create(course=cls.course, title=f'Dars {order}', description='x', order=order)
+            for order in range(1, 6)
+        ]
+        Enrollment.objects.create(student=cls.student, course=cls.course)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_course_anonymous(self):
+        # kategoriyalar, sahifa, COUNT; keyin butun sahifa keshdan
+        response = self.assertQueryBudget('course', budget=3)
+        self.assertEqual(response.context['total_count'], 1)
+        self.assertQueryBudget('course', budget=0)
+
+    def test_course_logged_in(self):
+        # + sessiya, foydalanuvchi, navbar profili; keyin COUNT keshdan
+        self.client.force_login(self.student)
+        self.assertQueryBudget('course')
+        self.assertQueryBudget('course', budget=settings.QUERY_BUDGETS['course'] - 1)
+
+    def test_course_detail(self):
+        self.client.force_login(self.student)
+        # sessiya, foydalanuvchi, kurs (+ yozilganlik EXISTS), darslar ro'yxati, navbar profili
+        response = self.assertQueryBudget('course_detail', course_id=self.course.id)
+        self.assertTrue(response.context['is_enrolled'])
+        self.assertEqual(len(response.context['all_lessons']), 5)
+        # Darslar ro'yxati keshdan
+        self.assertQueryBudget('course_detail', budget=4, course_id=self.course.id)
+
+    def test_lesson_view(self):
+        self.client.force_login(self.student)
+        kwargs = {'course_id': self.course.id, 'lesson_id': self.lessons[2].id}
+        # sessiya, foydalanuvchi, dars (+ kurs, yozilganlik), progress, darslar ro'yxati, navbar profili
+        response = self.assertQueryBudget('lesson_view', **kwargs)
+        self.assertTrue(response.context['is_enrolled'])
+        self.assertEqual(response.context['course'], self.course)
+        self.assertQueryBudget('lesson_view', budget=5, **kwargs)
+
+    def test_unpublished_course_is_404(self):
+        self.client.force_login(self.student)
+        Course.objects.filter(pk=self.course.pk).update(status='draft')
+        self.assertEqual(self.client.get(reverse('course_detail', args=[self.course.id])).status_code, 404)
+        response = self.client.get(reverse('lesson_view', args=[self.course.id, self.lessons[0].id]))
+        self.assertEqual(response.status_code, 404)
+
+
+# ============================================================
+# HLS TRANSKODLASH
+# ============================================================
+@mock.patch('course.transcoding.enqueue')
+class TranscodeSchedulingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Dasturlash')
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', category=category)
+
+    def create_lesson(self, order=1, video='course_videos/dars.mp4', **fields):
+        with mock.patch('course.video_probe.enqueue'):
+            lesson = Lesson.objects.create(course=self.course, title=f'Dars {order}', description='x',
+                                           order=order, video_file=video)
+        Lesson.objects.filter(pk=lesson.pk).update(**fields)
+        lesson.refresh_from_db()
+        return lesson
+
+    def transcode_calls(self, enqueue):
+        return [call.args[1:] for call in enqueue.call_args_list if call.args[0] is transcode_lesson]
+
+    def test_failed_is_not_retried_on_every_save(self, enqueue):
+        lesson = self.create_lesson(hls_status='failed')
+        enqueue.reset_mock()
+        lesson.title = 'Yangi nom'
+        lesson.save()
+        self.assertEqual(self.transcode_calls(enqueue), [])
+
+    def test_failed_is_retried_when_video_changes(self, enqueue):
+        lesson = self.create_lesson(hls_status='failed')
+        enqueue.reset_mock()
+        lesson.video_file = 'course_videos/yangi.mp4'
+        with mock.patch('course.video_probe.enqueue'):
+            lesson.save()
+        self.assertEqual(self.transcode_calls(enqueue), [(lesson.pk, 'course_videos/yangi.mp4')])
+
+    def test_admin_retry_action(self, enqueue):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        failed = self.create_lesson(1, hls_status='failed')
+        without_video = self.create_lesson(2, video='')
+        enqueue.reset_mock()
+
+        self.client.force_login(admin)
+        self.client.post(reverse('admin:course_lesson_changelist'), {
+            'action': 'retry_transcode', '_selected_action': [failed.pk, without_video.pk],
+        })
+        self.assertEqual(self.transcode_calls(enqueue), [(failed.pk, 'course_videos/dars.mp4')])
+        failed.refresh_from_db()
+        self.assertEqual(failed.hls_status, 'pending')
+
+    def test_requeue_stale(self, enqueue):
+        old = timezone.now() - timedelta(hours=3)
+        stale = self.create_lesson(1, hls_status='processing', hls_updated_at=old)
+        legacy = self.create_lesson(2, hls_status='pending', hls_updated_at=None)
+        self.create_lesson(3, hls_status='processing', hls_updated_at=timezone.now())
+        self.create_lesson(4, hls_status='failed', hls_updated_at=old)
+        enqueue.reset_mock()
+
+        call_command('requeue_stale_transcodes', '--max-age', 3600, stdout=mock.Mock())
+        self.assertCountEqual([args[0] for args in self.transcode_calls(enqueue)], [stale.pk, legacy.pk])
+        stale.refresh_from_db()
+        self.assertEqual(stale.hls_status, 'pending')
+        self.assertGreater(stale.hls_updated_at, old)
+
+
+# ============================================================
+# KATALOG KESHI
+# ============================================================
+class CatalogInvalidationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('talaba', password='parol')
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def save(self, obj, **kwargs):
+        before = get_generation('catalog')
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.save(**kwargs)
+        return get_generation('catalog') > before
+
+    def test_only_counter_changes_bump_catalog(self):
+        enrollment = Enrollment(student=self.student, course=self.course)
+        self.assertTrue(self.save(enrollment))
+
+        enrollment.progress = 40
+        self.assertFalse(self.save(enrollment))
+
+        enrollment.status = 'completed'
+        self.assertTrue(self.save(enrollment))
+
+
+# ============================================================
+# VIDEO OQIMI (HTTP Range)
+# ============================================================
+class RangeRequestTest(SimpleTestCase):
+    content = bytes(range(256)) * 4  # 1024 bayt
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.mp4')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.content)
+        self.addCleanup(os.remove, self.path)
+
+    def get(self, range_header=None):
+        headers = {'HTTP_RANGE': range_header} if range_header else {}
+        response = serve_file(RequestFactory().get('/', **headers), self.path)
+        body = b''.join(response) if response.status_code in (200, 206) else b''
+        response.close()
+        return response, body
+
+    def test_parse(self):
+        self.assertEqual(parse_range_header('bytes=0-99', 1024), (0, 99))
+        self.assertEqual(parse_range_header('bytes=1000-', 1024), (1000, 1023))
+        self.assertEqual(parse_range_header('bytes=1000-5000', 1024), (1000, 1023))
+        self.assertEqual(parse_range_header('bytes=-100', 1024), (924, 1023))
+        self.assertEqual(parse_range_header('bytes=-5000', 1024), (0, 1023))
+
+    def test_unsupported_or_malformed_is_ignored(self):
+        for header in ('', 'bytes=-', 'bytes=abc-', 'items=0-10', 'bytes=50-10', 'bytes=0-10,5-20'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range_header(header, 1024))
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1024-', 'bytes=-0'):
+            with self.subTest(header=header), self.assertRaises(RangeNotSatisfiable):
+                parse_range_header(header, 1024)
+
+    def test_partial_response(self):
+        response, body = self.get('bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(body, self.content[10:20])
+
+    def test_suffix_response(self):
+        response, body = self.get('bytes=-24')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1000-1023/1024')
+        self.assertEqual(body, self.content[-24:])
+
+    def test_overlapping_ranges_get_full_file(self):
+        response, body = self.get('bytes=0-99,50-149')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_bad_range_gets_full_file(self):
+        response, body = self.get('bytes=oxirgi')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_out_of_bounds_is_416(self):
+        response, _ = self.get('bytes=2048-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_stale_if_range_gets_full_file(self):
+        request = RequestFactory().get('/', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"eski"')
+        response = serve_file(request, self.path)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+
+# ============================================================
+# KURS STATISTIKASI (commit'da bir marta)
+# ============================================================
+class CourseStatsBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif')
+        cls.other = Course.objects.create(title='Boshqa kurs', description='Tavsif')
+
+    def create_lesson(self, course, order, seconds=1800):
+        return Lesson.objects.create(course=course, title=f'Dars {order}', description='x',
+                                     order=order, duration_seconds=seconds)
+
+    def test_one_recompute_per_transaction(self):
+        with mock.patch('course.stats.recompute_course_stats') as recompute:
+            with self.captureOnCommitCallbacks(execute=True):
+                for order in range(1, 4):
+                    self.create_lesson(self.course, order)
+                self.create_lesson(self.other, 1)
+        recompute.assert_called_once_with({self.course.pk, self.other.pk})
+
+    def test_rolled_back_savepoint_does_not_swallow_later_changes(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            self.create_lesson(self.other, 1)
+            raise ValueError
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_lesson(self.course, 1)
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.lessons_count, self.course.total_hours), (1, 0.5))
+
+    def test_pending_batch_from_outer_block_does_not_swallow_changes(self):
+        # Tashqi (hali commit bo'lmagan) blokda belgilangan kurs
+        self.create_lesson(self.other, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_lesson(self.course, 1)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.lessons_count, 1)
+
+
+# ============================================================
+# KURS DASTURI (syllabus) IMPORTI
+# ============================================================
+class SyllabusImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+
+    def setUp(self):
+        self.lessons = [
+            Lesson.objects.create(course=self.course, title=f'Dars {i}', description='x', order=i, duration_seconds=60)
+            for i in range(1, 5)
+        ]
+
+    def outline(self):
+        return list(Lesson.objects.filter(course=self.course).order_by('order').values_list('title', 'order'))
+
+    def test_reorder_swap_and_delete_in_one_import(self):
+        first, second, third, fourth = self.lessons
+        with self.captureOnCommitCallbacks(execute=True):
+            result = apply_syllabus(self.course, [
+                {'id': third.pk},
+                {'id': second.pk, 'title': 'Ikkinchi (yangi)'},
+                {'title': 'Yangi dars', 'duration_seconds': 120},
+                {'id': first.pk},
+            ])
+
+        self.assertEqual(result, {'created': 1, 'updated': 3, 'deleted': 1})
+        self.assertEqual(self.outline(), [
+            ('Dars 3', 1), ('Ikkinchi (yangi)', 2), ('Yangi dars', 3), ('Dars 1', 4),
+        ])
+        self.assertFalse(Lesson.objects.filter(pk=fourth.pk).exists())
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.lessons_count, 4)
+
+    def test_keep_missing_moves_them_to_the_end(self):
+        first, second, third, fourth = self.lessons
+        result = apply_syllabus(self.course, [{'id': fourth.pk}, {'id': first.pk}], delete_missing=False)
+        # Oxirga surilgan darslar ham yangilanganlar qatorida
+        self.assertEqual(result, {'created': 0, 'updated': 4, 'deleted': 0})
+        self.assertEqual(self.outline(), [('Dars 4', 1), ('Dars 1', 2), ('Dars 2', 3), ('Dars 3', 4)])
+
+    def test_invalid_import_changes_nothing(self):
+        other = Course.objects.create(title='Boshqa', description='x')
+        foreign = Lesson.objects.create(course=other, title='Begona', description='x', order=1)
+        for items in ([{'id': self.lessons[0].pk}, {'id': self.lessons[0].pk}], [{'id': foreign.pk}], [{'id': 'abc'}]):
+            with self.subTest(items=items), self.assertRaises(ValidationError):
+                apply_syllabus(self.course, items)
+        self.assertEqual(self.outline(), [(f'Dars {i}', i) for i in range(1, 5)])
+
+    def test_non_utf8_csv_is_a_validation_error(self):
+        with self.assertRaises(ValidationError):
+            parse_syllabus('title\nDarslik\xe9\n'.encode('latin-1'), 'text/csv')
+
+    def test_view_returns_400_for_bad_csv(self):
+        self.client.force_login(self.admin)
+        upload = SimpleUploadedFile('dastur.csv', b'title\n\xff\xfe\xfa\n', content_type='text/csv')
+        response = self.client.post(reverse('course_syllabus', kwargs={'course_id': self.course.pk}), {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
+
+
+class DurationFormatTest(SimpleTestCase):
+    def test_format_duration(self):
+        self.assertEqual(format_duration(45), '45 sekund')
+        self.assertEqual(format_duration(600), '10 daqiqa')
+        self.assertEqual(format_duration(5400), '1 soat 30 daqiqa')
+
+    def test_course_total_uses_format_duration(self):
+        self.assertEqual(Course(total_hours=1.5).total_duration_formatted, '1 soat 30 daqiqa')
+        self.assertEqual(Course(total_hours=0).total_duration_formatted, '0 sekund')
+
+
+# ============================================================
+# QISMLAB YUKLASH (tus)
+# ============================================================
+MP4_HEAD = b'\x00\x00\x00\x18ftypmp42'
+
+
+def _b64(value):
+    return base64.b64encode(value.encode()).decode()
+
+
+class ResumableUploadTest(TestCase):
+    content = MP4_HEAD + os.urandom(4096)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        course = Course.objects.create(title='Kurs', description='Tavsif')
+        cls.lesson = Lesson.objects.create(course=course, title='Dars', description='x', order=1)
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=os.path.join(root, 'media'),
+                                              LESSON_UPLOAD_DIR=os.path.join(root, 'uploads'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_login(self.admin)
+
+    def create(self, sha256=None):
+        metadata = f'lesson {_b64(str(self.lesson.pk))},filename {_b64("dars.mp4")}'
+        if sha256:
+            metadata += f',sha256 {_b64(sha256)}'
+        response = self.client.post(reverse('lesson_upload_create'), headers={
+            'Upload-Length': str(len(self.content)), 'Upload-Metadata': metadata, 'Tus-Resumable': '1.0.0',
+        })
+        self.assertEqual(response.status_code, 201)
+        return response['Location']
+
+    def patch(self, url, offset, data, checksum=None, **extra):
+        headers = {'Upload-Offset': str(offset), 'Tus-Resumable': '1.0.0'}
+        if checksum:
+            headers['Upload-Checksum'] = checksum
+        return self.client.generic('PATCH', url, data, content_type='application/offset+octet-stream',
+                                   headers=headers, **extra)
+
+    def offset(self, url):
+        return int(self.client.head(url)['Upload-Offset'])
+
+    def session(self, url):
+        return UploadSession.load(url.rstrip('/').rsplit('/', 1)[-1])
+
+    def test_offset_conflict_is_409(self):
+        url = self.create()
+        self.assertEqual(self.patch(url, 0, self.content[:100]).status_code, 204)
+        self.assertEqual(self.patch(url, 0, self.content[:100]).status_code, 409)
+        self.assertEqual(self.patch(url, 50, self.content[50:100]).status_code, 409)
+        self.assertEqual(self.offset(url), 100)
+
+    def test_checksum_mismatch_is_460_and_chunk_is_discarded(self):
+        url = self.create()
+        chunk = self.content[:100]
+        wrong = 'sha1 ' + base64.b64encode(hashlib.sha1(b'boshqa').digest()).decode()
+        self.assertEqual(self.patch(url, 0, chunk, checksum=wrong).status_code, 460)
+        self.assertEqual(self.offset(url), 0)
+
+        right = 'sha1 ' + base64.b64encode(hashlib.sha1(chunk).digest()).decode()
+        self.assertEqual(self.patch(url, 0, chunk, checksum=right).status_code, 204)
+        self.assertEqual(self.offset(url), 100)
+
+    def test_resume_after_partial_patch(self):
+        url = self.create(sha256=hashlib.sha256(self.content).hexdigest())
+        # Aloqa uzildi: Content-Length 1000, lekin faqat 300 bayt keldi
+        self.session(url).append(io.BytesIO(self.content[:300]), 0, 1000)
+        self.assertEqual(self.offset(url), 300)
+
+        self.assertEqual(self.patch(url, 300, self.content[300:]).status_code, 204)
+        self.lesson.refresh_from_db()
+        with self.lesson.video_file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_whole_file_sha256_across_workers(self):
+        url = self.create(sha256=hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(self.patch(url, 0, self.content[:1000]).status_code, 204)
+        # Keyingi PATCH boshqa worker'ga tushdi – xotirada yig'ilgan holat yo'q
+        _running_sha256.clear()
+        self.assertEqual(self.patch(url, 1000, self.content[1000:2000]).status_code, 204)
+        self.assertEqual(self.patch(url, 2000, self.content[2000:]).status_code, 204)
+        self.lesson.refresh_from_db()
+        self.assertTrue(self.lesson.video_file)
+
+    def test_whole_file_sha256_mismatch(self):
+        url = self.create(sha256=hashlib.sha256(b'boshqa fayl').hexdigest())
+        response = self.patch(url, 0, self.content)
+        self.assertEqual(response.status_code, 460)
+        self.lesson.refresh_from_db()
+        self.assertFalse(self.lesson.video_file)
+
+    def test_head_is_validated_after_short_reads(self):
+        url = self.create()
+        session = self.session(url)
+
+        class Trickle(io.BytesIO):
+            def read(self, size=-1):
+                return super().read(min(size, 1) if size and size > 0 else 1)
+
+        self.assertEqual(session.append(Trickle(self.content[:100]), 0, 100), 100)
+
+    def test_bad_head_is_rejected(self):
+        url = self.create()
+        response = self.patch(url, 0, b'<html>' + self.content[6:100])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.offset(url), 0)
+
+
+# ============================================================
+# IMZOLANGAN MEDIA URL'LARI
+# ============================================================
+class SignedMediaTest(SimpleTestCase):
+    video = 'course_videos/2025/01/dars.mp4'
+    playlist = 'course_hls/7/ab12cd/master.m3u8'
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=root, MEDIA_ACCEL='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for name in (self.video, self.playlist, 'course_hls/7/ab12cd/720p/seg_0000.ts',
+                     'course_hls/8/ef34ab/master.m3u8'):
+            os.makedirs(os.path.join(root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(root, name), 'wb') as f:
+                f.write(name.encode())
+
+    def parts(self, url):
+        kwargs = resolve(url).kwargs
+        return kwargs['expires'], kwargs['depth'], kwargs['signature'], kwargs['path']
+
+    def test_valid_url_serves_file(self):
+        response = self.client.get(signed_url(self.video))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.video.encode())
+
+    def test_directory_signature_covers_only_its_directory(self):
+        expires, depth, signature, _ = self.parts(signed_directory_url(self.playlist))
+        self.assertTrue(verify(expires, depth, signature, 'course_hls/7/ab12cd/720p/seg_0000.ts'))
+        self.assertFalse(verify(expires, depth, signature, 'course_hls/8/ef34ab/master.m3u8'))
+
+    def test_expired(self):
+        expires = int(time.time()) - 1
+        signature = _signature(expires, self.video)
+        self.assertFalse(verify(expires, self.video.count('/') + 1, signature, self.video))
+        url = reverse('signed_media', args=[expires, self.video.count('/') + 1, signature, self.video])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_tampered(self):
+        expires, depth, signature, path = self.parts(signed_url(self.video))
+        tampered = ('A' if signature[0] != 'A' else 'B') + signature[1:]
+        self.assertFalse(verify(expires, depth, tampered, path))
+        # Imzo o'zgarmagan, lekin muddat uzaytirilgan
+        self.assertFalse(verify(expires + 3600, depth, signature, path))
+        # Imzo qamrovini kengaytirishga urinish (butun yo'l o'rniga katalog)
+        self.assertFalse(verify(expires, depth - 1, signature, path))
+        url = reverse('signed_media', args=[expires, depth, tampered, path])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_dot_dot_paths(self):
+        expires, depth, signature, _ = self.parts(signed_directory_url(self.playlist))
+        for path in ('course_hls/7/ab12cd/../../8/ef34ab/master.m3u8',
+                     'course_hls/7/ab12cd/..',
+                     'course_hls/7/ab12cd//master.m3u8'):
+            with self.subTest(path=path):
+                self.assertFalse(verify(expires, depth, signature, path))
+
+        # Imzolangan katalogdan chiqib, himoyalanmagan faylga
+        escaped = 'course_hls/7/ab12cd/../../../../etc/passwd'
+        self.assertFalse(verify(expires, depth, signature, escaped))
+        url = reverse('signed_media', args=[expires, depth, signature, escaped])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_public_media_does_not_expose_protected_paths(self):
+        root = settings.MEDIA_ROOT
+        for path in (self.video, './' + self.video, 'avatars/../' + self.video, '/' + self.video,
+                     'course_hls/./7/ab12cd/master.m3u8'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                serve_public_media(RequestFactory().get('/'), path, document_root=root)
+
+        os.makedirs(os.path.join(root, 'avatars'))
+        with open(os.path.join(root, 'avatars', 'rasm.png'), 'wb') as f:
+            f.write(b'png')
+        response = serve_public_media(RequestFactory().get('/'), 'avatars/rasm.png', document_root=root)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unprotected_prefix_is_rejected(self):
+        name = 'avatars/rasm.png'
+        expires, depth, signature, _ = self.parts(signed_url(name))
+        self.assertFalse(verify(expires, depth, signature, name))
+
+
+# ============================================================
+# TALABALAR HISOBLAGICHLARI (students_count / active_students_count)
+# ============================================================
+class StudentCountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+        cls.students = [User.objects.create_user(f'talaba{i}', password='parol') for i in range(3)]
+
+    def counts(self):
+        self.course.refresh_from_db()
+        return self.course.students_count, self.course.active_students_count
+
+    def enroll(self, student, status='active'):
+        return Enrollment.objects.create(student=student, course=self.course, status=status)
+
+    def test_create(self):
+        self.enroll(self.students[0])
+        self.enroll(self.students[1], status='completed')
+        self.assertEqual(self.counts(), (2, 1))
+
+    def test_status_change(self):
+        enrollment = self.enroll(self.students[0])
+        enrollment.status = 'completed'
+        enrollment.save()
+        self.assertEqual(self.counts(), (1, 0))
+
+        enrollment.status = 'active'
+        enrollment.save()
+        self.assertEqual(self.counts(), (1, 1))
+
+        # Holat o'zgarmagan saqlash hisoblagichga tegmaydi
+        enrollment.progress = 50
+        enrollment.save()
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_delete(self):
+        active = self.enroll(self.students[0])
+        completed = self.enroll(self.students[1], status='completed')
+        active.delete()
+        self.assertEqual(self.counts(), (1, 0))
+        completed.delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_delete_with_unreconciled_zero_counters(self):
+        enrollment = self.enroll(self.students[0])
+        Course.objects.filter(pk=self.course.pk).update(students_count=0, active_students_count=0)
+        enrollment.delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_reconcile(self):
+        self.enroll(self.students[0])
+        self.enroll(self.students[1])
+        self.enroll(self.students[2], status='cancelled')
+        Course.objects.filter(pk=self.course.pk).update(students_count=0, active_students_count=7)
+
+        call_command('reconcile_course_students', stdout=io.StringIO())
+        self.assertEqual(self.counts(), (3, 2))
+        self.assertEqual(reconcile_student_counts(), 0)
+
+
+# ============================================================
+# VIDEO PROGRESSI (paket yozuv)
+# ============================================================
+@override_settings(PROGRESS_WRITE_BEHIND=False)
+class LessonProgressTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('talaba', password='parol')
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+        cls.lessons = [
+            Lesson.objects.create(course=cls.course, title=f'Dars {order}', description='x',
+                                  order=order, duration_seconds=100)
+            for order in range(1, 5)
+        ]
+        Course.objects.filter(pk=cls.course.pk).update(lessons_count=len(cls.lessons))
+        cls.free, cls.paid = cls.lessons[0], cls.lessons[3]
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def post(self, body):
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        return self.client.post(reverse('lesson_progress'), body, content_type='application/json')
+
+    def send(self, *events):
+        return self.post({'events': list(events)})
+
+    def row(self, lesson):
+        return LessonProgress.objects.get(student=self.student, lesson=lesson)
+
+    def test_malformed_json(self):
+        response = self.post('{"events": [')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_events(self):
+        for body in ({}, {'events': []}, {'events': 'x'}, {'events': [{'position': 10}]},
+                     {'events': [{'lesson': 'abc'}]}, {'events': [{'lesson': 1}] * (MAX_EVENTS + 1)}):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+        self.assertFalse(LessonProgress.objects.exists())
+
+    def test_duplicate_events_are_merged(self):
+        response = self.send(
+            {'lesson': self.free.id, 'position': 40},
+            {'lesson': self.free.id, 'position': 70},
+            {'lesson': self.free.id, 'position': 20},
+        )
+        self.assertEqual(response.json(), {'saved': 1, 'progress': {}})
+        row = self.row(self.free)
+        self.assertEqual((row.position_seconds, row.max_position_seconds, row.completed), (20, 70, False))
+
+    def test_upsert_keeps_furthest_position(self):
+        self.send({'lesson': self.free.id, 'position': 80})
+        # Orqaga qaytib ko'rish – joy yangilanadi, eng uzoq joy saqlanadi
+        self.send({'lesson': self.free.id, 'position': 30})
+        row = self.row(self.free)
+        self.assertEqual((row.position_seconds, row.max_position_seconds), (30, 80))
+        self.assertEqual(LessonProgress.objects.count(), 1)
+
+    def test_enrollment_progress_only_on_newly_completed(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        with mock.patch('course.progress.update_enrollment_progress', return_value={}) as update:
+            self.send({'lesson': self.free.id, 'position': 50})
+            update.assert_not_called()
+
+            # 90% ko'rildi – dars tugatildi
+            self.send({'lesson': self.free.id, 'position': 95})
+            update.assert_called_once_with(self.student.id, {self.course.id})
+
+            # Tugatilgan darsning keyingi hodisalari qayta hisoblatmaydi
+            self.send({'lesson': self.free.id, 'position': 10, 'ended': True})
+            update.assert_called_once()
+
+    def test_enrollment_progress_is_updated(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+        response = self.send({'lesson': self.free.id, 'position': 100, 'ended': True},
+                             {'lesson': self.paid.id, 'position': 100, 'ended': True})
+        self.assertEqual(response.json(), {'saved': 2, 'progress': {str(self.course.id): 50.0}})
+        self.assertEqual(Enrollment.objects.get(student=self.student).progress, 50.0)
+
+    def test_unenrolled_paid_lesson_is_rejected(self):
+        response = self.send({'lesson': self.paid.id, 'position': 50},
+                             {'lesson': self.free.id, 'position': 50})
+        self.assertEqual(response.json()['saved'], 1)
+        self.assertFalse(LessonProgress.objects.filter(lesson=self.paid).exists())
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.send({'lesson': self.free.id, 'position': 50})
+        self.assertEqual(response.status_code, 302)
+
+
+# ============================================================
+# PROGRESS BUFERI (write-behind)
+# ============================================================
+@contextmanager
+def failing_commit(before_fail=None):
+    """Tashqi tranzaksiya commit'i "database is locked" bilan yiqiladi"""
+    real_atomic, depth = transaction.atomic, 0
+
+    @contextmanager
+    def atomic(*args, **kwargs):
+        nonlocal depth
+        depth += 1
+        try:
+            with real_atomic(*args, **kwargs):
+                yield
+        finally:
+            depth -= 1
+        if depth == 0:
+            if before_fail:
+                before_fail()
+            raise OperationalError('database is locked')
+
+    with mock.patch.object(transaction, 'atomic', atomic):
+        yield
+
+
+@mock.patch.object(ProgressBuffer, '_ensure_thread')
+class ProgressBufferTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [User.objects.create_user(f'talaba{i}', password='parol') for i in range(2)]
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+        cls.lessons = [
+            Lesson.objects.create(course=cls.course, title=f'Dars {order}', description='x',
+                                  order=order, duration_seconds=600)
+            for order in range(1, 3)
+        ]
+
+    def event(self, position, max_position=None, ended=False):
+        return {'position': position, 'max_position': max_position or position, 'ended': ended}
+
+    def test_flush_is_triggered_by_size(self, ensure_thread):
+        buffer = ProgressBuffer(interval=60, max_size=2)
+        buffer.add(self.students[0].id, {self.lessons[0].id: self.event(10)})
+        self.assertFalse(buffer._wakeup.is_set())
+
+        # Bir xil (talaba, dars) birlashtiriladi – hajm o'smaydi
+        buffer.add(self.students[0].id, {self.lessons[0].id: self.event(20)})
+        self.assertFalse(buffer._wakeup.is_set())
+
+        buffer.add(self.students[1].id, {self.lessons[0].id: self.event(30)})
+        self.assertTrue(buffer._wakeup.is_set())
+        ensure_thread.assert_called()
+
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(LessonProgress.objects.get(student=self.students[0]).position_seconds, 20)
+
+    def test_requeue_after_failed_commit(self, ensure_thread):
+        buffer = ProgressBuffer(interval=60, max_size=100)
+        student, (first, second) = self.students[0].id, self.lessons
+        buffer.add(student, {first.id: self.event(50, 60), second.id: self.event(15)})
+
+        # Flush davomida yangi heartbeat keladi, keyin commit yiqiladi
+        newer = lambda: buffer.add(student, {first.id: self.event(10)})
+        with self.assertRaises(OperationalError), failing_commit(before_fail=newer):
+            buffer.flush()
+
+        # Yangi joy ustun, eng uzoq joy esa yo'qolmaydi
+        self.assertEqual(buffer._pending[(student, first.id)], self.event(10, 60))
+        self.assertEqual(buffer._pending[(student, second.id)], self.event(15))
+        self.assertEqual(buffer.stats['flushes'], 0)
+
+    def test_student_error_is_isolated(self, ensure_thread):
+        buffer = ProgressBuffer(interval=60, max_size=100)
+        broken, healthy = self.students
+        for student in self.students:
+            buffer.add(student.id, {self.lessons[0].id: self.event(40)})
+
+        def record(student_id, events):
+            result = record_progress(student_id, events)
+            if student_id == broken.id:
+                raise DatabaseError('xato')
+            return result
+
+        with self.assertLogs('course.progress_buffer', 'ERROR'), \
+                mock.patch('course.progress_buffer.record_progress', side_effect=record):
+            self.assertEqual(buffer.flush(), 1)
+
+        # Xato bergan talabaning yozuvlari savepoint bilan bekor qilindi
+        self.assertFalse(LessonProgress.objects.filter(student=broken).exists())
+        self.assertTrue(LessonProgress.objects.filter(student=healthy).exists())
+        self.assertEqual(buffer.stats['errors'], 1)
+
+    @override_settings(PROGRESS_WRITE_BEHIND=True)
+    def test_view_queues_events(self, ensure_thread):
+        buffer = ProgressBuffer(interval=60, max_size=100)
+        self.client.force_login(self.students[0])
+        events = [{'lesson': self.lessons[0].id, 'position': 30}, {'lesson': self.lessons[0].id, 'position': 35}]
+        with mock.patch('course.progress_buffer.get_buffer', return_value=buffer):
+            response = self.client.post(reverse('lesson_progress'), {'events': events}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'queued': 1})
+        self.assertFalse(LessonProgress.objects.exists())
+
+        buffer.flush()
+        self.assertEqual(LessonProgress.objects.get().position_seconds, 35)
+
+
+# ============================================================
+# DARSLAR RO'YXATI KESHI
+# ============================================================
+class CourseOutlineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+        cls.lessons = [
+            Lesson.objects.create(course=cls.course, title=f'Dars {i}', description='x', order=i, duration_seconds=60)
+            for i in range(1, 4)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def titles(self):
+        return [entry.title for entry in get_course_outline(self.course)]
+
+    def test_warm_cache_runs_no_queries(self):
+        outline = get_course_outline(self.course)
+        self.assertEqual([(entry.order, entry.is_free) for entry in outline], [(1, True), (2, True), (3, True)])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_course_outline(self.course), outline)
+
+    def test_lesson_create_update_delete_invalidate(self):
+        self.assertEqual(self.titles(), ['Dars 1', 'Dars 2', 'Dars 3'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(course=self.course, title='Dars 4', description='x', order=4)
+        self.assertEqual(self.titles(), ['Dars 1', 'Dars 2', 'Dars 3', 'Dars 4'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lessons[1].title = 'Yangi nom'
+            self.lessons[1].save()
+        self.assertEqual(self.titles(), ['Dars 1', 'Yangi nom', 'Dars 3', 'Dars 4'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lessons[0].delete()
+        self.assertEqual(self.titles(), ['Yangi nom', 'Dars 3', 'Dars 4'])
+
+    def test_syllabus_bulk_update_invalidates(self):
+        first, second, third = self.lessons
+        self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_syllabus(self.course, [{'id': third.pk}, {'id': first.pk, 'title': 'Kirish'}], delete_missing=False)
+        self.assertEqual(self.titles(), ['Dars 3', 'Kirish', 'Dars 2'])
+
+
+# ============================================================
+# VIDEO METADATA (video_probe)
+# ============================================================
+@override_settings(VIDEO_PROBER='stub')
+@mock.patch('course.transcoding.enqueue')
+class VideoProbeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(title='Kurs', description='Tavsif', status='published')
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.makedirs(os.path.join(root, 'course_videos'))
+        with open(os.path.join(root, 'course_videos', 'dars.mp4'), 'wb') as f:
+            f.write(MP4_HEAD + b'\0' * 7200)
+
+    def create_lesson(self, **fields):
+        with mock.patch('course.video_probe.enqueue') as enqueue:
+            lesson = Lesson.objects.create(course=self.course, title='Dars', description='x', order=1,
+                                           video_file='course_videos/dars.mp4', **fields)
+        enqueue.assert_called_once_with(probe_lesson_video, lesson.pk, 'course_videos/dars.mp4')
+        return lesson
+
+    def test_stub_prober_writes_duration_and_course_stats(self, transcode_enqueue):
+        lesson = self.create_lesson()
+        with self.captureOnCommitCallbacks(execute=True):
+            probe_lesson_video(lesson.pk, 'course_videos/dars.mp4')
+
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.duration_seconds, 7)  # StubProber: hajm // 1000
+        self.assertFalse(lesson.thumbnail)
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.lessons_count, self.course.total_hours), (1, round(7 / 3600, 2)))
+
+    @mock.patch('core.images.enqueue')
+    def test_poster_is_saved_as_thumbnail(self, images_enqueue, transcode_enqueue):
+        lesson = self.create_lesson()
+        result = ProbeResult(duration_seconds=90, poster=b'\xff\xd8jpeg')
+        with mock.patch.object(StubProber, 'probe', return_value=result), \
+                mock.patch.object(Course, 'update_stats', autospec=True) as update_stats:
+            probe_lesson_video(lesson.pk, 'course_videos/dars.mp4')
+
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.duration_seconds, 90)
+        self.assertTrue(lesson.thumbnail.name.endswith(f'lesson_{lesson.pk}_poster.jpg'))
+        with lesson.thumbnail.open() as f:
+            self.assertEqual(f.read(), b'\xff\xd8jpeg')
+        update_stats.assert_called_once()
+        images_enqueue.assert_called_once()
+
+    def test_replaced_video_is_skipped(self, transcode_enqueue):
+        lesson = self.create_lesson()
+        Lesson.objects.filter(pk=lesson.pk).update(video_file='course_videos/yangi.mp4')
+        with mock.patch.object(StubProber, 'probe') as probe:
+            probe_lesson_video(lesson.pk, 'course_videos/dars.mp4')
+        probe.assert_not_called()
+
+    def test_probe_only_when_video_changes(self, transcode_enqueue):
+        lesson = self.create_lesson()
+        # HLS'dan oldingi dars (hls_source bo'sh) – nom o'zgarsa video qayta o'qilmaydi
+        Lesson.objects.filter(pk=lesson.pk).update(hls_status='', hls_source='')
+        lesson.refresh_from_db()
+
+        with mock.patch('course.video_probe.enqueue') as enqueue:
+            lesson.title = 'Yangi nom'
+            lesson.save()
+            enqueue.assert_not_called()
+
+            lesson.video_file = 'course_videos/yangi.mp4'
+            lesson.save()
+            enqueue.assert_called_once_with(probe_lesson_video, lesson.pk, 'course_videos/yangi.mp4')
@@ -0,0 +1,241 @@
+"""
+apps/course/transcoding.py - DARS VIDEOLARINI HLS GA O'GIRISH
+
+Yuklangan MP4 bir nechta sifatda (settings.HLS_RENDITIONS) HLS segmentlarga
+bo'linadi va master playlist yoziladi:
+
+    MEDIA_ROOT/course_hls/<lesson_id>/<token>/master.m3u8
+    MEDIA_ROOT/course_hls/<lesson_id>/<token>/720p/index.m3u8
+    MEDIA_ROOT/course_hls/<lesson_id>/<token>/720p/seg_0000.ts
+
+<token> video fayl nomidan olinadi, shuning uchun yangi video yuklanganda
+eski playlist tayyor bo'lguncha o'chirilmaydi.
+
+Xatolik ('failed') bilan tugagan video faqat fayl almashtirilganda yoki
+admin'dagi "HLS'ni qayta yaratish" amali bilan qayta o'giriladi. Jarayon
+o'chib qolib 'pending'/'processing' da osilib qolgan darslar
+``manage.py requeue_stale_transcodes`` bilan qayta navbatga qo'yiladi.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+HLS_ROOT = 'course_hls'
+MASTER_PLAYLIST = 'master.m3u8'
+
+ENCODERS = {
+    'ffmpeg': 'course.transcoding.FFmpegEncoder',
+    'stub': 'course.transcoding.StubEncoder',
+}
+
+
+class TranscodeError(Exception):
+    """Videoni o'girishda xatolik"""
+
+
+# ============================================================
+# ENCODERLAR
+# ============================================================
+class FFmpegEncoder:
+    """Lokal ffmpeg binarisi orqali har bir sifatni alohida kodlash"""
+
+    def encode(self, source, rendition, output_dir):
+        segment_seconds = settings.HLS_SEGMENT_SECONDS
+        cmd = [
+            settings.FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-y',
+            '-i', source,
+            '-vf', f"scale=-2:{rendition['height']}",
+            '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main',
+            '-b:v', f"{rendition['video_bitrate']}k",
+            '-maxrate', f"{int(rendition['video_bitrate'] * 1.07)}k",
+            '-bufsize', f"{rendition['video_bitrate'] * 2}k",
+            # Segment chegaralari barcha sifatlarda bir xil bo'lishi uchun
+            '-force_key_frames', f'expr:gte(t,n_forced*{segment_seconds})',
+            '-sc_threshold', '0',
+            '-c:a', 'aac', '-ac', '2', '-b:a', f"{rendition['audio_bitrate']}k",
+            '-f', 'hls',
+            '-hls_time', str(segment_seconds),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(output_dir, 'seg_%04d.ts'),
+            os.path.join(output_dir, 'index.m3u8'),
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        except FileNotFoundError as exc:
+            raise TranscodeError(f"ffmpeg topilmadi: {settings.FFMPEG_BINARY}") from exc
+        except subprocess.CalledProcessError as exc:
+            raise TranscodeError(exc.stderr.decode(errors='replace').strip()) from exc
+
+
+class StubEncoder:
+    """Testlar uchun: ffmpeg'siz bitta bo'sh segmentli playlist yozadi"""
+
+    def encode(self, source, rendition, output_dir):
+        segment_seconds = settings.HLS_SEGMENT_SECONDS
+        with open(os.path.join(output_dir, 'seg_0000.ts'), 'wb'):
+            pass
+        with open(os.path.join(output_dir, 'index.m3u8'), 'w') as f:
+            f.write(
+                '#EXTM3U\n'
+                '#EXT-X-VERSION:3\n'
+                f'#EXT-X-TARGETDURATION:{segment_seconds}\n'
+                '#EXT-X-PLAYLIST-TYPE:VOD\n'
+                f'#EXTINF:{segment_seconds}.0,\n'
+                'seg_0000.ts\n'
+                '#EXT-X-ENDLIST\n'
+            )
+
+
+def get_encoder():
+    name = settings.HLS_ENCODER
+    return import_string(ENCODERS.get(name, name))()
+
+
+# ============================================================
+# PIPELINE
+# ============================================================
+def hls_token(video_name):
+    return hashlib.sha1(video_name.encode()).hexdigest()[:12]
+
+
+def _set_status(lesson_id, video_name, status, **fields):
+    from .models import Lesson
+
+    return Lesson.objects.filter(pk=lesson_id, video_file=video_name).update(
+        hls_status=status, hls_updated_at=timezone.now(), **fields,
+    )
+
+
+def lesson_hls_dir(lesson_id):
+    return os.path.join(settings.MEDIA_ROOT, HLS_ROOT, str(lesson_id))
+
+
+def build_master_playlist(renditions):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for r in renditions:
+        bandwidth = (r['video_bitrate'] + r['audio_bitrate']) * 1000
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={r['width']}x{r['height']}"
+        )
+        lines.append(f"{r['name']}/index.m3u8")
+    return '\n'.join(lines) + '\n'
+
+
+def transcode_lesson(lesson_id, video_name):
+    """
+    Fon vazifasi: darsning ``video_name`` faylidan HLS yaratish.
+    Shu vaqt ichida video almashtirilgan bo'lsa natija yozilmaydi.
+    """
+    from .models import Lesson
+
+    lesson = Lesson.objects.filter(pk=lesson_id, video_file=video_name).first()
+    if lesson is None:
+        return
+    _set_status(lesson_id, video_name, 'processing')
+
+    token = hls_token(video_name)
+    base_dir = lesson_hls_dir(lesson_id)
+    final_dir = os.path.join(base_dir, token)
+    os.makedirs(base_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=f'.{token}-', dir=base_dir)
+
+    renditions = settings.HLS_RENDITIONS
+    encoder = get_encoder()
+    try:
+        for rendition in renditions:
+            rendition_dir = os.path.join(work_dir, rendition['name'])
+            os.makedirs(rendition_dir)
+            encoder.encode(lesson.video_file.path, rendition, rendition_dir)
+        with open(os.path.join(work_dir, MASTER_PLAYLIST), 'w') as f:
+            f.write(build_master_playlist(renditions))
+
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(work_dir, final_dir)
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        _set_status(lesson_id, video_name, 'failed')
+        logger.exception("Dars #%s videosini HLS ga o'girib bo'lmadi", lesson_id)
+        return
+
+    playlist = '/'.join([HLS_ROOT, str(lesson_id), token, MASTER_PLAYLIST])
+    updated = _set_status(lesson_id, video_name, 'ready', hls_playlist=playlist, hls_source=video_name)
+    if updated:
+        remove_stale_renditions(lesson_id, keep=token)
+    else:
+        shutil.rmtree(final_dir, ignore_errors=True)
+
+
+def remove_stale_renditions(lesson_id, keep=None):
+    base_dir = lesson_hls_dir(lesson_id)
+    if not os.path.isdir(base_dir):
+        return
+    for name in os.listdir(base_dir):
+        if name != keep and not name.startswith('.'):
+            shutil.rmtree(os.path.join(base_dir, name), ignore_errors=True)
+    if keep is None:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def schedule_transcode(lesson, force=False):
+    """
+    Dars saqlanganda: video o'zgargan bo'lsa HLS'ni qayta yaratish.
+    force=True – video o'sha bo'lsa ham (admin amali, osilib qolgan vazifa).
+    """
+    from .models import Lesson
+
+    video_name = lesson.video_file.name if lesson.video_file else ''
+    # Shu video uchun natija (jumladan 'failed') bor yoki vazifa navbatda
+    if not force and video_name == lesson.hls_source and lesson.hls_status:
+        return
+
+    if not video_name:
+        if lesson.hls_playlist or lesson.hls_status:
+            Lesson.objects.filter(pk=lesson.pk).update(
+                hls_status='', hls_playlist='', hls_source='', hls_updated_at=None,
+            )
+            enqueue(remove_stale_renditions, lesson.pk)
+        return
+
+    # Yangi playlist tayyor bo'lguncha talabaga MP4 (yoki avvalgi playlist) beriladi
+    now = timezone.now()
+    Lesson.objects.filter(pk=lesson.pk).update(hls_status='pending', hls_source=video_name, hls_updated_at=now)
+    lesson.hls_status, lesson.hls_source, lesson.hls_updated_at = 'pending', video_name, now
+    enqueue(transcode_lesson, lesson.pk, video_name)
+
+
+def requeue_stale(max_age=None):
+    """
+    ``max_age`` sekunddan beri 'pending'/'processing' da turgan darslarni
+    qayta navbatga qo'yish (server qayta ishga tushganda yo'qolgan vazifalar).
+    Qaytaradi: navbatga qo'yilgan darslar soni.
+    """
+    from .models import Lesson
+
+    if max_age is None:
+        max_age = settings.HLS_STALE_AFTER
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    stale = (
+        Lesson.objects
+        .filter(hls_status__in=('pending', 'processing'))
+        .filter(Q(hls_updated_at__lt=cutoff) | Q(hls_updated_at__isnull=True))
+    )
+    count = 0
+    for lesson in list(stale):
+        schedule_transcode(lesson, force=True)
+        count += 1
+    return count
@@ -0,0 +1,336 @@
+"""
+apps/course/uploads.py - DARS VIDEOLARINI QISMLAB (RESUMABLE) YUKLASH
+
+tus (https://tus.io) protokoliga o'xshash mahalliy amalga oshirish:
+
+    OPTIONS /course/uploads/            → Tus-Version, Tus-Max-Size, ...
+    POST    /course/uploads/            Upload-Length, Upload-Metadata → 201 + Location
+    HEAD    /course/uploads/<id>/       → Upload-Offset, Upload-Length
+    PATCH   /course/uploads/<id>/       Upload-Offset, [Upload-Checksum] + bo'lak → 204
+    DELETE  /course/uploads/<id>/       → 204 (bekor qilish)
+
+Har bir bo'lak so'rov tanasidan CHUNK_SIZE bo'yicha o'qilib to'g'ridan-to'g'ri
+diskka yoziladi – xotirada faqat bitta bufer turadi. Har bir PATCH alohida
+qisqa so'rov: worker butun uzatish davomida band bo'lmaydi, aloqa uzilsa
+mijoz HEAD bilan joriy offsetni olib davom ettiradi.
+
+Oxirgi bayt yozilgach fayl storage'ga ko'chiriladi (bir xil diskda – rename)
+va Lesson.video_file tranzaksiyada almashtiriladi; post_save signali
+metadata va HLS transkodlashni fonda ishga tushiradi.
+
+Butun fayl sha256 yig'indisi (metadata'da berilgan bo'lsa) bo'laklar
+yozilishi bilan birga hisoblanadi – oxirgi PATCH faylni qayta o'qimaydi.
+Yig'ilgan holat jarayon xotirasida; PATCH boshqa worker'ga tushsa, u
+faqat o'zi ko'rmagan qismni diskdan o'qib yetkazib oladi.
+"""
+
+import base64
+import binascii
+import fcntl
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import Lesson
+from .validators import SNIFF_BYTES, validate_video_head, validate_video_name
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,checksum,termination'
+CHECKSUM_ALGORITHMS = ('sha1', 'sha256', 'md5')
+CHUNK_SIZE = 1024 * 1024  # 1 MB – so'rov tanasidan bir martada o'qiladigan hajm
+ID_LENGTH = 32
+
+
+class UploadNotFound(Exception):
+    """Yuklash sessiyasi topilmadi (muddati o'tgan yoki bekor qilingan)"""
+
+
+class UploadConflict(Exception):
+    """Upload-Offset serverdagi holatga mos emas (409)"""
+
+
+class UploadLocked(Exception):
+    """Shu yuklashga boshqa so'rov hozir yozmoqda (423)"""
+
+
+class ChecksumMismatch(Exception):
+    """Bo'lak yoki butun fayl nazorat yig'indisi mos kelmadi (460)"""
+
+
+# upload id → (offset, sha256 obyekti): shu offsetgacha hisoblangan butun fayl yig'indisi
+_running_sha256 = {}
+_running_sha256_lock = threading.Lock()
+
+
+def _upload_dir():
+    path = Path(settings.LESSON_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def parse_metadata(header):
+    """``Upload-Metadata: key base64,key2 base64`` → dict"""
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in (header or '').split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode() if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValidationError("Upload-Metadata noto'g'ri formatda")
+    return metadata
+
+
+def parse_checksum(header):
+    """``Upload-Checksum: sha1 <base64>`` → (algoritm, bayt) yoki None"""
+    if not header:
+        return None
+    algorithm, _, value = header.partition(' ')
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValidationError("Checksum algoritmi qo'llab-quvvatlanmaydi")
+    try:
+        return algorithm, base64.b64decode(value, validate=True)
+    except binascii.Error:
+        raise ValidationError("Upload-Checksum noto'g'ri formatda")
+
+
+# ============================================================
+# SESSIYA (diskda: <id>.json – holat, <id>.part – ma'lumot)
+# ============================================================
+class UploadSession:
+    def __init__(self, upload_id, **state):
+        self.id = upload_id
+        self.lesson_id = state['lesson_id']
+        self.user_id = state['user_id']
+        self.filename = state['filename']
+        self.length = state['length']
+        self.offset = state.get('offset', 0)
+        # Mijoz butun fayl uchun sha256 bergan bo'lsa, oxirida tekshiriladi
+        self.sha256 = state.get('sha256', '')
+        self.created = state.get('created', time.time())
+
+    @property
+    def state_path(self):
+        return _upload_dir() / f'{self.id}.json'
+
+    @property
+    def data_path(self):
+        return _upload_dir() / f'{self.id}.part'
+
+    @property
+    def is_complete(self):
+        return self.offset == self.length
+
+    @classmethod
+    def create(cls, user_id, length, metadata):
+        try:
+            lesson_id = int(metadata.get('lesson', ''))
+        except ValueError:
+            raise ValidationError("Upload-Metadata da 'lesson' ko'rsatilmagan")
+        filename = os.path.basename(metadata.get('filename', ''))
+        validate_video_name(filename, length)
+        if not Lesson.objects.filter(pk=lesson_id).exists():
+            raise ValidationError("Dars topilmadi")
+
+        session = cls(
+            secrets.token_hex(ID_LENGTH // 2),
+            lesson_id=lesson_id, user_id=user_id, filename=filename,
+            length=length, sha256=metadata.get('sha256', '').lower(),
+        )
+        session.data_path.touch()
+        session.save()
+        return session
+
+    @classmethod
+    def load(cls, upload_id):
+        if len(upload_id) != ID_LENGTH or not upload_id.isalnum():
+            raise UploadNotFound(upload_id)
+        try:
+            state = json.loads((_upload_dir() / f'{upload_id}.json').read_text())
+        except (FileNotFoundError, ValueError):
+            raise UploadNotFound(upload_id)
+        return cls(upload_id, **state)
+
+    def save(self):
+        """Holatni atomik yozish (yarim yozilgan JSON qolmaydi)"""
+        state = {
+            'lesson_id': self.lesson_id, 'user_id': self.user_id, 'filename': self.filename,
+            'length': self.length, 'offset': self.offset, 'sha256': self.sha256,
+            'created': self.created,
+        }
+        tmp = self.state_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.state_path)
+
+    def delete(self):
+        self._take_sha256()
+        for path in (self.state_path, self.data_path):
+            path.unlink(missing_ok=True)
+
+    # ---------------- butun fayl sha256 ----------------
+    def _take_sha256(self):
+        with _running_sha256_lock:
+            return _running_sha256.pop(self.id, None)
+
+    def _keep_sha256(self, offset, digest):
+        with _running_sha256_lock:
+            _running_sha256[self.id] = (offset, digest)
+
+    def _sha256_until(self, f, offset):
+        """Faylning [0, offset) qismi uchun sha256 (xotirada bo'lsa – qayta o'qilmaydi)"""
+        running = self._take_sha256()
+        if running is not None and running[0] <= offset:
+            # [0, running offset) tasdiqlangan va o'zgarmaydi – qolganini o'qib yetkazamiz
+            start, digest = running
+        else:
+            start, digest = 0, hashlib.sha256()
+        f.seek(start)
+        remaining = offset - start
+        while remaining:
+            block = f.read(min(CHUNK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+        return digest
+
+    @contextmanager
+    def _locked_data(self):
+        with open(self.data_path, 'r+b') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadLocked(self.id)
+            yield f
+
+    # ---------------- yozish ----------------
+    def append(self, stream, offset, content_length, checksum=None):
+        """
+        So'rov tanasini (``stream``) faylga qo'shish. Yangi offsetni qaytaradi.
+
+        ``checksum`` berilgan bo'lsa bo'lak to'liq kelib, yig'indisi mos
+        kelgandagina qabul qilinadi; aks holda fayl oldingi holatiga qaytadi.
+        Checksum'siz bo'lakning uzilishgacha kelgan qismi saqlanadi.
+        """
+        if content_length is None:
+            raise ValidationError("Content-Length ko'rsatilmagan")
+        if offset + content_length > self.length:
+            raise ValidationError("Bo'lak e'lon qilingan fayl hajmidan oshib ketdi")
+        if offset == 0 and content_length < min(SNIFF_BYTES, self.length):
+            raise ValidationError(f"Birinchi bo'lak kamida {SNIFF_BYTES} bayt bo'lishi kerak")
+
+        with self._locked_data() as f:
+            # Qulf olingandan keyin holatni qayta o'qiymiz – parallel PATCH bo'lgan bo'lishi mumkin
+            self.offset = UploadSession.load(self.id).offset
+            if offset != self.offset:
+                raise UploadConflict(self.id)
+
+            file_digest = self._sha256_until(f, offset) if self.sha256 else None
+            file_digest_before = file_digest.copy() if file_digest else None
+            # Avvalgi uzilgan yozuvdan qolgan tasdiqlanmagan baytlar tashlanadi
+            f.truncate(offset)
+            f.seek(offset)
+            digest = hashlib.new(checksum[0]) if checksum else None
+            # Format fayl boshidagi SNIFF_BYTES to'liq yozilgach tekshiriladi
+            # (stream.read() kamroq qaytarishi mumkin; bosh qism bir necha PATCH'da kelishi ham mumkin)
+            head_size = min(SNIFF_BYTES, self.length)
+            head_checked = offset >= head_size
+            remaining = content_length
+            try:
+                while remaining:
+                    data = stream.read(min(CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    f.write(data)
+                    remaining -= len(data)
+                    if digest:
+                        digest.update(data)
+                    if file_digest:
+                        file_digest.update(data)
+                    if not head_checked and f.tell() >= head_size:
+                        f.seek(0)
+                        validate_video_head(self.filename, f.read(head_size))
+                        f.seek(0, os.SEEK_END)
+                        head_checked = True
+
+                if checksum and (remaining or digest.digest() != checksum[1]):
+                    raise ChecksumMismatch(self.id)
+            except (ValidationError, ChecksumMismatch):
+                f.truncate(offset)
+                if file_digest_before:
+                    self._keep_sha256(offset, file_digest_before)
+                raise
+
+            f.flush()
+            os.fsync(f.fileno())
+            self.offset = offset + content_length - remaining
+            self.save()
+            if file_digest:
+                self._keep_sha256(self.offset, file_digest)
+        return self.offset
+
+    # ---------------- yakunlash ----------------
+    def _verify_sha256(self):
+        with open(self.data_path, 'rb') as f:
+            digest = self._sha256_until(f, self.length)
+        if digest.hexdigest() != self.sha256:
+            raise ChecksumMismatch(self.id)
+
+    def attach(self):
+        """Tayyor faylni storage'ga ko'chirib, darsga biriktirish (atomik)"""
+        if not self.is_complete:
+            raise UploadConflict(self.id)
+        if self.sha256:
+            try:
+                self._verify_sha256()
+            except ChecksumMismatch:
+                self.delete()
+                raise
+
+        with transaction.atomic():
+            lesson = Lesson.objects.select_for_update().get(pk=self.lesson_id)
+            field = Lesson._meta.get_field('video_file')
+            with open(self.data_path, 'rb') as f:
+                name = default_storage.save(field.generate_filename(lesson, self.filename), _PartFile(f))
+            try:
+                lesson.video_file.name = name
+                lesson.save(update_fields=['video_file', 'updated_at'])
+            except Exception:
+                default_storage.delete(name)
+                raise
+        self.delete()
+        return lesson
+
+
+class _PartFile(File):
+    """FileSystemStorage uni nusxalamaydi, balki ko'chiradi (file_move_safe)"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def cleanup_expired(max_age=None):
+    """Muddati o'tgan (tugallanmagan) yuklashlarni o'chirish. O'chirilganlar sonini qaytaradi"""
+    max_age = settings.LESSON_UPLOAD_EXPIRY if max_age is None else max_age
+    deadline = time.time() - max_age
+    removed = 0
+    for state_path in _upload_dir().glob('*.json'):
+        try:
+            session = UploadSession.load(state_path.stem)
+        except UploadNotFound:
+            continue
+        last_write = max(session.created, session.data_path.stat().st_mtime if session.data_path.exists() else 0)
+        if last_write < deadline:
+            session.delete()
+            removed += 1
+    return removed
@@ -3,7 +3,11 @@ from .views import (
     course,
     course_detail,
     lesson_view,
+    lesson_progress,
     enroll_course,
+    course_syllabus,
+    lesson_upload_create,
+    lesson_upload,
 )
 
 
@@ -11,5 +15,9 @@ urlpatterns = [
     path('', course, name='course'),
     path('<int:course_id>/', course_detail, name='course_detail'),
     path('<int:course_id>/lesson/<int:lesson_id>/', lesson_view, name='lesson_view'),
+    path('progress/', lesson_progress, name='lesson_progress'),
     path('<int:course_id>/enroll/', enroll_course, name='enroll'),
+    path('<int:course_id>/syllabus/', course_syllabus, name='course_syllabus'),
+    path('uploads/', lesson_upload_create, name='lesson_upload_create'),
+    path('uploads/<str:upload_id>/', lesson_upload, name='lesson_upload'),
 ]
\ No newline at end of file
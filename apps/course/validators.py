@@ -0,0 +1,73 @@
+"""
+apps/course/validators.py - VIDEO FAYL HAJMI VA FORMATINI TEKSHIRISH
+
+Oddiy forma (LessonForm, admin) va qismlab yuklash (course/uploads.py)
+bir xil qoidadan foydalanadi. Format kengaytma bilan birga fayl
+boshidagi "sehrli" baytlar orqali aniqlanadi – fayl to'liq o'qilmaydi.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+
+# Fayl boshidan shuncha bayt formatni aniqlash uchun yetarli
+SNIFF_BYTES = 12
+
+EBML = b'\x1a\x45\xdf\xa3'  # WebM / Matroska
+
+VIDEO_EXTENSIONS = {
+    '.mp4': 'ftyp',
+    '.m4v': 'ftyp',
+    '.mov': 'ftyp',
+    '.webm': 'ebml',
+    '.mkv': 'ebml',
+    '.ogv': 'ogg',
+}
+
+
+def sniff_video_format(head):
+    """Fayl boshidagi baytlar bo'yicha konteyner: 'ftyp' | 'ebml' | 'ogg' | None"""
+    if len(head) >= 8 and head[4:8] == b'ftyp':
+        return 'ftyp'
+    if head.startswith(EBML):
+        return 'ebml'
+    if head.startswith(b'OggS'):
+        return 'ogg'
+    return None
+
+
+def validate_video_name(filename, size):
+    """Kengaytma va hajm (fayl hali yuklanmasdan oldin ham tekshiriladi)"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in VIDEO_EXTENSIONS:
+        raise ValidationError(
+            "Video formati qo'llab-quvvatlanmaydi. Ruxsat etilgan: %(allowed)s",
+            params={'allowed': ', '.join(sorted(VIDEO_EXTENSIONS))},
+        )
+    if size > settings.LESSON_VIDEO_MAX_SIZE:
+        raise ValidationError(
+            "Video hajmi %(max)s dan oshmasligi kerak",
+            params={'max': filesizeformat(settings.LESSON_VIDEO_MAX_SIZE)},
+        )
+    return VIDEO_EXTENSIONS[extension]
+
+
+def validate_video_head(filename, head):
+    """Fayl mazmuni kengaytmaga mos kelishini tekshirish"""
+    expected = VIDEO_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    if sniff_video_format(head) != expected:
+        raise ValidationError("Fayl mazmuni video formatiga mos kelmadi")
+
+
+def validate_video_file(value):
+    """Lesson.video_file validatori – faqat yangi yuklangan fayllar uchun"""
+    if not value or getattr(value, '_committed', True):
+        return
+    validate_video_name(value.name, value.size)
+    upload = value.file
+    upload.seek(0)
+    head = upload.read(SNIFF_BYTES)
+    upload.seek(0)
+    validate_video_head(value.name, head)
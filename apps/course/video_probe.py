@@ -0,0 +1,134 @@
+"""
+apps/course/video_probe.py - VIDEO METADATA VA POSTER KADRNI AVTOMATIK OLISH
+
+Video yuklangandan so'ng fonda (core.tasks) ishlaydi: konteynerdan
+davomiylik o'qiladi, poster kadr olinadi, so'ng dars va kurs statistikasi
+bitta tranzaksiyada yangilanadi. Admin saqlash so'rovi kutib qolmaydi.
+"""
+
+import json
+import logging
+import os
+import subprocess
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from core.tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+PROBERS = {
+    'ffprobe': 'course.video_probe.FFprobeProber',
+    'stub': 'course.video_probe.StubProber',
+}
+
+
+class ProbeError(Exception):
+    """Video metadata'sini o'qib bo'lmadi"""
+
+
+@dataclass
+class ProbeResult:
+    duration_seconds: int
+    poster: bytes = b''  # JPEG
+
+
+# ============================================================
+# PROBERLAR
+# ============================================================
+class FFprobeProber:
+    """ffprobe (davomiylik) va ffmpeg (poster kadr) orqali"""
+
+    def probe(self, path):
+        cmd = [
+            settings.FFPROBE_BINARY, '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'json', path,
+        ]
+        try:
+            out = subprocess.run(cmd, check=True, capture_output=True).stdout
+            duration = float(json.loads(out)['format']['duration'])
+        except FileNotFoundError as exc:
+            raise ProbeError(f"ffprobe topilmadi: {settings.FFPROBE_BINARY}") from exc
+        except (subprocess.CalledProcessError, KeyError, ValueError) as exc:
+            raise ProbeError(f"Video metadata'si o'qilmadi: {path}") from exc
+
+        return ProbeResult(duration_seconds=round(duration), poster=self.poster(path, duration))
+
+    def poster(self, path, duration):
+        # Birinchi kadrlar ko'pincha qora bo'ladi – 10% joydan olamiz
+        at = min(duration * 0.1, 30)
+        cmd = [
+            settings.FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+            '-ss', f'{at:.2f}', '-i', path,
+            '-frames:v', '1', '-vf', 'scale=1280:-2',
+            '-f', 'image2', '-c:v', 'mjpeg', '-q:v', '3', 'pipe:1',
+        ]
+        try:
+            return subprocess.run(cmd, check=True, capture_output=True).stdout
+        except (FileNotFoundError, subprocess.CalledProcessError):
+            logger.warning("Poster kadr olinmadi: %s", path)
+            return b''
+
+
+class StubProber:
+    """Testlar uchun: fayl hajmidan soxta davomiylik, postersiz"""
+
+    def probe(self, path):
+        return ProbeResult(duration_seconds=max(os.path.getsize(path) // 1000, 1))
+
+
+def get_prober():
+    name = settings.VIDEO_PROBER
+    return import_string(PROBERS.get(name, name))()
+
+
+# ============================================================
+# VAZIFA
+# ============================================================
+def probe_lesson_video(lesson_id, video_name):
+    """Fon vazifasi: davomiylik va thumbnail'ni yangilash"""
+    from .models import Lesson
+    from .outline import invalidate_course_outline
+    from core.images import schedule_derivatives
+
+    lesson = Lesson.objects.filter(pk=lesson_id, video_file=video_name).first()
+    if lesson is None:
+        return
+
+    try:
+        result = get_prober().probe(lesson.video_file.path)
+    except ProbeError:
+        logger.exception("Dars #%s videosi o'qilmadi", lesson_id)
+        return
+
+    with transaction.atomic():
+        lesson = (
+            Lesson.objects.select_for_update()
+            .select_related('course')
+            .filter(pk=lesson_id, video_file=video_name)
+            .first()
+        )
+        if lesson is None:
+            return
+
+        fields = {'duration_seconds': result.duration_seconds}
+        # Admin o'zi yuklagan thumbnail ustidan yozilmaydi
+        if result.poster and not lesson.thumbnail:
+            lesson.thumbnail.save(f'lesson_{lesson_id}_poster.jpg', ContentFile(result.poster), save=False)
+            fields['thumbnail'] = lesson.thumbnail.name
+
+        # .update() – post_save signallari (transkod, probe) qayta ishga tushmaydi
+        Lesson.objects.filter(pk=lesson_id).update(**fields)
+        lesson.course.update_stats()
+        invalidate_course_outline(lesson.course_id)
+        if 'thumbnail' in fields:
+            schedule_derivatives(fields['thumbnail'], 'course.Lesson')
+
+
+def schedule_probe(lesson):
+    enqueue(probe_lesson_video, lesson.pk, lesson.video_file.name)
@@ -1,41 +1,98 @@
-from django.shortcuts import render, get_object_or_404, redirect
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import aget_object_or_404, render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST
+from core.async_views import alist, arender, auser
+from core.pagecache import cache_anonymous_page
+from core.pagination import KeysetPaginator
 from .models import Category, Course, Lesson, Enrollment
+from .outline import get_course_outline
+from .progress import aget_resume_position, coalesce_events, parse_events
+from .progress_buffer import submit_progress
+from .syllabus import apply_syllabus, export_syllabus, parse_syllabus
+from .uploads import (
+    CHECKSUM_ALGORITHMS, TUS_EXTENSIONS, TUS_VERSION,
+    ChecksumMismatch, UploadConflict, UploadLocked, UploadNotFound, UploadSession,
+    parse_checksum, parse_metadata,
+)
+
+COURSE_ORDERING = ('-created_at', 'id')
+COURSE_SORTS = {
+    'new': COURSE_ORDERING,
+    'popular': ('-students_count', '-created_at', 'id'),
+}
+
 
+@cache_anonymous_page('catalog')
+async def course(request):
+    courses = Course.objects.published().cards()
 
-def course(request):
-    courses = Course.objects.filter(status='published').select_related('category')
-    categories = Category.objects.all()
+    # ?sort=popular – oldindan hisoblangan students_count bo'yicha (agregatsiyasiz)
+    sort = request.GET.get('sort') if request.GET.get('sort') in COURSE_SORTS else 'new'
+    paginator = KeysetPaginator(courses, ordering=COURSE_SORTS[sort], per_page=12, count_timeout=60)
+    page_obj, categories, _ = await asyncio.gather(
+        paginator.aget_page(request.GET.get('cursor')),
+        alist(Category.objects.all()),
+        auser(request),
+    )
 
     context = {
-        'courses': courses,
+        'courses': page_obj.object_list,
+        'page_obj': page_obj,
+        'total_count': page_obj.count,
         'categories': categories,
+        'sort': sort,
     }
-    return render(request, 'course/course.html', context)
+    return await arender(request, 'course/course.html', context)
+
+
+def _is_enrolled(user, course_field):
+    return Exists(Enrollment.objects.filter(student=user, course_id=OuterRef(course_field)))
 
 
 @login_required(login_url='login')
-def course_detail(request, course_id):
-    course = get_object_or_404(Course, id=course_id, status='published')
-    lessons = course.lessons.order_by('order')
-    is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
+async def course_detail(request, course_id):
+    user = await auser(request)
+    # Yozilganlik – alohida EXISTS so'rovi emas, kurs qatorining o'zida
+    course = await aget_object_or_404(
+        Course.objects.select_related('category').annotate(is_enrolled=_is_enrolled(user, 'pk')),
+        id=course_id, status='published',
+    )
+    lessons = await sync_to_async(get_course_outline)(course)
 
     context = {
         'course': course,
         'all_lessons': lessons,
-        'is_enrolled': is_enrolled,
+        'is_enrolled': course.is_enrolled,
     }
-    return render(request, 'course/course_detail.html', context)
+    return await arender(request, 'course/course_detail.html', context)
 
 @login_required(login_url='login')
-def lesson_view(request, course_id, lesson_id):
-    course = get_object_or_404(Course, id=course_id, status='published')
-    lesson = get_object_or_404(Lesson, id=lesson_id, course=course)
-    is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
+async def lesson_view(request, course_id, lesson_id):
+    user = await auser(request)
+    # Dars, kurs va yozilganlik bitta so'rovda; progress bilan birgalikda
+    lessons = (
+        Lesson.objects.select_related('course')
+        .annotate(is_enrolled=_is_enrolled(user, 'course_id'))
+    )
+    lesson, resume_position = await asyncio.gather(
+        aget_object_or_404(lessons, id=lesson_id, course_id=course_id, course__status='published'),
+        aget_resume_position(user.id, lesson_id),
+    )
+    course, is_enrolled = lesson.course, lesson.is_enrolled
 
-    # Boshqa darslar (sidebar)
-    other_lessons = course.lessons.order_by('order')
+    # Boshqa darslar (sidebar) – keshlangan ixcham ro'yxat
+    other_lessons = await sync_to_async(get_course_outline)(course)
 
     context = {
         'course': course,
@@ -43,8 +100,31 @@ def lesson_view(request, course_id, lesson_id):
         'is_enrolled': is_enrolled,
         'other_lessons': other_lessons,
         'is_free_lesson': lesson.is_free,
+        'resume_position': resume_position or 0,
     }
-    return render(request, 'course/lesson_view.html', context)
+    return await arender(request, 'course/lesson_view.html', context)
+
+
+@require_POST
+@login_required(login_url='login')
+def lesson_progress(request):
+    """
+    Video progressi (paket). Body: {"events": [{"lesson": id, "position": sek, "ended": bool}]}
+    Javob: {"saved": n, "progress": {course_id: foiz}}, write-behind yoqilgan
+    bo'lsa 202 {"queued": n} (yozish fon oqimida, course/progress_buffer.py).
+    """
+    try:
+        events = parse_events(json.loads(request.body or b'{}'))
+    except ValueError:
+        return JsonResponse({'error': "JSON noto'g'ri formatda"}, status=400)
+    except ValidationError as exc:
+        return JsonResponse({'error': exc.messages}, status=400)
+
+    merged = coalesce_events(events)
+    saved, progress = submit_progress(request.user.id, merged)
+    if saved is None:
+        return JsonResponse({'queued': len(merged)}, status=202)
+    return JsonResponse({'saved': saved, 'progress': progress})
 
 
 # ============================================================
@@ -69,3 +149,146 @@ def enroll_course(request, course_id):
 
     return redirect('course_detail', course_id=course.id)
 
+
+# ============================================================
+# KURS DASTURINI OMMAVIY IMPORT/EXPORT (admin uchun)
+# ============================================================
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def course_syllabus(request, course_id):
+    """
+    GET  – kurs dasturini JSON ko'rinishida qaytarish
+    POST – JSON yoki CSV (body yoki ``file``) dan butun dasturni qo'llash.
+           ``?keep_missing=1`` bo'lsa ro'yxatda yo'q darslar o'chirilmaydi.
+    """
+    course = get_object_or_404(Course, id=course_id)
+
+    if request.method == 'GET':
+        return JsonResponse({'course': course.id, 'lessons': export_syllabus(course)})
+
+    upload = request.FILES.get('file')
+    if upload:
+        data, content_type = upload.read(), upload.content_type or ''
+        if upload.name.lower().endswith('.csv'):
+            content_type = 'text/csv'
+    else:
+        data, content_type = request.body, request.content_type
+
+    try:
+        items = parse_syllabus(data, content_type)
+        result = apply_syllabus(course, items, delete_missing=not request.GET.get('keep_missing'))
+    except ValidationError as exc:
+        return JsonResponse({'errors': exc.messages}, status=400)
+
+    return JsonResponse(result)
+
+
+# ============================================================
+# DARS VIDEOSINI QISMLAB YUKLASH (admin uchun, course/uploads.py)
+# ============================================================
+def _tus_response(status=204, headers=None, reason=None):
+    response = HttpResponse(status=status, reason=reason)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def _tus_error(message, status, reason=None):
+    response = JsonResponse({'error': message}, status=status, reason=reason)
+    response['Tus-Resumable'] = TUS_VERSION
+    return response
+
+
+def _int_header(request, name):
+    try:
+        return int(request.headers.get(name, ''))
+    except ValueError:
+        return None
+
+
+@staff_member_required
+@require_http_methods(['OPTIONS', 'POST'])
+def lesson_upload_create(request):
+    """
+    OPTIONS – server imkoniyatlari
+    POST    – yangi yuklash. Upload-Length: bayt, Upload-Metadata: lesson, filename, [sha256]
+    """
+    if request.method == 'OPTIONS':
+        return _tus_response(headers={
+            'Tus-Version': TUS_VERSION,
+            'Tus-Extension': TUS_EXTENSIONS,
+            'Tus-Max-Size': str(settings.LESSON_VIDEO_MAX_SIZE),
+            'Tus-Checksum-Algorithm': ','.join(CHECKSUM_ALGORITHMS),
+        })
+
+    length = _int_header(request, 'Upload-Length')
+    if length is None or length <= 0:
+        return _tus_error("Upload-Length ko'rsatilmagan", 400)
+    if length > settings.LESSON_VIDEO_MAX_SIZE:
+        return _tus_error("Fayl hajmi ruxsat etilganidan katta", 413)
+
+    try:
+        metadata = parse_metadata(request.headers.get('Upload-Metadata'))
+        session = UploadSession.create(request.user.id, length, metadata)
+    except ValidationError as exc:
+        return _tus_error(exc.messages, 400)
+
+    return _tus_response(201, {
+        'Location': reverse('lesson_upload', args=[session.id]),
+        'Upload-Offset': '0',
+    })
+
+
+@staff_member_required
+@require_http_methods(['HEAD', 'PATCH', 'DELETE'])
+def lesson_upload(request, upload_id):
+    """
+    HEAD   – joriy holat (davom ettirish uchun Upload-Offset)
+    PATCH  – navbatdagi bo'lak (Content-Type: application/offset+octet-stream)
+    DELETE – yuklashni bekor qilish
+    """
+    try:
+        session = UploadSession.load(upload_id)
+    except UploadNotFound:
+        return _tus_error("Yuklash topilmadi yoki muddati o'tgan", 404)
+    if session.user_id != request.user.id:
+        return _tus_error("Yuklash topilmadi yoki muddati o'tgan", 404)
+
+    if request.method == 'HEAD':
+        return _tus_response(200, {
+            'Upload-Offset': str(session.offset),
+            'Upload-Length': str(session.length),
+        })
+
+    if request.method == 'DELETE':
+        session.delete()
+        return _tus_response()
+
+    if request.content_type != 'application/offset+octet-stream':
+        return _tus_error("Content-Type application/offset+octet-stream bo'lishi kerak", 415)
+    offset = _int_header(request, 'Upload-Offset')
+    if offset is None:
+        return _tus_error("Upload-Offset ko'rsatilmagan", 400)
+
+    # request.body ishlatilmaydi – tana oqim sifatida bo'laklab o'qiladi
+    content_length = request.META.get('CONTENT_LENGTH', '')
+    content_length = int(content_length) if content_length.isdigit() else None
+    try:
+        offset = session.append(request, offset, content_length, parse_checksum(request.headers.get('Upload-Checksum')))
+        if session.is_complete:
+            session.attach()
+    except ValidationError as exc:
+        return _tus_error(exc.messages, 400)
+    except UploadConflict:
+        return _tus_error("Upload-Offset mos emas (HEAD bilan joriy holatni oling)", 409)
+    except UploadLocked:
+        return _tus_error("Bu yuklashga hozir boshqa so'rov yozmoqda", 423)
+    except ChecksumMismatch:
+        return _tus_error("Nazorat yig'indisi mos kelmadi", 460, reason='Checksum Mismatch')
+    except Lesson.DoesNotExist:
+        session.delete()
+        return _tus_error("Dars o'chirilgan", 410)
+
+    return _tus_response(headers={'Upload-Offset': str(offset)})
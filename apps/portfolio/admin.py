@@ -1,8 +1,9 @@
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from django.urls import reverse
 from django.db.models import Count
-from .models import Portfolio, Category
+from core.images import best_url
+from .models import Portfolio, Category, Technology
 
 
 @admin.register(Category)
@@ -12,15 +13,19 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     search_fields = ('title', )
 
+    def get_queryset(self, request):
+        """Har bir qator uchun alohida COUNT o'rniga bitta annotatsiya"""
+        return super().get_queryset(request).annotate(_portfolio_count=Count('portfolios'))
+
     def portfolio_count(self, obj):
         """Kategoriyada nechta portfolio bor"""
-        count = obj.portfolios.count()
         return format_html(
             '<span style="background:#4F46E5;color:white;padding:4px 8px;border-radius:4px;">{} ta</span>',
-            count
+            obj._portfolio_count
         )
 
     portfolio_count.short_description = 'Loyihalar'
+    portfolio_count.admin_order_field = '_portfolio_count'
 
     def icon_preview(self, obj):
         """Icon preview"""
@@ -31,6 +36,15 @@ class CategoryAdmin(admin.ModelAdmin):
     icon_preview.short_description = 'Icon'
 
 
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    """Texnologiya teglari (portfolio saqlanganda avtomatik yaratiladi)"""
+    list_display = ('name', 'slug', 'portfolios_count', 'created_at')
+    search_fields = ('name', 'slug')
+    readonly_fields = ('portfolios_count', 'created_at')
+    ordering = ('-portfolios_count', 'name')
+
+
 @admin.register(Portfolio)
 class PortfolioAdmin(admin.ModelAdmin):
     """Portfolio admin"""
@@ -42,7 +56,7 @@ class PortfolioAdmin(admin.ModelAdmin):
         'image_thumb',
         'created_at'
     )
-    list_filter = ('category', 'is_featured', 'is_active', 'created_at', 'year')
+    list_filter = ('category', 'is_featured', 'is_active', 'created_at', 'year', 'tech_stack')
     search_fields = ('title', 'description', 'technologies')
     readonly_fields = ('created_at', 'updated_at', 'image_preview', 'technologies_preview')
     date_hierarchy = 'created_at'
@@ -95,31 +109,31 @@ class PortfolioAdmin(admin.ModelAdmin):
 
     category_badge.short_description = 'Kategoriya'
 
-    # Texnologiyalarni preview qilish
+    # Texnologiyalarni preview qilish (tech_stack get_queryset'da prefetch qilingan)
     def tech_preview(self, obj):
-        techs = obj.get_technologies_list()
+        techs = [tech.name for tech in obj.tech_stack.all()]
+        if not techs:
+            return '—'
         if len(techs) > 3:
-            display = ', '.join(techs[:3]) + f' <i>+{len(techs) - 3}</i>'
-        else:
-            display = ', '.join(techs) if techs else '—'
-        return format_html(display)
+            return format_html('{} <i>+{}</i>', ', '.join(techs[:3]), len(techs) - 3)
+        return ', '.join(techs)
 
     tech_preview.short_description = 'Texnologiyalar'
 
     def technologies_preview(self, obj):
         """Forma ichida texnologiyalar preview"""
-        techs = obj.get_technologies_list()
+        techs = obj.tech_stack.all() if obj.pk else []
         if not techs:
             return "Texnologiya kiritilmagan"
 
-        html = '<div style="display: flex; flex-wrap: wrap; gap: 8px;">'
-        for tech in techs:
-            html += format_html(
-                '<span style="background:#4F46E5;color:white;padding:4px 8px;border-radius:4px;font-size:12px;">{}</span>',
-                tech
-            )
-        html += '</div>'
-        return format_html(html)
+        return format_html(
+            '<div style="display: flex; flex-wrap: wrap; gap: 8px;">{}</div>',
+            format_html_join(
+                '',
+                '<span style="background:#4F46E5;color:white;padding:4px 8px;border-radius:4px;font-size:12px;">{} ({})</span>',
+                ((tech.name, tech.portfolios_count) for tech in techs),
+            ),
+        )
 
     technologies_preview.short_description = 'Texnologiyalar Preview'
 
@@ -138,7 +152,7 @@ class PortfolioAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="width:50px;height:50px;object-fit:cover;border-radius:6px;box-shadow:0 2px 4px rgba(0,0,0,0.1);" />',
-                obj.image.url
+                best_url(obj.image.name, 160)
             )
         return "❌ Rasm yo'q"
 
@@ -159,4 +173,4 @@ class PortfolioAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         """Optimized queryset"""
-        return super().get_queryset(request).select_related('category')
+        return super().get_queryset(request).select_related('category').prefetch_related('tech_stack')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio.models import Portfolio, Technology, sync_technologies, update_technology_counts
+
+
+class Command(BaseCommand):
+    help = "Portfolio.technologies matnidan Technology teglarini yaratish va bog'lash (bir martalik ko'chirish)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help="Hech qaysi portfolioda ishlatilmagan teglarni o'chirish")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            portfolios = Portfolio.objects.all()
+            for portfolio in portfolios.iterator(chunk_size=200):
+                sync_technologies(portfolio)
+            update_technology_counts()
+
+            pruned = 0
+            if options['prune']:
+                pruned, _ = Technology.objects.filter(portfolios__isnull=True).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{Technology.objects.count()} ta texnologiya sinxronlandi"
+            + (f", {pruned} ta ishlatilmagani o'chirildi" if pruned else '')
+        ))
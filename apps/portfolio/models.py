@@ -1,4 +1,9 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Substr
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils.text import slugify
 
 
 class Category(models.Model):
@@ -16,6 +21,53 @@ class Category(models.Model):
         return self.title
 
 
+class Technology(models.Model):
+    """Texnologiya tegi (Django, React, ...) – portfolio filtri va faceti uchun"""
+    name = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=60, unique=True)
+    # Denormalizatsiya: nechta aktiv portfolioda ishlatilgan (signal orqali yangilanadi)
+    portfolios_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Texnologiya"
+        verbose_name_plural = "Texnologiyalar"
+        indexes = [models.Index(fields=['-portfolios_count', 'name'], name='technology_facet_idx')]
+
+    def __str__(self):
+        return self.name
+
+
+def technology_slug(name):
+    """'C++' → 'c-plus-plus', 'C#' → 'c-sharp' (slugify belgilarni tashlab yuboradi)"""
+    return slugify(name.replace('+', '-plus').replace('#', '-sharp'))
+
+
+# Ro'yxat kartalarida description o'rniga shuncha belgi olinadi
+EXCERPT_LENGTH = 300
+
+
+class PortfolioQuerySet(models.QuerySet):
+    # Portfolio kartasi uchun ustunlar (keyset tartiblash maydonlari bilan)
+    CARD_FIELDS = (
+        'id', 'title', 'image', 'project_url', 'github_url', 'demo_url',
+        'year', 'is_featured', 'is_active', 'created_at',
+        'category__id', 'category__title',
+    )
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def cards(self):
+        """Karta proyeksiyasi: description o'rniga qisqa ``excerpt``"""
+        return (
+            self.select_related('category')
+            .only(*self.CARD_FIELDS)
+            .annotate(excerpt=Substr('description', 1, EXCERPT_LENGTH))
+        )
+
+
 class Portfolio(models.Model):
     """Portfolio loyihalar"""
     title = models.CharField(max_length=200, unique=True)
@@ -37,6 +89,9 @@ class Portfolio(models.Model):
         help_text="Texnologiyalarni vergul bilan ajratib yozing: Django, React, PostgreSQL"
     )
 
+    # technologies matnidan avtomatik to'ldiriladi (sync_technologies)
+    tech_stack = models.ManyToManyField(Technology, related_name='portfolios', blank=True, editable=False)
+
     # Havolalar
     project_url = models.URLField(blank=True, null=True, help_text="Loyiha saytining URL'i")
     github_url = models.URLField(blank=True, null=True, help_text="GitHub repository URL'i")
@@ -51,10 +106,13 @@ class Portfolio(models.Model):
     is_featured = models.BooleanField(default=False, help_text="Bosh sahifada ko'rsatilsin?")
     is_active = models.BooleanField(default=True, help_text="Aktiv loyihami?")
 
+    objects = PortfolioQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Portfolio"
         verbose_name_plural = "Portfolios"
+        indexes = [models.Index(fields=['is_active', '-is_featured', '-created_at', 'id'], name='portfolio_listing_idx')]
 
     def __str__(self):
         return self.title
@@ -70,3 +128,61 @@ class Portfolio(models.Model):
     def get_github_url(self):
         """GitHub URL'ni qaytarish, agar bo'lmasa #"""
         return self.github_url or '#'
+
+
+# ============================================================
+# TEXNOLOGIYALARNI SINXRONLASH
+# ============================================================
+def update_technology_counts(technology_ids=None):
+    """portfolios_count ni bitta UPDATE bilan qayta hisoblash"""
+    active_count = (
+        Portfolio.tech_stack.through.objects
+        .filter(technology_id=OuterRef('pk'), portfolio__is_active=True)
+        .values('technology_id')
+        .annotate(n=Count('portfolio_id'))
+        .values('n')
+    )
+    technologies = Technology.objects.all()
+    if technology_ids is not None:
+        technologies = technologies.filter(pk__in=technology_ids)
+    return technologies.update(portfolios_count=Coalesce(Subquery(active_count), 0))
+
+
+def sync_technologies(portfolio):
+    """technologies matnini Technology yozuvlariga va M2M bog'lanishga aylantirish"""
+    names = {}
+    for name in portfolio.get_technologies_list():
+        slug = technology_slug(name)
+        if slug:
+            names.setdefault(slug, name[:50])
+
+    existing = {tech.slug: tech for tech in Technology.objects.filter(slug__in=names)}
+    missing = [Technology(name=name, slug=slug) for slug, name in names.items() if slug not in existing]
+    if missing:
+        Technology.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = {tech.slug: tech for tech in Technology.objects.filter(slug__in=names)}
+
+    new_ids = {tech.pk for tech in existing.values()}
+    old_ids = set(portfolio.tech_stack.values_list('pk', flat=True))
+    if new_ids != old_ids:
+        portfolio.tech_stack.set(new_ids)
+    # is_active o'zgargan bo'lishi ham mumkin – eski va yangi teglar qayta sanaladi
+    update_technology_counts(new_ids | old_ids)
+
+
+@receiver(post_save, sender=Portfolio)
+def portfolio_technologies_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_technologies(instance)
+
+
+@receiver(pre_delete, sender=Portfolio)
+def remember_portfolio_technologies(sender, instance, **kwargs):
+    instance._technology_ids = list(instance.tech_stack.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Portfolio)
+def portfolio_deleted(sender, instance, **kwargs):
+    ids = getattr(instance, '_technology_ids', None)
+    if ids:
+        update_technology_counts(ids)
@@ -1,3 +1,149 @@
+import io
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from .models import Category, Portfolio, Technology
+
+
+# ============================================================
+# ADMIN RO'YXATLARI
+# ============================================================
+class AdminChangelistQueriesTest(QueryBudgetMixin, TestCase):
+    """So'rovlar soni qatorlar soniga bog'liq emas (N+1 yo'q)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'parol')
+        for i in range(5):
+            category = Category.objects.create(title=f'Kategoriya {i}', slug=f'kategoriya-{i}')
+            Portfolio.objects.create(title=f'Loyiha {i}', description='Tavsif', category=category,
+                                     technologies='Django, React, PostgreSQL, Redis')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_category_changelist(self):
+        # sessiya, foydalanuvchi, 2×COUNT, ro'yxat (loyihalar soni annotatsiya bilan)
+        self.assertQueryBudget('admin:portfolio_category_changelist', budget=5)
+
+    def test_portfolio_changelist(self):
+        # + ro'yxat, tech_stack prefetch, list_filter (kategoriya, texnologiya, yil) va date_hierarchy
+        self.assertQueryBudget('admin:portfolio_portfolio_changelist', budget=11)
+
+
+# ============================================================
+# TEXNOLOGIYA TEGLARI
+# ============================================================
+class TechnologySyncTest(TestCase):
+    """technologies matni → Technology teglari, portfolios_count va ?tech= filtri"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.web = Category.objects.create(title='Web', slug='web')
+        cls.mobile = Category.objects.create(title='Mobile', slug='mobile')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def create(self, title, technologies, category=None, **kwargs):
+        return Portfolio.objects.create(title=title, description='Tavsif', category=category or self.web,
+                                        technologies=technologies, **kwargs)
+
+    def counts(self):
+        return dict(Technology.objects.values_list('slug', 'portfolios_count'))
+
+    def test_sync_creates_and_links_technologies(self):
+        portfolio = self.create('Loyiha', 'Django, C++, django , C#')
+        self.assertEqual(sorted(portfolio.tech_stack.values_list('slug', flat=True)),
+                         ['c-plus-plus', 'c-sharp', 'django'])
+        self.assertEqual(Technology.objects.get(slug='c-plus-plus').name, 'C++')
+
+        # Matn o'zgarsa bog'lanish ham yangilanadi, mavjud teg qayta yaratilmaydi
+        portfolio.technologies = 'Django, React'
+        portfolio.save()
+        self.assertEqual(sorted(portfolio.tech_stack.values_list('slug', flat=True)), ['django', 'react'])
+        self.assertEqual(Technology.objects.filter(slug='django').count(), 1)
+
+    def test_portfolios_count_follows_active_portfolios(self):
+        first = self.create('Birinchi', 'Django, React')
+        self.create('Ikkinchi', 'Django')
+        self.assertEqual(self.counts(), {'django': 2, 'react': 1})
+
+        first.is_active = False
+        first.save()
+        self.assertEqual(self.counts(), {'django': 1, 'react': 0})
+
+        first.is_active = True
+        first.save()
+        first.delete()
+        self.assertEqual(self.counts(), {'django': 1, 'react': 0})
+
+    def test_sync_command_repairs_counts(self):
+        self.create('Loyiha', 'Django, React')
+        Technology.objects.update(portfolios_count=0)
+        Technology.objects.create(name='Unused', slug='unused')
+
+        call_command('sync_portfolio_technologies', '--prune', stdout=io.StringIO())
+        self.assertEqual(self.counts(), {'django': 1, 'react': 1})
+
+    def test_tech_filter(self):
+        self.create('Django loyiha', 'Django, PostgreSQL')
+        self.create('React loyiha', 'React')
+        self.create('Yashirin', 'Django', is_active=False)
+
+        response = self.client.get(reverse('portfolio'), {'tech': 'django'})
+        self.assertEqual([p.title for p in response.context['portfolios']], ['Django loyiha'])
+        self.assertEqual(response.context['total_count'], 1)
+
+    def test_facets_are_scoped_to_category(self):
+        self.create('Web 1', 'Django, React')
+        self.create('Web 2', 'Django')
+        self.create('Mobil', 'Flutter, Django', category=self.mobile)
+
+        facets = lambda response: [(t.slug, t.facet_count) for t in response.context['technologies']]
+        response = self.client.get(reverse('portfolio'))
+        self.assertEqual(facets(response), [('django', 3), ('flutter', 1), ('react', 1)])
+
+        # ?tech= facetni toraytirmaydi – kategoriya ichidagi boshqa teglar ham ko'rinadi
+        response = self.client.get(reverse('portfolio'), {'category': self.web.pk, 'tech': 'react'})
+        self.assertEqual(facets(response), [('django', 2), ('react', 1)])
+
+
+# ============================================================
+# PORTFOLIO SAHIFASI
+# ============================================================
+class PortfolioQueriesTest(QueryBudgetMixin, TestCase):
+    """Sahifa so'rovlari portfoliolar soniga bog'liq emas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('talaba', 'talaba@example.com', 'parol')
+        cls.category = Category.objects.create(title='Web', slug='web')
+        for i in range(5):
+            Portfolio.objects.create(title=f'Loyiha {i}', description='Tavsif', category=cls.category,
+                                     technologies='Django, React')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_anonymous_cold_and_warm(self):
+        self.assertQueryBudget('portfolio')
+        # Keshdagi sahifa – bazaga umuman murojaat yo'q
+        self.assertQueryBudget('portfolio', budget=0)
 
-# Create your tests here.
+    def test_logged_in_with_filters(self):
+        # sessiya, foydalanuvchi, kategoriyalar, facet, COUNT, sahifa, tech_stack prefetch, navbar profili
+        self.client.force_login(self.user)
+        data = {'category': self.category.pk, 'tech': 'django'}
+        response = self.assertQueryBudget('portfolio', data=data)
+        self.assertEqual(response.context['total_count'], 5)
+        # COUNT keshlangan (count_timeout) – bittaga kam
+        self.assertQueryBudget('portfolio', budget=settings.QUERY_BUDGETS['portfolio'] - 1, data=data)
@@ -1,33 +1,64 @@
-from django.core.paginator import Paginator
-from django.db.models import Count
-from django.shortcuts import render
-from .models import Portfolio, Category
+import asyncio
 
+from django.db.models import Count, F
 
-def portfolio_list(request):
-    portfolios = Portfolio.objects.filter(is_active=True)
+from core.async_views import alist, arender, auser
+from core.pagecache import cache_anonymous_page
+from core.pagination import KeysetPaginator
+from .models import Portfolio, Category, Technology
+
+PORTFOLIO_ORDERING = ('-is_featured', '-created_at', 'id')
+TECHNOLOGY_FACETS = 20
+
+
+@cache_anonymous_page('portfolio')
+async def portfolio_list(request):
+    portfolios = Portfolio.objects.active()
     category_id = request.GET.get('category')
     if category_id:
         portfolios = portfolios.filter(category_id=category_id)
 
-    portfolios = portfolios.order_by('-is_featured', '-created_at')
+    # Facet tanlangan kategoriya ichida sanaladi (?tech= ga bog'liq emas –
+    # aks holda boshqa teglar ro'yxatdan yo'qolib qolardi)
+    if category_id:
+        technologies = Technology.objects.filter(
+            portfolios__in=portfolios.values('pk'),
+        ).annotate(facet_count=Count('portfolios'))
+    else:
+        # Kategoriyasiz – oldindan hisoblangan portfolios_count (signal orqali)
+        technologies = Technology.objects.filter(portfolios_count__gt=0).annotate(facet_count=F('portfolios_count'))
+    technologies = technologies.order_by('-facet_count', 'name')[:TECHNOLOGY_FACETS]
 
-    # Pagination (12 ta har sahifada)
-    paginator = Paginator(portfolios, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    portfolios = portfolios.cards().prefetch_related('tech_stack')
+
+    # ?tech=django – slug (unique indeks) orqali M2M jadvalidan filtr
+    tech_slug = request.GET.get('tech')
+    if tech_slug:
+        portfolios = portfolios.filter(tech_stack__slug=tech_slug)
+
+    # Keyset paginatsiya (12 ta har sahifada) – chuqur sahifalar ham 1-sahifa kabi tez
+    paginator = KeysetPaginator(portfolios, ordering=PORTFOLIO_ORDERING, per_page=12, count_timeout=60)
 
     # Kategoriyalar
     categories = Category.objects.annotate(
         count=Count('portfolios')
     ).order_by('title')
 
+    page_obj, categories, technologies, _ = await asyncio.gather(
+        paginator.aget_page(request.GET.get('cursor')),
+        alist(categories),
+        alist(technologies),
+        auser(request),
+    )
+
     context = {
         'page_obj': page_obj,
         'portfolios': page_obj.object_list,
         'categories': categories,
         'selected_category': category_id,
-        'total_count': portfolios.count(),
+        'technologies': technologies,
+        'selected_tech': tech_slug,
+        'total_count': page_obj.count,
     }
 
-    return render(request, 'portfolio.html', context)
\ No newline at end of file
+    return await arender(request, 'portfolio.html', context)
@@ -1,7 +1,11 @@
 from django.urls import path, include
 
+from course.signed_media import signed_media
+
 urlpatterns = [
+    path('signed-media/<int:expires>/<int:depth>/<str:signature>/<path:path>', signed_media, name='signed_media'),
     path('', include('users.urls')),
     path('course/', include('course.urls')),
     path('portfolio/', include('portfolio.urls')),
+    path('', include('core.urls')),
 ]
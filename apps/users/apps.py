@@ -10,5 +10,7 @@ class UsersConfig(AppConfig):
         """Signallarni import qilish"""
         try:
             import users.models  # noqa: F401
+            import users.site_stats  # noqa: F401
+            import users.dashboard  # noqa: F401
         except ImportError:
             pass
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+apps/users/dashboard.py - PROFIL SAHIFASI MA'LUMOTLARI (kesh)
+
+Statistika (faol/tugatilgan kurslar, darslar va soatlar) bitta shartli
+agregat so'rov bilan, kurslar ro'yxati esa bitta values() so'rov bilan
+olinadi. Natija foydalanuvchi bo'yicha keshlanadi:
+
+    - talabaning Enrollment yozuvi o'zgarganda/o'chirilganda kalit o'chiriladi;
+    - kurslar o'zgarganda (nom, rasm, darslar soni) 'catalog' avlodi
+      oshadi va kalit o'z-o'zidan eskiradi (core/pagecache.py).
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.images import best_url
+from core.pagecache import get_generation
+from course.models import Enrollment
+
+# Hisoblash usuli o'zgarsa versiyani oshiring
+KEY_PREFIX = 'profile_dashboard:v1:'
+TIMEOUT = 60 * 10
+
+
+def _user_key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def _build_dashboard(user_id):
+    enrollments = Enrollment.objects.filter(student_id=user_id)
+    active, completed = Q(status='active'), Q(status='completed')
+
+    stats = enrollments.aggregate(
+        enrolled_courses_count=Count('id', filter=active),
+        completed_courses_count=Count('id', filter=completed),
+        total_lessons=Sum('course__lessons_count', filter=active, default=0),
+        total_hours=Sum('course__total_hours', filter=active, default=0),
+    )
+    stats['total_hours'] = round(stats['total_hours'], 1)
+
+    rows = (
+        enrollments.filter(active)
+        .order_by('-enrolled_at')
+        .values('course_id', 'course__title', 'course__image', 'course__lessons_count', 'progress')
+    )
+    stats['enrolled_courses'] = [
+        {
+            'course_id': row['course_id'],
+            'title': row['course__title'],
+            'image_url': best_url(row['course__image'], 160) if row['course__image'] else '',
+            'lessons_count': row['course__lessons_count'],
+            'progress': row['progress'],
+        }
+        for row in rows
+    ]
+    return stats
+
+
+def get_dashboard(user_id):
+    """Profil statistikasi va faol kurslar ro'yxati (kesh → 0 SQL so'rov)"""
+    key = _user_key(user_id)
+    generation = get_generation('catalog')
+    cached = cache.get(key)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    dashboard = _build_dashboard(user_id)
+    cache.set(key, (generation, dashboard), TIMEOUT)
+    return dashboard
+
+
+def invalidate_dashboard(user_id):
+    cache.delete(_user_key(user_id))
+
+
+# ============================================================
+# SIGNALLAR
+# ============================================================
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        user_id = instance.student_id
+        transaction.on_commit(lambda: invalidate_dashboard(user_id))
@@ -0,0 +1,107 @@
+"""
+apps/users/site_stats.py - BOSH SAHIFA HISOBLAGICHLARI (kesh)
+
+Bosh sahifadagi "talabalar / kurslar / loyihalar" sonlari har so'rovda
+COUNT(DISTINCT ...) bilan hisoblanmaydi: ular keshda turadi va model
+signallari orqali yangilanadi. Kesh bo'sh bo'lsa (yangi deploy, TTL
+tugagan) faqat yetishmagan hisoblagich bir marta qayta hisoblanadi.
+"""
+
+import asyncio
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from course.models import Course, Enrollment
+from portfolio.models import Portfolio
+
+# Hisoblash usuli o'zgarsa versiyani oshiring
+KEY_PREFIX = 'site_stats:v1:'
+# Bir nechta worker'li lokal keshlar bir-biridan uzoqlashib ketmasligi uchun
+TIMEOUT = 60 * 10
+
+
+def _students():
+    return Enrollment.objects.values('student').distinct()
+
+
+def _courses():
+    return Course.objects.filter(status='published')
+
+
+def _portfolios():
+    return Portfolio.objects.filter(is_active=True)
+
+
+# hisoblagich → sanaladigan queryset
+COUNTERS = {
+    'total_students': _students,
+    'total_courses': _courses,
+    'total_portfolios': _portfolios,
+}
+
+
+def get_site_stats():
+    """{'total_students': .., 'total_courses': .., 'total_portfolios': ..}"""
+    keys = {KEY_PREFIX + name: name for name in COUNTERS}
+    cached = cache.get_many(keys)
+    stats = {keys[key]: value for key, value in cached.items()}
+
+    for name, queryset in COUNTERS.items():
+        if name not in stats:
+            stats[name] = queryset().count()
+            cache.set(KEY_PREFIX + name, stats[name], TIMEOUT)
+    return stats
+
+
+async def aget_site_stats():
+    """get_site_stats ning async varianti: yetishmagan hisoblagichlar birgalikda (gather) sanaladi"""
+    keys = {KEY_PREFIX + name: name for name in COUNTERS}
+    cached = await cache.aget_many(keys)
+    stats = {keys[key]: value for key, value in cached.items()}
+
+    missing = [name for name in COUNTERS if name not in stats]
+    if missing:
+        counts = await asyncio.gather(*(COUNTERS[name]().acount() for name in missing))
+        stats.update(zip(missing, counts))
+        await cache.aset_many({KEY_PREFIX + name: stats[name] for name in missing}, TIMEOUT)
+    return stats
+
+
+def refresh_counter(name):
+    cache.set(KEY_PREFIX + name, COUNTERS[name]().count(), TIMEOUT)
+
+
+# ============================================================
+# SIGNALLAR
+# ============================================================
+def _forget_students():
+    # Yangi yozilish talabaning birinchisimi – bilish uchun qo'shimcha so'rov
+    # kerak bo'lardi; kaskad o'chirishda esa bir nechta signal keladi.
+    # Ikkalasida ham hisoblagich keshdan olinadi va keyingi o'qishda bir marta sanaladi
+    transaction.on_commit(lambda: cache.delete(KEY_PREFIX + 'total_students'))
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _forget_students()
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    _forget_students()
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: refresh_counter('total_courses'))
+
+
+@receiver([post_save, post_delete], sender=Portfolio)
+def portfolio_changed(sender, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: refresh_counter('total_portfolios'))
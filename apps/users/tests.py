@@ -1,3 +1,152 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryBudgetMixin
+from course.models import Category, Course, Enrollment
+from portfolio.models import Category as PortfolioCategory, Portfolio
+from .site_stats import get_site_stats
+
+
+# ============================================================
+# BOSH SAHIFA
+# ============================================================
+class IndexQueriesTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('talaba', password='parol')
+        category = Category.objects.create(name='Dasturlash')
+        portfolio_category = PortfolioCategory.objects.create(title='Web', slug='web')
+        for i in range(4):
+            course = Course.objects.create(title=f'Kurs {i}', description='Tavsif', category=category, status='published')
+            Enrollment.objects.create(student=cls.user, course=course)
+            Portfolio.objects.create(title=f'Loyiha {i}', description='Tavsif', category=portfolio_category,
+                                     technologies='Django, React')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_anonymous(self):
+        # kurslar, loyihalar, tech_stack prefetch, 3 ta hisoblagich; keyin butun sahifa keshdan
+        response = self.assertQueryBudget('index', budget=6)
+        self.assertEqual(len(response.context['courses']), 3)
+        self.assertEqual(response.context['total_courses'], 4)
+        self.assertQueryBudget('index', budget=0)
+
+    def test_logged_in(self):
+        # + sessiya, foydalanuvchi, navbar profili
+        self.client.force_login(self.user)
+        self.assertQueryBudget('index')
+        # Hisoblagichlar keshdan
+        self.assertQueryBudget('index', budget=settings.QUERY_BUDGETS['index'] - 3)
+
+
+# ============================================================
+# BOSH SAHIFA HISOBLAGICHLARI
+# ============================================================
+class SiteStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create_user('birinchi', password='parol')
+        cls.second = User.objects.create_user('ikkinchi', password='parol')
+        cls.category = Category.objects.create(name='Dasturlash')
+        cls.courses = [
+            Course.objects.create(title=f'Kurs {i}', description='Tavsif', category=cls.category, status='published')
+            for i in range(2)
+        ]
+        cls.portfolio_category = PortfolioCategory.objects.create(title='Web', slug='web')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def stats(self):
+        # Kesh to'ldiriladi – keyingi o'zgarish signal orqali yangilanishi kerak
+        return get_site_stats()
+
+    def test_warm_index_runs_no_counts(self):
+        self.client.get(reverse('index'))
+        self.client.force_login(self.first)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('index'))
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if 'COUNT(' in q['sql']])
+
+    def test_enrollment_signal_runs_no_queries(self):
+        self.stats()
+        with CaptureQueriesContext(connection) as ctx:
+            Enrollment.objects.create(student=self.first, course=self.courses[0])
+        # Birinchi yozilishmi – tekshirish uchun SELECT qilinmaydi
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')])
+
+    def test_students_across_enrollment_create_and_delete(self):
+        self.assertEqual(self.stats()['total_students'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            first = Enrollment.objects.create(student=self.first, course=self.courses[0])
+        self.assertEqual(self.stats()['total_students'], 1)
+
+        # Bir talabaning ikkinchi kursi – talabalar soni o'zgarmaydi
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.first, course=self.courses[1])
+            Enrollment.objects.create(student=self.second, course=self.courses[0])
+        self.assertEqual(self.stats()['total_students'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.stats()['total_students'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.delete()
+        self.assertEqual(self.stats()['total_students'], 1)
+
+    def test_courses_and_portfolios_follow_saves(self):
+        self.assertEqual(self.stats()['total_courses'], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.courses[0].status = 'draft'
+            self.courses[0].save()
+        self.assertEqual(self.stats()['total_courses'], 1)
+
+        self.assertEqual(self.stats()['total_portfolios'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio = Portfolio.objects.create(title='Loyiha', description='Tavsif',
+                                                 category=self.portfolio_category, technologies='Django')
+        self.assertEqual(self.stats()['total_portfolios'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio.is_active = False
+            portfolio.save()
+        self.assertEqual(self.stats()['total_portfolios'], 0)
+
+
+# ============================================================
+# PROFIL SAHIFASI
+# ============================================================
+class ProfileQueriesTest(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('talaba', password='parol')
+        category = Category.objects.create(name='Dasturlash')
+        for i in range(3):
+            course = Course.objects.create(title=f'Kurs {i}', description='Tavsif', category=category, status='published')
+            Enrollment.objects.create(student=cls.user, course=course, status='completed' if i == 2 else 'active')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.user)
+
+    def test_cold_cache(self):
+        # sessiya, foydalanuvchi, profil + statistika agregati va faol kurslar ro'yxati
+        response = self.assertQueryBudget('profile')
+        self.assertEqual(response.context['enrolled_courses_count'], 2)
+        self.assertEqual(response.context['certificates_count'], 1)
+        self.assertEqual(len(response.context['enrolled_courses']), 2)
+
+    def test_warm_cache(self):
+        self.client.get(reverse('profile'))
+        # Statistika keshdan – faqat sessiya, foydalanuvchi va profil
+        response = self.assertQueryBudget('profile', budget=3)
+        self.assertEqual(response.context['enrolled_courses_count'], 2)
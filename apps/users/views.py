@@ -1,28 +1,41 @@
+import asyncio
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
-from course.models import Course, Enrollment
+from core.async_views import alist, arender, auser
+from core.pagecache import cache_anonymous_page
+from course.models import Course
 from portfolio.models import Portfolio
 from .forms import UserRegistrationForm, UserProfileForm, CustomAuthenticationForm
 from .models import UserProfile
+from .dashboard import get_dashboard
+from .site_stats import aget_site_stats
 
 
 def get_courses_for_index(limit=3):
-    return Course.objects.filter(status='published').order_by('-created_at')[:limit]
-
-
-def index(request):
-    courses = get_courses_for_index(3)
-    total_students = Enrollment.objects.values('student').distinct().count()
-    total_courses = Course.objects.filter(status='published').count()
-    total_portfolios = Portfolio.objects.filter(is_active=True).count()
-
-    portfolios = Portfolio.objects.filter(is_active=True).order_by('-is_featured', '-created_at')[:3]
-    context = {'courses': courses, 'portfolios': portfolios, 'total_students': total_students,
-               'total_courses': total_courses, 'total_portfolios': total_portfolios, }
-    return render(request, 'index.html', context)
+    return Course.objects.published().cards().order_by('-created_at')[:limit]
+
+
+@cache_anonymous_page('catalog', 'portfolio')
+async def index(request):
+    portfolios = (
+        Portfolio.objects.active()
+        .cards()
+        .prefetch_related('tech_stack')
+        .order_by('-is_featured', '-created_at')[:3]
+    )
+    # Kurslar, loyihalar va hisoblagichlar bir-biriga bog'liq emas – birgalikda
+    courses, portfolios, stats, _ = await asyncio.gather(
+        alist(get_courses_for_index(3)),
+        alist(portfolios),
+        aget_site_stats(),
+        auser(request),
+    )
+    context = {'courses': courses, 'portfolios': portfolios, **stats}
+    return await arender(request, 'index.html', context)
 
 
 def login_view(request):
@@ -75,30 +88,14 @@ def logout_view(request):
 def profile(request):
     user = request.user
 
-    enrolled_courses = Enrollment.objects.filter(
-        student=user,
-        status='active'
-    ).select_related('course').order_by('-enrolled_at')
-
-    enrolled_courses_count = enrolled_courses.count()
-
-    completed_courses_count = Enrollment.objects.filter(
-        student=user,
-        status='completed'
-    ).count()
-
-    total_lessons = sum(e.course.lessons_count or 0 for e in enrolled_courses)
-    total_hours = sum(e.course.total_hours or 0 for e in enrolled_courses)
+    # Bitta agregat + bitta ro'yxat so'rovi, foydalanuvchi bo'yicha keshlangan
+    dashboard = get_dashboard(user.id)
 
     context = {
         'user': user,
         'profile': user.profile,
-        'enrolled_courses': enrolled_courses,
-        'enrolled_courses_count': enrolled_courses_count,
-        'completed_courses_count': completed_courses_count,
-        'total_lessons': total_lessons,
-        'total_hours': total_hours,
-        'certificates_count': completed_courses_count,
+        **dashboard,
+        'certificates_count': dashboard['completed_courses_count'],
     }
 
     return render(request, 'registration/profile.html', context)
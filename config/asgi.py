@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Har bir ASGI so'rov yangi oqimda – oqimga bog'langan doimiy ulanishlar qayta ishlatilmaydi
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.DB_WARMUP:
+    from core.db.warmup import warmup
+    warmup()
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     # 'corsheaders',
 
     # local apps
+    'core',
     'users',
     'course',
     'portfolio',
@@ -35,13 +36,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.staticfiles.PrecompressedStaticMiddleware',
     # 'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'course.middleware.CourseStatsMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -58,6 +62,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.pagecache.cache_versions',
             ],
         },
     },
@@ -68,12 +73,64 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')  # 'sqlite' | 'postgres'
+# Doimiy ulanishlar: so'rovlar orasida ulanish yopilmaydi (sekund; 0 – har so'rov oxirida yopish).
+# ASGI (config/asgi.py) standarti 0 – u yerda har so'rov alohida oqimda ishlaydi
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+# Doimiy ulanishni qayta ishlatishdan oldin tirikligini tekshirish (so'rov boshida)
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+# Server ishga tushganda ulanishlarni (pool'ni) oldindan ochish – core/db/warmup.py
+DB_WARMUP = os.environ.get('DB_WARMUP', 'True') == 'True'
+
+if DB_ENGINE == 'postgres':
+    # pip install "psycopg[binary,pool]"
+    # DB_POOL=True – jarayon ichidagi psycopg pool (doimiy ulanishlar o'rniga, ASGI uchun ham)
+    DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'abruis'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Pool'da ulanishlarni pool o'zi saqlaydi – Django ularni yopishi shart
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': {},
+        }
     }
-}
+    if DB_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),  # bo'sh ulanishni kutish, sekund
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 600)),
+        }
+else:
+    # core/db/backends/sqlite3: WAL, pragmalar, busy_timeout va bitta navbatli yozuvchi
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20))  # sekund
+    DATABASES = {
+        'default': {
+            'ENGINE': 'core.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': {'timeout': SQLITE_BUSY_TIMEOUT},
+        }
+    }
+
+    # O'qishlar alohida, faqat o'qish uchun ochilgan ulanishlarga (core/db/routers.py)
+    SQLITE_READ_REPLICA = os.environ.get('SQLITE_READ_REPLICA', 'True') == 'True'
+    if SQLITE_READ_REPLICA:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'OPTIONS': {**DATABASES['default']['OPTIONS'], 'read_only': True},
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['core.db.routers.ReadReplicaRouter']
+
+TEST_RUNNER = 'core.testing.AppsDiscoverRunner'
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -117,11 +174,120 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic: hash'li nomlar + .gz/.br nusxalar (core/staticfiles.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
+# Testlar: migratsiya fayllari repoda saqlanmaydi – jadvallar modellardan yaratiladi;
+# collectstatic ishlatilmaydi – manifest'siz storage
+if sys.argv[1:2] == ['test']:
+    MIGRATION_MODULES = {app: None for app in ('users', 'course', 'portfolio')}
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# ============================================================
+# KESH
+# ============================================================
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION', str(BASE_DIR / '.cache') if CACHE_BACKEND == 'file' else 'abruis'
+        ),
+        'TIMEOUT': 60 * 10,
+    }
+}
+
+# Anonim foydalanuvchilar uchun sahifa keshi (core/pagecache.py)
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 60 * 10))
+
+# ============================================================
+# METRIKALAR VA SQL SO'ROVLAR LIMITI
+# ============================================================
+SERVER_TIMING = os.environ.get('SERVER_TIMING', str(DEBUG)) == 'True'
+# /metrics/: staff yoki "Authorization: Bearer <METRICS_TOKEN>" (Prometheus scrape).
+# IP ro'yxati ixtiyoriy – proksi ortida REMOTE_ADDR proksining o'zi bo'ladi
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip]
+
+# View nomi → so'rov (middleware bilan birga) uchun maksimal SQL so'rovlar
+QUERY_BUDGETS = {
+    'index': 9,
+    'course': 6,
+    'course_detail': 5,
+    'lesson_view': 6,
+    'portfolio': 8,
+    'profile': 5,
+    'search': 2,
+}
+
+# ============================================================
+# FON VAZIFALARI
+# ============================================================
+TASKS_BACKEND = os.environ.get('TASKS_BACKEND', 'thread')  # 'thread' | 'immediate'
+TASKS_MAX_WORKERS = int(os.environ.get('TASKS_MAX_WORKERS', 2))
+
+# Video progressi: write-behind bufer (course/progress_buffer.py)
+PROGRESS_WRITE_BEHIND = os.environ.get('PROGRESS_WRITE_BEHIND', str(TASKS_BACKEND != 'immediate')) == 'True'
+PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', 5))
+PROGRESS_FLUSH_SIZE = int(os.environ.get('PROGRESS_FLUSH_SIZE', 500))
+
+# ============================================================
+# HIMOYALANGAN MEDIA (course/signed_media.py)
+# ============================================================
+# Prod'da proksi course_videos/ va course_hls/ ga MEDIA_URL orqali kirishni yopishi kerak
+MEDIA_SIGNING_KEY = os.environ.get('MEDIA_SIGNING_KEY', SECRET_KEY)
+SIGNED_MEDIA_TTL = int(os.environ.get('SIGNED_MEDIA_TTL', 60 * 60 * 4))  # sekund
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL', '')  # '' | 'nginx' (X-Accel-Redirect) | 'sendfile' (X-Sendfile)
+# nginx: location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+# ============================================================
+# DARS VIDEOLARINI YUKLASH (course/uploads.py)
+# ============================================================
+LESSON_VIDEO_MAX_SIZE = int(os.environ.get('LESSON_VIDEO_MAX_SIZE', 8 * 1024 ** 3))  # 8 GB
+# Tugallanmagan qismlar; MEDIA_ROOT bilan bir diskda bo'lsa yakunda fayl nusxalanmaydi, ko'chiriladi
+LESSON_UPLOAD_DIR = os.environ.get('LESSON_UPLOAD_DIR', str(BASE_DIR / 'tmp' / 'uploads'))
+LESSON_UPLOAD_EXPIRY = 60 * 60 * 24  # sekund; cleanup_lesson_uploads buyrug'i o'chiradi
+
+# ============================================================
+# RASM NUSXALARI (core/images.py)
+# ============================================================
+IMAGE_DERIVATIVE_WIDTHS = [160, 320, 640, 1280]
+IMAGE_DERIVATIVE_FORMATS = ['avif', 'webp']  # tartib = <picture> manbalari tartibi
+IMAGE_DERIVATIVE_QUALITY = int(os.environ.get('IMAGE_DERIVATIVE_QUALITY', 75))
+
+# ============================================================
+# VIDEO (HLS) TRANSKODLASH
+# ============================================================
+HLS_ENCODER = os.environ.get('HLS_ENCODER', 'ffmpeg')  # 'ffmpeg' | 'stub'
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY', 'ffprobe')
+VIDEO_PROBER = os.environ.get('VIDEO_PROBER', 'ffprobe')  # 'ffprobe' | 'stub'
+HLS_SEGMENT_SECONDS = 6
+# Shuncha vaqtdan beri 'pending'/'processing' holatidagi darslar qayta navbatga qo'yiladi
+# (jarayon to'xtab qolgan bo'lsa; manage.py requeue_stale_transcodes), sekund
+HLS_STALE_AFTER = int(os.environ.get('HLS_STALE_AFTER', 2 * 60 * 60))
+HLS_RENDITIONS = [
+    {'name': '360p', 'width': 640, 'height': 360, 'video_bitrate': 800, 'audio_bitrate': 96},
+    {'name': '720p', 'width': 1280, 'height': 720, 'video_bitrate': 2800, 'audio_bitrate': 128},
+    {'name': '1080p', 'width': 1920, 'height': 1080, 'video_bitrate': 5000, 'audio_bitrate': 160},
+]
+
 SECURE_SSL_REDIRECT = False  # HTTPS redirect
 SESSION_COOKIE_SECURE = False  # HTTPS cookie
 CSRF_COOKIE_SECURE = False  # HTTPS CSRF
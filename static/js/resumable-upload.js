@@ -0,0 +1,123 @@
+// Dars videosini qismlab yuklash (server: course/uploads.py, tus-ga o'xshash protokol).
+// Fayl CHUNK_SIZE bo'laklarda yuboriladi; aloqa uzilsa yoki sahifa qayta
+// yuklansa, HEAD orqali serverdagi offset olinib shu joydan davom etiladi.
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.resumable-upload').forEach(initResumableUpload);
+});
+
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+const UPLOAD_RETRY_DELAYS = [1000, 3000, 5000, 10000, 20000];
+
+function initResumableUpload(box) {
+    const input = box.querySelector('input[type=file]');
+    const progress = box.querySelector('progress');
+    const status = box.querySelector('.resumable-upload-status');
+
+    input.addEventListener('change', function() {
+        const file = input.files[0];
+        if (!file) return;
+        input.disabled = true;
+        uploadFile(box, file, function(percent) {
+            progress.value = percent;
+            status.textContent = percent.toFixed(1) + '%';
+        }).then(function() {
+            status.textContent = 'Yuklandi. Video fonda qayta ishlanmoqda...';
+            setTimeout(function() { window.location.reload(); }, 1500);
+        }).catch(function(error) {
+            status.textContent = 'Xatolik: ' + error.message;
+            input.disabled = false;
+        });
+    });
+}
+
+function encodeMetadata(value) {
+    return btoa(unescape(encodeURIComponent(String(value))));
+}
+
+async function chunkChecksum(chunk) {
+    // crypto.subtle faqat HTTPS/localhost'da mavjud – bo'lmasa checksum yuborilmaydi
+    if (!(window.crypto && crypto.subtle)) return null;
+    const digest = await crypto.subtle.digest('SHA-1', await chunk.arrayBuffer());
+    return 'sha1 ' + btoa(String.fromCharCode.apply(null, new Uint8Array(digest)));
+}
+
+async function responseError(response) {
+    try {
+        const data = await response.json();
+        return new Error([].concat(data.error).join(' '));
+    } catch (e) {
+        return new Error('HTTP ' + response.status);
+    }
+}
+
+async function uploadFile(box, file, onProgress) {
+    const headers = {
+        'Tus-Resumable': '1.0.0',
+        'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value,
+    };
+    const storageKey = ['upload', box.dataset.lesson, file.name, file.size, file.lastModified].join(':');
+    let url = localStorage.getItem(storageKey);
+    let offset = 0;
+
+    async function fetchOffset() {
+        const response = await fetch(url, { method: 'HEAD', headers: headers });
+        if (!response.ok) return null;
+        return parseInt(response.headers.get('Upload-Offset'), 10);
+    }
+
+    if (url) {
+        offset = await fetchOffset();
+        if (offset === null) url = null;
+    }
+    if (!url) {
+        const response = await fetch(box.dataset.endpoint, {
+            method: 'POST',
+            headers: Object.assign({}, headers, {
+                'Upload-Length': String(file.size),
+                'Upload-Metadata': 'lesson ' + encodeMetadata(box.dataset.lesson) +
+                                   ',filename ' + encodeMetadata(file.name),
+            }),
+        });
+        if (response.status !== 201) throw await responseError(response);
+        url = response.headers.get('Location');
+        offset = 0;
+        localStorage.setItem(storageKey, url);
+    }
+
+    let attempt = 0;
+    while (offset < file.size) {
+        onProgress(offset / file.size * 100);
+        const chunk = file.slice(offset, offset + UPLOAD_CHUNK_SIZE);
+        const chunkHeaders = Object.assign({}, headers, {
+            'Upload-Offset': String(offset),
+            'Content-Type': 'application/offset+octet-stream',
+        });
+        const checksum = await chunkChecksum(chunk);
+        if (checksum) chunkHeaders['Upload-Checksum'] = checksum;
+
+        let response = null;
+        try {
+            response = await fetch(url, { method: 'PATCH', headers: chunkHeaders, body: chunk });
+        } catch (e) {
+            // Tarmoq xatosi – quyida qayta urinish
+        }
+
+        if (response && response.ok) {
+            offset = parseInt(response.headers.get('Upload-Offset'), 10);
+            attempt = 0;
+            continue;
+        }
+        // 4xx (409/423/460 dan tashqari) – qayta urinishdan foyda yo'q
+        const retryable = !response || response.status >= 500 || [409, 423, 460].includes(response.status);
+        if (!retryable || attempt >= UPLOAD_RETRY_DELAYS.length) {
+            if (response && response.status === 404) localStorage.removeItem(storageKey);
+            throw response ? await responseError(response) : new Error("Tarmoq bilan aloqa yo'q");
+        }
+        await new Promise(function(resolve) { setTimeout(resolve, UPLOAD_RETRY_DELAYS[attempt++]); });
+        const serverOffset = await fetchOffset().catch(function() { return null; });
+        if (serverOffset !== null) offset = serverOffset;
+    }
+
+    localStorage.removeItem(storageKey);
+    onProgress(100);
+}